@@ -0,0 +1,45 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+"""Decoding server for networked IR receivers.
+
+Each receiver connects over TCP and sends the pulse durations it records (in usec),
+one per line. All the receivers are served by a single event loop, and their decoded
+events are printed as they arrive.
+"""
+
+import asyncio
+
+import click
+
+from pysdrc import aio
+
+
+async def _serve_receiver(reader, writer):
+    receiver = writer.get_extra_info("peername")
+    stream = aio.EventStream(aio.stream_source(reader))
+    subscription = stream.subscribe()
+    task = asyncio.ensure_future(stream.run())
+
+    async for event in subscription:
+        print(f"{receiver}: decoded as {event.protocol}: {event.code}")
+
+    await task
+    writer.close()
+
+
+async def _serve(host, port):
+    server = await asyncio.start_server(_serve_receiver, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+@click.command()
+@click.option("--host", default="0.0.0.0")
+@click.option("--port", default=8000, type=int)
+def serve(host, port):
+    asyncio.run(_serve(host, port))
+
+
+if __name__ == "__main__":
+    serve()
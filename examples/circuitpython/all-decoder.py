@@ -16,17 +16,11 @@ generic_decoder = adafruit_irremote.GenericDecode()
 while True:
     pulses = generic_decoder.read_pulses(pulsein)
     print("Heard", len(pulses), "Pulses:", pulses)
-    try:
-        code = decoder.decode_sirc(pulses)
-        print("Decoded (SIRC):", code)
-    except decoder.SIRCDecodeException as e:  # failed to decode
-        print("Failed to decode SIRC: ", e.args)
-
-    try:
-        code = decoder.decode_nec(pulses)
-        print("Decoded (NEC):", code)
-    except decoder.NECDecodeException as e:
-        print("Failed to decode NEC: ", e.args)
+    result = decoder.decode_any(pulses)
+    if result:
+        print("Decoded (%s):" % result.protocol, result.code)
+    else:
+        print("Failed to decode SIRC/NEC: ", result.reason)
 
     # We need to keep the generic_decoder last because it modifies the
     # pulses parameter. See
@@ -0,0 +1,37 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Example CircuitPython code that decodes commands as the pulses are received.
+
+The example expects you copied the pysdrc package to the CIRCUITPY volume.
+
+It also assumes an IR decoder (such as the TSOP4830) to be connected to the D9 line.
+"""
+
+import time
+
+import board
+import pulseio
+
+from pysdrc import incremental
+
+# Report pending 12- and 15-bit SIRC commands after this long without pulses.
+_IDLE_TIMEOUT = 0.02
+
+pulsein = pulseio.PulseIn(board.D9, maxlen=120, idle_state=True)
+ir_decoder = incremental.IncrementalDecoder()
+
+last_pulse = time.monotonic()
+
+while True:
+    result = None
+
+    if pulsein:
+        result = ir_decoder.push(pulsein.popleft())
+        last_pulse = time.monotonic()
+    elif time.monotonic() - last_pulse > _IDLE_TIMEOUT:
+        result = ir_decoder.finish()
+
+    if result is not None:
+        print("Decoded (%s):" % result[0], result[1])
@@ -0,0 +1,42 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Example CircuitPython code that decodes directly from the PulseIn buffer.
+
+The example expects you copied the pysdrc package to the CIRCUITPY volume.
+
+It also assumes an IR decoder (such as the TSOP4830) to be connected to the D9 line.
+
+The decoders read the pulses in place and write into a preallocated buffer, so the
+decode loop does not allocate memory until a command is printed.
+"""
+
+import array
+import time
+
+import board
+import pulseio
+
+from pysdrc import decoder
+
+pulsein = pulseio.PulseIn(board.D9, maxlen=120, idle_state=True)
+result = array.array("l", (0, 0, 0))
+
+while True:
+    count = len(pulsein)
+    if not count:
+        continue
+
+    # Wait for the frame to be complete.
+    time.sleep(0.01)
+    if len(pulsein) != count:
+        continue
+
+    pulsein.pause()
+    if decoder.decode_sirc_into(pulsein, result) == decoder.DECODE_OK:
+        print("Decoded (SIRC):", result[0], result[1], result[2])
+    elif decoder.decode_nec_into(pulsein, result) == decoder.DECODE_OK:
+        print("Decoded (NEC):", result[0], result[1], result[2])
+    pulsein.clear()
+    pulsein.resume()
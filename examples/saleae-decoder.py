@@ -8,62 +8,110 @@ This tool allows decoding traces coming from an IR Decoder chip (such as the TSO
 signal line.
 
 For the decode to work, a single channel export of the timing in digital format should
-be exported as CSV.
+be exported as CSV, or in the Logic 2 binary format (which requires numpy).
+
+The decoded events are printed, or written to the output file as NDJSON, CSV or
+Parquet (which requires pyarrow).
+
+Captures of an IR LED drive line or of a bare photodiode, which include the carrier,
+can be decoded with --carrier (which requires numpy). The measured carrier frequency
+and duty cycle are printed before decoding.
+
+With --learn, the frames that could not be decoded are used to learn the protocol of
+an unknown remote (which requires numpy), and its specification is printed as JSON.
+
+With --multichannel, a CSV export of multiple channels is decoded, one process per
+channel, and the events of all channels are printed in time order.
 """
 
-import csv
-import logging
+import json
 
 import click
 
-import pysdrc.decoder
+from pysdrc import saleae, sinks
 
 
-def times_to_pulses(times):
-    previous_pulse_time = 0
-    signal = []
-    for pulse_time in times:
-        pulse_duration = int((pulse_time - previous_pulse_time) * 1_000_000)
-        previous_pulse_time = pulse_time
-        if pulse_duration > 10000:
-            if signal:
-                yield signal
-            signal = []
-            continue
-        signal.append(pulse_duration)
+def _decode(input):
+    if input.endswith(".bin"):
+        from pysdrc import saleae_binary
 
+        yield from saleae_binary.decode_binary(input)
+    else:
+        with open(input, newline="") as input_file:
+            yield from saleae.decode_csv(input_file)
 
-def extract_times_from_reader(reader):
-    next(reader)  # Ignore the headers
-    next(reader)  # Ignore the starting state
 
-    return [float(pulse_time) for pulse_time, _ in reader]
+def _decode_carrier(input):
+    import numpy as np
 
+    from pysdrc import demodulate
 
-def try_all_decoders(pulses):
-    try:
-        code = pysdrc.decoder.decode_sirc(pulses)
-        return "SIRC", code
-    except pysdrc.decoder.SIRCDecodeException as e:  # failed to decode
-        logging.debug(f"Failed to decode as SIRC: {e.args}")
+    if input.endswith(".bin"):
+        from pysdrc import saleae_binary
 
-    try:
-        code = pysdrc.decoder.decode_nec(pulses)
-        return "NEC", code
-    except pysdrc.decoder.NECDecodeException as e:
-        logging.debug(f"Failed to decode as NEC: {e.args}")
+        times = saleae_binary.read_transitions(input)
+    else:
+        with open(input, newline="") as input_file:
+            times = np.fromiter(saleae.read_csv_times(input_file), dtype=np.float64)
 
-    return "RAW", pulses
+    times, carrier = demodulate.demodulate(times)
+    click.echo(
+        f"Carrier: {carrier.frequency / 1000:.1f} kHz, "
+        f"duty cycle {carrier.duty_cycle:.0%}",
+        err=True,
+    )
 
+    yield from saleae.decode_frames(saleae.times_to_frames(times))
 
-@click.command()
-@click.argument("input", type=click.File())
-def convert(input):
-    reader = csv.reader(input)
 
-    for pulses in times_to_pulses(extract_times_from_reader(reader)):
-        code_type, code = try_all_decoders(pulses)
-        print(f"Decoded as {code_type}: {code}")
+@click.command()
+@click.argument("input", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "output_format", type=click.Choice(sorted(sinks.SINKS)))
+@click.option("--output", type=click.Path(dir_okay=False, writable=True))
+@click.option("--carrier", is_flag=True, help="Demodulate a capture of the carrier.")
+@click.option("--learn", "learn_name", help="Learn the protocol of undecoded frames.")
+@click.option("--multichannel", is_flag=True, help="Decode all the channels of a CSV.")
+def convert(input, output_format, output, carrier, learn_name, multichannel):
+    if multichannel:
+        if output_format or carrier or learn_name is not None:
+            raise click.UsageError(
+                "--multichannel cannot be combined with --format, --carrier or --learn"
+            )
+
+        from pysdrc import multichannel as multichannel_decoder
+
+        with open(input, newline="") as input_file:
+            for event in multichannel_decoder.decode_csv_channels(input_file):
+                print(f"{event.channel}: Decoded as {event.protocol}: {event.code}")
+        return
+
+    events = _decode_carrier(input) if carrier else _decode(input)
+
+    if learn_name is not None:
+        from pysdrc import learn
+
+        try:
+            spec = learn.learn_events(events, name=learn_name)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        print(json.dumps(spec))
+        return
+
+    if output_format is None:
+        for event in events:
+            print(f"Decoded as {event.protocol}: {event.code}")
+        return
+
+    if output is None:
+        raise click.UsageError("--output is required with --format")
+
+    if output_format == "parquet":
+        output_file = open(output, "wb")
+    else:
+        output_file = open(output, "w", newline="")
+
+    with output_file, sinks.SINKS[output_format](output_file) as sink:
+        sink.write_all(events)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,220 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Asynchronous streams of decoded events.
+
+A source is an async iterator of (timestamp, pulses) frames, the same as generated by
+pysdrc.saleae.times_to_frames. Sources are provided for Saleae CSV captures, for
+PulseIn-like objects, and for asyncio streams (such as a socket or a pipe) carrying
+one pulse duration per line.
+
+An EventStream decodes the frames of a source, and delivers the resulting
+pysdrc.saleae.CaptureEvent objects to any number of subscribers, each with its own
+bounded queue. A subscriber that falls behind either slows down the stream
+(backpressure), or has its oldest events dropped, so memory use stays bounded.
+
+All the streams run as tasks in the same event loop, so a single process can serve
+many receivers without a thread for each.
+
+Example:
+
+    async def main():
+        reader, _ = await asyncio.open_connection("receiver.local", 8000)
+        stream = EventStream(stream_source(reader))
+        subscription = stream.subscribe()
+        asyncio.ensure_future(stream.run())
+
+        async for event in subscription:
+            print(event.protocol, event.code)
+"""
+
+import asyncio
+import time
+
+from pysdrc import decoder, saleae
+
+# Number of frames processed between yields to the event loop, for the sources that
+# read without waiting.
+_YIELD_EVERY = 64
+
+# Marker closing the subscriber queues at the end of the stream.
+_END = object()
+
+
+async def csv_source(input):
+    """Generate the frames of a Saleae CSV export file object."""
+    frames = saleae.times_to_frames(saleae.read_csv_times(input))
+    for count, frame in enumerate(frames, 1):
+        yield frame
+        if not count % _YIELD_EVERY:
+            await asyncio.sleep(0)
+
+
+class _FrameSplitter:
+    """Split a sequence of pulse durations into frames at the gaps."""
+
+    def __init__(self) -> None:
+        self.pulses: list = []
+        self.start = 0.0
+
+    def push(self, duration: int, timestamp: float):
+        """Add a duration, returning the frame it completes, if any."""
+        if duration > decoder.FRAME_GAP:
+            return self.flush()
+
+        if not self.pulses:
+            self.start = timestamp
+        self.pulses.append(duration)
+        return None
+
+    def flush(self):
+        frame = None
+        if self.pulses:
+            frame = (self.start, self.pulses)
+        self.pulses = []
+        return frame
+
+
+async def stream_source(reader):
+    """Generate the frames from an asyncio.StreamReader, until the end of the stream.
+
+    Each line carries one pulse duration in usec, in the same order as PulseIn records
+    them. The timestamps of the frames are computed from the durations, in seconds
+    from the first one.
+    """
+    splitter = _FrameSplitter()
+    now = 0.0
+
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+
+        line = line.strip()
+        if not line:
+            continue
+
+        duration = int(line)
+        frame = splitter.push(duration, now)
+        now += duration / 1_000_000
+        if frame:
+            yield frame
+
+    frame = splitter.flush()
+    if frame:
+        yield frame
+
+
+async def pulsein_source(pulsein, interval: float = 0.005, monotonic=time.monotonic):
+    """Generate the frames received by a PulseIn-like object, forever.
+
+    The pulsein is polled every interval seconds. A frame is complete when a gap is
+    recorded, or when no pulse has been received for longer than a gap. The timestamps
+    are from monotonic(), at the time the first pulse of the frame was seen.
+    """
+    splitter = _FrameSplitter()
+    idle_timeout = decoder.FRAME_GAP / 1_000_000
+    last_received = monotonic()
+
+    while True:
+        now = monotonic()
+        if len(pulsein):
+            last_received = now
+            while len(pulsein):
+                frame = splitter.push(pulsein.popleft(), now)
+                if frame:
+                    yield frame
+        elif now - last_received > idle_timeout:
+            frame = splitter.flush()
+            if frame:
+                yield frame
+
+        await asyncio.sleep(interval)
+
+
+class Subscription:
+    """Bounded queue of the events of an EventStream, iterated with async for.
+
+    If drop is set, a full queue drops its oldest event (counting it in dropped)
+    instead of making the stream wait.
+    """
+
+    def __init__(self, maxsize: int, drop: bool) -> None:
+        self.maxsize = maxsize
+        self.drop = drop
+        self.dropped = 0
+        # Created on first use, as queues need to be created within the running loop.
+        self._queue: "asyncio.Queue | None" = None
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.maxsize)
+        return self._queue
+
+    async def _put(self, event) -> None:
+        queue = self.queue
+        if self.drop and queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        await queue.put(event)
+
+    def _end_now(self) -> None:
+        queue = self.queue
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(_END)
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self):
+        event = await self.queue.get()
+        if event is _END:
+            # Keep the marker, so that iterating again ends immediately.
+            self.queue.put_nowait(_END)
+            raise StopAsyncIteration
+        return event
+
+
+class EventStream:
+    """Decode the frames of a source, and deliver the events to the subscribers."""
+
+    def __init__(self, source, decode=decoder.decode_any) -> None:
+        self._source = source
+        self._decode = decode
+        self._subscriptions: list = []
+        self.frames = 0
+
+    def subscribe(self, maxsize: int = 64, drop: bool = False) -> Subscription:
+        """Add a subscriber, receiving the events decoded after this call."""
+        subscription = Subscription(maxsize, drop)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.remove(subscription)
+
+    async def run(self) -> None:
+        """Decode the source until its end, then end all the subscriptions."""
+        decode = self._decode
+
+        try:
+            async for timestamp, pulses in self._source:
+                self.frames += 1
+                result = decode(pulses)
+                event = saleae.CaptureEvent(
+                    timestamp, result.protocol, result.code, len(pulses), result.reason
+                )
+                for subscription in self._subscriptions:
+                    await subscription._put(event)
+        except BaseException:
+            # Do not wait for the subscribers if the stream failed or was cancelled.
+            for subscription in self._subscriptions:
+                subscription._end_now()
+            raise
+
+        for subscription in self._subscriptions:
+            await subscription._put(_END)
@@ -0,0 +1,213 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Vectorized decoders for large batches of frames.
+
+These decoders apply the same rules as pysdrc.decoder.decode_sirc and
+pysdrc.decoder.decode_nec, but operate on a whole batch of frames at once using numpy
+array operations. They are meant for host-side processing of long captures, and are
+not available on CircuitPython.
+
+Frames are provided as a 2-D array (frames × pulses), padded to the longest frame,
+together with an optional array of the actual length of each frame. A flat buffer of
+pulses with frame offsets can be converted with frames_from_buffer().
+
+Instead of raising exceptions, each decoder returns a per-frame error code, one of the
+DECODE_* constants from pysdrc.decoder. Fields of frames that failed to decode are set
+to -1.
+"""
+
+import collections
+
+import numpy as np
+
+from pysdrc import decoder, timings
+
+SIRCBatch = collections.namedtuple(
+    "SIRCBatch", ["commands", "devices", "extended", "errors"]
+)
+
+NECBatch = collections.namedtuple(
+    "NECBatch", ["addresses", "commands", "repeats", "errors"]
+)
+
+
+def frames_from_buffer(buffer, offsets):
+    """Convert a flat buffer of pulses into a padded 2-D array of frames.
+
+    The offsets are the boundaries of each frame in the buffer, so that frame N is
+    buffer[offsets[N]:offsets[N + 1]]. Returns a tuple of the frames array and the
+    array of the frame lengths, suitable to pass to the batch decoders.
+    """
+
+    buffer = np.asarray(buffer)
+    offsets = np.asarray(offsets, dtype=np.intp)
+
+    lengths = np.diff(offsets)
+    width = int(lengths.max()) if len(lengths) else 0
+
+    frames = np.zeros((len(lengths), width), dtype=buffer.dtype)
+    if len(lengths):
+        # The valid cells of the frames array, in row-major order, are exactly the
+        # pulses of the buffer in sequence.
+        valid = np.arange(width) < lengths[:, np.newaxis]
+        first, last = offsets[0], offsets[-1]
+        frames[valid] = buffer[first:last]
+
+    return frames, lengths
+
+
+def _prepare_frames(frames, lengths, min_width: int):
+    frames = np.asarray(frames)
+    if frames.ndim != 2:
+        raise ValueError("Expected a 2-D array of frames, got %d-D" % frames.ndim)
+
+    count, width = frames.shape
+
+    if lengths is None:
+        lengths = np.full(count, width, dtype=np.intp)
+    else:
+        lengths = np.asarray(lengths, dtype=np.intp)
+        if lengths.shape != (count,):
+            raise ValueError(
+                "Expected %d frame lengths, got %d" % (count, lengths.size)
+            )
+
+    # Pad the array so that the fixed-position slices below are always valid.
+    if width < min_width:
+        frames = np.pad(frames, ((0, 0), (0, min_width - width)))
+
+    return frames, lengths
+
+
+def _pulses_to_bits(frames, lengths, start: int, count: int):
+    """Vectorized equivalent of pysdrc.decoder._pulses_to_bits.
+
+    Pairs up the pulses starting at the provided column, and returns a (frames × count)
+    boolean array of the decoded bits. Pairs beyond the end of a frame are decoded as
+    zero, the same as they would be missing from the scalar decode.
+    """
+
+    end = start + 2 * count
+    evens = frames[:, start:end:2]
+    odd_start, odd_end = start + 1, end + 1
+    odds = frames[:, odd_start:odd_end:2]
+
+    bits = odds > evens * timings.BIT_RATIO
+
+    # A pair is only complete if its odd pulse is within the frame.
+    pair_ends = start + 1 + 2 * np.arange(count)
+    bits &= pair_ends < lengths[:, np.newaxis]
+
+    return bits
+
+
+def _bits_to_value_lsb(bits):
+    weights = np.left_shift(1, np.arange(bits.shape[1], dtype=np.int64))
+    return bits.astype(np.int64) @ weights
+
+
+def decode_sirc_batch(frames, lengths=None) -> SIRCBatch:
+    """Decode a batch of SIRC (Sony) frames.
+
+    The extended field is -1 for frames that are not 20-bit commands.
+    """
+
+    frames, lengths = _prepare_frames(frames, lengths, max(timings.SIRC_LENGTHS))
+    count = len(lengths)
+
+    errors = np.full(count, decoder.DECODE_OK, dtype=np.uint8)
+
+    bad_length = ~np.isin(lengths, timings.SIRC_LENGTHS)
+    errors[bad_length] = decoder.DECODE_BAD_LENGTH
+
+    header = frames[:, 0]
+    bad_header = ~bad_length & (
+        (header < timings.SIRC_HEADER_MIN) | (header > timings.SIRC_HEADER_MAX)
+    )
+    errors[bad_header] = decoder.DECODE_BAD_HEADER
+
+    bits = _pulses_to_bits(frames, lengths, 1, 20)
+
+    is_15bit = lengths == 31
+    is_20bit = lengths == 41
+
+    commands = _bits_to_value_lsb(bits[:, 0:7])
+    devices = np.where(
+        is_15bit,
+        _bits_to_value_lsb(bits[:, 7:15]),
+        _bits_to_value_lsb(bits[:, 7:12]),
+    )
+    extended = np.where(is_20bit, _bits_to_value_lsb(bits[:, 12:20]), -1)
+
+    failed = errors != decoder.DECODE_OK
+    commands[failed] = -1
+    devices[failed] = -1
+    extended[failed] = -1
+
+    return SIRCBatch(commands, devices, extended, errors)
+
+
+def decode_nec_batch(frames, lengths=None) -> NECBatch:
+    """Decode a batch of (extended) NEC frames.
+
+    Frames that decode as a repeat code are flagged in the repeats field, and have
+    their address and command set to -1.
+    """
+
+    frames, lengths = _prepare_frames(frames, lengths, max(timings.NEC_LENGTHS))
+    count = len(lengths)
+
+    errors = np.full(count, decoder.DECODE_OK, dtype=np.uint8)
+
+    bad_length = ~np.isin(lengths, timings.NEC_LENGTHS)
+    errors[bad_length] = decoder.DECODE_BAD_LENGTH
+    pending = ~bad_length
+
+    agc_pulse = frames[:, 0]
+    bad_header = pending & (
+        (agc_pulse < timings.NEC_AGC_PULSE_MIN)
+        | (agc_pulse > timings.NEC_AGC_PULSE_MAX)
+    )
+    errors[bad_header] = decoder.DECODE_BAD_HEADER
+    pending &= ~bad_header
+
+    agc_space = frames[:, 1]
+    repeats = (
+        pending
+        & (agc_space >= timings.NEC_REPEAT_SPACE_MIN)
+        & (agc_space <= timings.NEC_REPEAT_SPACE_MAX)
+        & (frames[:, 2] >= timings.NEC_REPEAT_MARK_MIN)
+        & (frames[:, 2] <= timings.NEC_REPEAT_MARK_MAX)
+    )
+    pending &= ~repeats
+
+    bad_space = pending & (
+        (agc_space < timings.NEC_HEADER_SPACE_MIN)
+        | (agc_space > timings.NEC_HEADER_SPACE_MAX)
+    )
+    errors[bad_space] = decoder.DECODE_BAD_HEADER_SPACE
+    pending &= ~bad_space
+
+    bits = _pulses_to_bits(frames, lengths, 2, 32)
+
+    commands = _bits_to_value_lsb(bits[:, 16:24])
+    commands_inverted = _bits_to_value_lsb(bits[:, 24:32])
+
+    bad_checksum = pending & (commands_inverted != (~commands & 0xFF))
+    errors[bad_checksum] = decoder.DECODE_BAD_CHECKSUM
+
+    addresses = _bits_to_value_lsb(bits[:, 0:8])
+    addresses_inverted = _bits_to_value_lsb(bits[:, 8:16])
+    addresses = np.where(
+        addresses_inverted == (~addresses & 0xFF),
+        addresses,
+        addresses | (addresses_inverted << 8),
+    )
+
+    failed = repeats | (errors != decoder.DECODE_OK)
+    addresses[failed] = -1
+    commands[failed] = -1
+
+    return NECBatch(addresses, commands, repeats, errors)
@@ -0,0 +1,9 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Benchmarks for the encoder and decoder hot paths.
+
+Run with `python -m pysdrc.benchmarks`, optionally passing --output to store the
+results as JSON, and --baseline to compare against a previous run.
+"""
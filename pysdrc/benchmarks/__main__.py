@@ -0,0 +1,64 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Run the encoder and decoder benchmarks on a synthetic corpus."""
+
+import argparse
+import json
+import sys
+
+from pysdrc.benchmarks import corpus, runner
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m pysdrc.benchmarks", description=__doc__
+    )
+    parser.add_argument("--count", type=int, default=10000, help="Frames in corpus.")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed.")
+    parser.add_argument(
+        "--jitter", type=float, default=0.05, help="Relative timing jitter."
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs.")
+    parser.add_argument(
+        "--benchmark",
+        action="append",
+        dest="names",
+        help="Benchmark to run (can be repeated, defaults to all).",
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", help="Compare against results in this file.")
+    args = parser.parse_args(argv)
+
+    results = runner.run_benchmarks(
+        corpus.Corpus(count=args.count, seed=args.seed, jitter=args.jitter),
+        names=args.names,
+        repeat=args.repeat,
+    )
+
+    ratios = {}
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            ratios = runner.compare(results, json.load(baseline_file))
+
+    for name, result in results["benchmarks"].items():
+        line = "%-20s %12.0f frames/s %10.1f peak bytes/frame %6.2f blocks/frame" % (
+            name,
+            result["frames_per_second"] or 0,
+            result["peak_bytes_per_frame"],
+            result["blocks_per_frame"],
+        )
+        if name in ratios:
+            line += " %6.2fx" % ratios[name]
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Repeatable synthetic corpus of infrared traffic."""
+
+import random
+
+from pysdrc import encoder
+
+# Relative weight of each kind of frame in the generated corpus.
+DEFAULT_MIX = {
+    "SIRC12": 3,
+    "SIRC15": 1,
+    "SIRC20": 1,
+    "NEC": 3,
+    "NEC_REPEAT": 2,
+    "GARBAGE": 1,
+}
+
+
+def _encode(kind: str, rng: random.Random):
+    """Return the encoder arguments and the pulses for a frame of the given kind."""
+    args: tuple
+    if kind == "SIRC12":
+        args = (rng.randrange(2**7), rng.randrange(2**5))
+        return args, encoder.encode_sirc(*args)
+    elif kind == "SIRC15":
+        args = (rng.randrange(2**7), rng.randrange(2**5, 2**8))
+        return args, encoder.encode_sirc(*args)
+    elif kind == "SIRC20":
+        args = (rng.randrange(2**7), rng.randrange(2**5), rng.randrange(1, 2**8))
+        return args, encoder.encode_sirc(*args)
+    elif kind == "NEC":
+        args = (rng.randrange(2**8), rng.randrange(2**8))
+        return args, encoder.encode_nec(*args)
+    elif kind == "NEC_REPEAT":
+        return (), list(encoder.NEC_REPEAT)
+    elif kind == "GARBAGE":
+        return (), [rng.randrange(100, 10000) for _ in range(rng.randrange(1, 80))]
+
+    raise ValueError("Unknown frame kind %r" % kind)
+
+
+class Corpus:
+    """A set of frames generated from a fixed seed.
+
+    Each frame is a (kind, encoder arguments, pulses) tuple. The pulses have the
+    jitter applied, and SIRC frames lack the trailing space, as they would be
+    captured by a receiver.
+    """
+
+    def __init__(
+        self, count: int = 10000, seed: int = 0, jitter: float = 0.05, mix=None
+    ) -> None:
+        if mix is None:
+            mix = DEFAULT_MIX
+
+        self.seed = seed
+        self.jitter = jitter
+
+        rng = random.Random(seed)
+        kinds = sorted(mix)
+        weights = [mix[kind] for kind in kinds]
+
+        self.frames = []
+        for kind in rng.choices(kinds, weights, k=count):
+            args, pulses = _encode(kind, rng)
+            if kind.startswith("SIRC"):
+                pulses = pulses[:-1]
+            pulses = [
+                max(1, int(pulse * rng.uniform(1 - jitter, 1 + jitter)))
+                for pulse in pulses
+            ]
+            self.frames.append((kind, args, pulses))
+
+        # Gap between the end of a frame and the start of the next one, in seconds.
+        self.gaps = [rng.uniform(0.015, 0.1) for _ in range(count)]
+
+    def pulses(self, *kinds) -> list:
+        """Return the pulses of the frames of the given kinds (or all of them)."""
+        return [pulses for kind, _, pulses in self.frames if not kinds or kind in kinds]
+
+    def arguments(self, *kinds) -> list:
+        """Return the encoder arguments of the frames of the given kinds."""
+        return [args for kind, args, _ in self.frames if kind in kinds]
+
+    def times(self) -> list:
+        """Return the corpus as a capture of transition times, in seconds."""
+        times = []
+        time = 0.1
+        for (_, _, pulses), gap in zip(self.frames, self.gaps):
+            times.append(time)
+            for pulse in pulses:
+                time += pulse / 1_000_000
+                times.append(time)
+            time += gap
+        return times
@@ -0,0 +1,197 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Runner for the encoder and decoder benchmarks."""
+
+import collections
+import itertools
+import platform
+import time
+import tracemalloc
+
+from pysdrc import decoder, encoder, fingerprint, saleae
+
+# A benchmark calls function once for each of the items, each call covering
+# frames_per_call frames of the corpus.
+Benchmark = collections.namedtuple(
+    "Benchmark", ["function", "items", "frames_per_call"]
+)
+
+_SIRC_KINDS = ("SIRC12", "SIRC15", "SIRC20")
+_NEC_KINDS = ("NEC", "NEC_REPEAT")
+
+
+def _try_decode(decode):
+    def try_decode(pulses):
+        try:
+            return decode(pulses)
+        except decoder.DecodeException:
+            return None
+
+    return try_decode
+
+
+def _consume(iterator):
+    for _ in iterator:
+        pass
+
+
+def build_benchmarks(corpus) -> dict:
+    """Return the available benchmarks for the corpus, by name."""
+    sirc_pulses = corpus.pulses(*_SIRC_KINDS)
+    times = corpus.times()
+
+    garbage = corpus.pulses("GARBAGE")
+    index = fingerprint.FingerprintIndex()
+    for position, pulses in enumerate(garbage):
+        index.add(pulses, position)
+
+    benchmarks = {
+        "encode_sirc": Benchmark(
+            lambda args: encoder.encode_sirc(*args), corpus.arguments(*_SIRC_KINDS), 1
+        ),
+        "encode_nec": Benchmark(
+            lambda args: encoder.encode_nec(*args), corpus.arguments("NEC"), 1
+        ),
+        "decode_sirc": Benchmark(
+            _try_decode(decoder.decode_sirc), corpus.pulses(*_SIRC_KINDS), 1
+        ),
+        "decode_nec": Benchmark(
+            _try_decode(decoder.decode_nec), corpus.pulses(*_NEC_KINDS), 1
+        ),
+        "try_decode_sirc": Benchmark(
+            decoder.try_decode_sirc, corpus.pulses(*_SIRC_KINDS), 1
+        ),
+        "try_decode_nec": Benchmark(
+            decoder.try_decode_nec, corpus.pulses(*_NEC_KINDS), 1
+        ),
+        "pulses_to_bits": Benchmark(
+            decoder._pulses_to_bits, [pulses[1:] for pulses in sirc_pulses], 1
+        ),
+        "decode_any": Benchmark(decoder.decode_any, corpus.pulses(), 1),
+        "fingerprint_lookup": Benchmark(index.lookup, garbage, 1),
+        "times_to_frames": Benchmark(
+            lambda times: _consume(saleae.times_to_frames(times)),
+            [times],
+            len(corpus.frames),
+        ),
+    }
+
+    try:
+        from pysdrc import batch
+    except ImportError:
+        return benchmarks
+
+    frames, lengths = batch.frames_from_buffer(
+        [pulse for pulses in corpus.pulses() for pulse in pulses],
+        [0] + list(itertools.accumulate(len(pulses) for pulses in corpus.pulses())),
+    )
+    benchmarks["decode_sirc_batch"] = Benchmark(
+        lambda args: batch.decode_sirc_batch(*args),
+        [(frames, lengths)],
+        len(corpus.frames),
+    )
+    benchmarks["decode_nec_batch"] = Benchmark(
+        lambda args: batch.decode_nec_batch(*args),
+        [(frames, lengths)],
+        len(corpus.frames),
+    )
+
+    return benchmarks
+
+
+def _time(benchmark, repeat: int) -> float:
+    function = benchmark.function
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in benchmark.items:
+            function(item)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best or 0.0
+
+
+def _allocations(benchmark, samples: int) -> tuple:
+    """Return the heap allocations of the sampled calls, per frame.
+
+    Returns the peak of the transient heap allocations (in bytes), and the number of
+    memory blocks still allocated (for the results) when each call returns, summed
+    over the calls and divided by the frames they cover, so that the benchmarks that
+    cover the whole corpus in a single call compare with the per-frame ones.
+    """
+    function = benchmark.function
+    items = benchmark.items[:samples]
+    peak_bytes = 0
+    blocks = 0
+
+    tracemalloc.start()
+    try:
+        for item in items:
+            # Clearing the traces also resets the peak of traced memory.
+            tracemalloc.clear_traces()
+            result = function(item)
+            peak_bytes += tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot()
+            blocks += sum(stat.count for stat in snapshot.statistics("filename"))
+            del result
+    finally:
+        tracemalloc.stop()
+
+    frames = len(items) * benchmark.frames_per_call
+    return peak_bytes / frames, blocks / frames
+
+
+def run_benchmarks(corpus, names=None, repeat: int = 3, samples: int = 100) -> dict:
+    """Run the selected benchmarks (or all of them), returning the results."""
+    benchmarks = build_benchmarks(corpus)
+    if names is None:
+        names = sorted(benchmarks)
+
+    results = {}
+    for name in names:
+        benchmark = benchmarks[name]
+        frames = len(benchmark.items) * benchmark.frames_per_call
+        if not frames:
+            continue
+
+        seconds = _time(benchmark, repeat)
+        peak_bytes, blocks = _allocations(benchmark, samples)
+        results[name] = {
+            "frames": frames,
+            "seconds": seconds,
+            "frames_per_second": frames / seconds if seconds else None,
+            "peak_bytes_per_frame": peak_bytes,
+            "blocks_per_frame": blocks,
+            "frames_per_call": benchmark.frames_per_call,
+        }
+
+    return {
+        "python": {
+            "implementation": platform.python_implementation(),
+            "version": platform.python_version(),
+        },
+        "corpus": {
+            "count": len(corpus.frames),
+            "seed": corpus.seed,
+            "jitter": corpus.jitter,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    """Return the speed of each benchmark relative to the baseline results."""
+    ratios = {}
+    for name, result in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous or not previous["frames_per_second"]:
+            continue
+        if result["frames_per_second"] is None:
+            continue
+        ratios[name] = result["frames_per_second"] / previous["frames_per_second"]
+
+    return ratios
@@ -0,0 +1,146 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Bounded cache of pre-encoded pulse buffers.
+
+Encoding a command validates its fields and rebuilds the pulse list bit by bit, and
+transmitting it requires converting the list to an array. When the same few commands
+are sent over and over, a PulseCache keeps the ready-to-send arrays around instead,
+evicting the least recently used ones once the configured size is reached.
+
+The returned arrays are shared between all the callers requesting the same command,
+and must be treated as read-only.
+"""
+
+import array
+import collections
+
+from pysdrc import encoder
+
+
+def _encode_array(encode, *args) -> array.array:
+    return array.array("H", encode(*args))
+
+
+def _encode_segments(encode, *args) -> tuple:
+    return tuple(
+        (array.array("H", pulses), pause)
+        for pulses, pause in encoder.burst_segments(encode(*args))
+    )
+
+
+class PulseCache:
+    """Least-recently-used cache of encoded pulse arrays."""
+
+    def __init__(self, maxsize: int = 32) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize should be at least 1, got %d" % maxsize)
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()  # type: collections.OrderedDict
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drop all the cached entries and reset the counters."""
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key, make, args):
+        entries = self._entries
+
+        value = entries.pop(key, None)
+        if value is not None:
+            self.hits += 1
+            entries[key] = value
+            return value
+
+        self.misses += 1
+        value = make(*args)
+
+        if len(entries) >= self.maxsize:
+            del entries[next(iter(entries))]
+        entries[key] = value
+
+        return value
+
+    def get(self, key, encode, *args) -> array.array:
+        """Return the cached pulses for key, calling encode(*args) on a miss."""
+        return self._lookup(key, _encode_array, (encode,) + args)
+
+    def get_burst(self, key, encode, *args) -> tuple:
+        """Return the cached burst segments for key, calling encode(*args) on a miss.
+
+        The segments are returned as by pysdrc.encoder.burst_segments(), with the
+        pulses of each one as an array.
+        """
+        return self._lookup(key, _encode_segments, (encode,) + args)
+
+    def encode_sirc(
+        self,
+        command: int,
+        device: int,
+        extended_device=None,
+        force_8bit_device: bool = False,
+    ) -> array.array:
+        """Cached equivalent of pysdrc.encoder.encode_sirc."""
+        return self.get(
+            ("SIRC", command, device, extended_device, force_8bit_device),
+            encoder.encode_sirc,
+            command,
+            device,
+            extended_device,
+            force_8bit_device,
+        )
+
+    def encode_nec(self, address: int, command: int) -> array.array:
+        """Cached equivalent of pysdrc.encoder.encode_nec."""
+        return self.get(
+            ("NEC", command, address, None, False),
+            encoder.encode_nec,
+            address,
+            command,
+        )
+
+    def encode_sirc_burst(
+        self,
+        command: int,
+        device: int,
+        extended_device=None,
+        force_8bit_device: bool = False,
+        repeat: int = 4,
+    ) -> tuple:
+        """Cached segments of pysdrc.encoder.encode_sirc_burst."""
+        return self.get_burst(
+            ("SIRC", command, device, extended_device, force_8bit_device, repeat),
+            encoder.encode_sirc_burst,
+            command,
+            device,
+            extended_device,
+            force_8bit_device,
+            repeat,
+        )
+
+    def encode_nec_burst(self, address: int, command: int, repeat: int = 1) -> tuple:
+        """Cached segments of pysdrc.encoder.encode_nec_burst."""
+        return self.get_burst(
+            ("NEC", command, address, None, False, repeat),
+            encoder.encode_nec_burst,
+            address,
+            command,
+            repeat,
+        )
+
+    def stats(self) -> dict:
+        """Return the counters of the cache, to help sizing it."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
@@ -0,0 +1,48 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+# SPDX-FileCopyrightText: 2020 Facebook Inc.
+#
+# SPDX-License-Identifier: MIT
+
+"""Hardware backends for the infrared transmitters.
+
+A backend provides the PulseOut objects used by the transmitters, and the clock used
+to wait between transmissions. PulseioBackend uses CircuitPython's pulseio module, and
+is the default. pysdrc.loopback.LoopbackBackend simulates the hardware on a host
+computer.
+
+This module is imported on the boards, so it only uses modules available on
+CircuitPython.
+"""
+
+import sys
+import time
+
+# This is very annoying: different CircuitPython ports have different interfaces
+# for the PulseOut class, so we need to abstract the PulseOut creation ourselves.
+_PULSEOUT_NO_CARRIER_PLATFORMS = {"Espressif ESP32-S2"}
+
+
+class PulseioBackend:
+    """Backend using CircuitPython's pulseio module."""
+
+    def __init__(self) -> None:
+        import pulseio
+
+        self._pulseio = pulseio
+
+    def make_pulseout(self, pin, carrier_frequency: int, duty_cycle: int):
+        if sys.platform in _PULSEOUT_NO_CARRIER_PLATFORMS:
+            return self._pulseio.PulseOut(
+                pin=pin, frequency=carrier_frequency, duty_cycle=duty_cycle
+            )
+
+        pwm = self._pulseio.PWMOut(
+            pin, frequency=carrier_frequency, duty_cycle=duty_cycle
+        )
+        return self._pulseio.PulseOut(pwm)
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
@@ -0,0 +1,129 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Non-blocking transmission queue for infrared remote transmitters.
+
+Transmitter.transmit_pulses blocks for the whole duration of the transmission,
+including the pauses between repeats. A TransmitQueue instead runs as an asyncio task
+(using CircuitPython's asyncio library), waiting between repeats with asyncio.sleep so
+that other tasks (input handling, decoding) keep running.
+
+Queued commands are sent in order of priority (higher first), and then in order of
+submission. Queueing a command that is already waiting to be sent does not add a
+second copy, but can raise the priority of the queued one.
+
+Example:
+
+    queue = TransmitQueue(transmitter.SIRCTransmitter(board.D5))
+
+    async def main():
+        asyncio.create_task(queue.run())
+        queue.send_command(18, 1)
+        ...
+"""
+
+import asyncio
+
+
+class _Entry:
+    def __init__(self, pulses, repeat: int, priority: int, sequence: int) -> None:
+        self.pulses = pulses
+        self.repeat = repeat
+        self.priority = priority
+        self.sequence = sequence
+
+    def before(self, other) -> bool:
+        if self.priority != other.priority:
+            return self.priority > other.priority
+        return self.sequence < other.sequence
+
+
+class TransmitQueue:
+    """Queue of commands to send through a Transmitter from an asyncio task."""
+
+    def __init__(self, transmitter, gap: float = 0.025, maxlen: int = 16) -> None:
+        self._transmitter = transmitter
+        self._gap = gap
+        self._maxlen = maxlen
+        self._entries: list = []
+        self._sequence = 0
+        self._sending = False
+        # Created by run(), as events need to be created within the running loop.
+        self._ready: "asyncio.Event | None" = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def send_pulses(self, pulses, repeat=None, priority: int = 0) -> bool:
+        """Queue a set of pre-calculated pulses for transmission.
+
+        Returns False if the same pulses were already queued, in which case the queued
+        entry is kept, with the highest of the two priorities and repeat counts.
+        """
+        if not repeat:
+            repeat = self._transmitter.default_repeat
+
+        for index, entry in enumerate(self._entries):
+            if entry.pulses == pulses:
+                entry.repeat = max(entry.repeat, repeat)
+                if priority > entry.priority:
+                    entry.priority = priority
+                    self._entries.pop(index)
+                    self._insert(entry)
+                return False
+
+        if len(self._entries) >= self._maxlen:
+            raise RuntimeError("Transmit queue full (%d entries)" % self._maxlen)
+
+        self._sequence += 1
+        self._insert(_Entry(pulses, repeat, priority, self._sequence))
+        return True
+
+    def send_command(self, *args, repeat=None, priority: int = 0, **kwargs) -> bool:
+        """Queue a command, encoded by the transmitter's encode_command()."""
+        return self.send_pulses(
+            self._transmitter.encode_command(*args, **kwargs),
+            repeat=repeat,
+            priority=priority,
+        )
+
+    def clear(self) -> None:
+        """Drop all the commands waiting to be sent."""
+        self._entries.clear()
+
+    def _insert(self, new_entry) -> None:
+        entries = self._entries
+        position = len(entries)
+        for index, entry in enumerate(entries):
+            if new_entry.before(entry):
+                position = index
+                break
+        entries.insert(position, new_entry)
+
+        if self._ready is not None:
+            self._ready.set()
+
+    async def join(self) -> None:
+        """Wait until all the queued commands have been sent."""
+        while self._entries or self._sending:
+            await asyncio.sleep(self._gap)
+
+    async def run(self) -> None:
+        """Send the queued commands, forever."""
+        ready = self._ready = asyncio.Event()
+
+        while True:
+            if not self._entries:
+                ready.clear()
+                await ready.wait()
+                continue
+
+            entry = self._entries.pop(0)
+            self._sending = True
+            try:
+                for _ in range(entry.repeat):
+                    self._transmitter.send(entry.pulses)
+                    await asyncio.sleep(self._gap)
+            finally:
+                self._sending = False
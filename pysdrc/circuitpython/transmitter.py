@@ -27,16 +27,16 @@ And has been confirmed not working on Feather S2.
 """
 
 import array
-import sys
-import time
-
-import pulseio
 
 from pysdrc import encoder
+from pysdrc.circuitpython import backend as _backend
+
 
-# This is very annoying: different CircuitPython ports have different interfaces
-# for the PulseOut class, so we need to abstract the PulseOut creation ourselves.
-_PULSEOUT_NO_CARRIER_PLATFORMS = {"Espressif ESP32-S2"}
+def _burst_segments(pulses) -> list:
+    return [
+        (array.array("H", segment), pause)
+        for segment, pause in encoder.burst_segments(pulses)
+    ]
 
 
 class Transmitter:
@@ -48,16 +48,22 @@ class Transmitter:
         carrier_frequency: int = 38_000,
         duty_cycle: int = 2**15,
         default_repeat: int = 1,
+        pulse_cache=None,
+        burst: bool = False,
+        backend=None,
     ) -> None:
-        if sys.platform in _PULSEOUT_NO_CARRIER_PLATFORMS:
-            self._pulseout = pulseio.PulseOut(
-                pin=pin, frequency=carrier_frequency, duty_cycle=duty_cycle
-            )
-        else:
-            self._pwm = pulseio.PWMOut(
-                pin, frequency=carrier_frequency, duty_cycle=duty_cycle
-            )
-            self._pulseout = pulseio.PulseOut(self._pwm)
+        # The backend provides the PulseOut and the clock, defaulting to pulseio.
+        if backend is None:
+            backend = _backend.PulseioBackend()
+        self._backend = backend
+        self._pulseout = backend.make_pulseout(pin, carrier_frequency, duty_cycle)
+
+        # Optional pysdrc.cache.PulseCache used to store the encoded commands.
+        self._pulse_cache = pulse_cache
+
+        # When set, repeated commands are sent as a single pre-timed pulse train, with
+        # the protocol's frame period, rather than one frame at a time.
+        self._burst = burst
 
         self._default_repeat = default_repeat
         if default_repeat < 1:
@@ -65,6 +71,43 @@ class Transmitter:
                 "default_repeat should be at least 1, got %d" % default_repeat
             )
 
+    @property
+    def default_repeat(self) -> int:
+        return self._default_repeat
+
+    def send(self, pulses) -> None:
+        """Send a set of pre-calculated pulses once, without waiting afterwards."""
+
+        if isinstance(pulses, array.array):
+            pulse_array = pulses
+        else:
+            pulse_array = array.array("H", pulses)
+
+        self._pulseout.send(pulse_array)
+
+    def send_burst(self, segments) -> None:
+        """Send the (pulses, pause) segments of a burst, as returned by encode_burst().
+
+        Long spaces between frames are waited for between the segments, since
+        PulseOut can only send pulses up to 0xFFFF usec.
+        """
+        for pulses, pause in segments:
+            self.send(pulses)
+            if pause:
+                self._backend.sleep(pause / 1_000_000)
+
+    def transmit_program(self, program) -> None:
+        """Play a compiled pysdrc.macro.Program."""
+        # Only imported when needed, to save RAM on the boards that do not use macros.
+        from pysdrc import macro
+
+        macro.play(
+            program,
+            self.send,
+            sleep=self._backend.sleep,
+            monotonic=self._backend.monotonic,
+        )
+
     def transmit_pulses(self, pulses, repeat=None):
         """Transmit a set of pre-calculated pulses."""
 
@@ -72,11 +115,11 @@ class Transmitter:
             repeat = self._default_repeat
 
         if not isinstance(pulses, array.array):
-            pulse_array = array.array("H", pulses)
+            pulses = array.array("H", pulses)
 
         for _ in range(repeat):
-            self._pulseout.send(pulse_array)
-            time.sleep(0.025)
+            self.send(pulses)
+            self._backend.sleep(0.025)
 
 
 class SIRCTransmitter(Transmitter):
@@ -88,12 +131,58 @@ class SIRCTransmitter(Transmitter):
         carrier_frequency: int = 40_000,
         duty_cycle: int = 2**15,
         default_repeat: int = 4,
+        pulse_cache=None,
+        burst: bool = False,
+        backend=None,
     ) -> None:
         super().__init__(
             pin,
             carrier_frequency=carrier_frequency,
             duty_cycle=duty_cycle,
             default_repeat=default_repeat,
+            pulse_cache=pulse_cache,
+            burst=burst,
+            backend=backend,
+        )
+
+    def encode_command(
+        self,
+        command: int,
+        device: int,
+        extended_device=None,
+        force_8bit_device: bool = False,
+    ):
+        """Encode a command into pulses, using the pulse cache if configured."""
+        if self._pulse_cache is not None:
+            return self._pulse_cache.encode_sirc(
+                command, device, extended_device, force_8bit_device
+            )
+
+        return encoder.encode_sirc(
+            command, device, extended_device, force_8bit_device=force_8bit_device
+        )
+
+    def encode_burst(
+        self,
+        command: int,
+        device: int,
+        extended_device=None,
+        force_8bit_device: bool = False,
+        repeat=None,
+    ):
+        """Encode a repeated command into the segments of a pre-timed burst."""
+        if not repeat:
+            repeat = self._default_repeat
+
+        if self._pulse_cache is not None:
+            return self._pulse_cache.encode_sirc_burst(
+                command, device, extended_device, force_8bit_device, repeat
+            )
+
+        return _burst_segments(
+            encoder.encode_sirc_burst(
+                command, device, extended_device, force_8bit_device, repeat
+            )
         )
 
     def transmit_command(
@@ -104,7 +193,15 @@ class SIRCTransmitter(Transmitter):
         repeat=None,
         force_8bit_device: bool = False,
     ) -> None:
-        pulses = encoder.encode_sirc(
+        if self._burst:
+            self.send_burst(
+                self.encode_burst(
+                    command, device, extended_device, force_8bit_device, repeat
+                )
+            )
+            return
+
+        pulses = self.encode_command(
             command, device, extended_device, force_8bit_device=force_8bit_device
         )
         self.transmit_pulses(pulses, repeat=repeat)
@@ -113,9 +210,41 @@ class SIRCTransmitter(Transmitter):
 class NECTransmitter(Transmitter):
     """Transmitter for NEC remote protocol."""
 
+    def encode_command(self, address: int, command: int):
+        """Encode a command into pulses, using the pulse cache if configured."""
+        if self._pulse_cache is not None:
+            return self._pulse_cache.encode_nec(address, command)
+
+        return encoder.encode_nec(address, command)
+
+    def encode_burst(self, address: int, command: int, repeat=None):
+        """Encode a command followed by repeat codes into the segments of a burst."""
+        if not repeat:
+            repeat = self._default_repeat
+
+        if self._pulse_cache is not None:
+            return self._pulse_cache.encode_nec_burst(address, command, repeat)
+
+        return _burst_segments(encoder.encode_nec_burst(address, command, repeat))
+
     def transmit_command(self, address: int, command: int, repeat=None) -> None:
-        pulses = encoder.encode_nec(address, command)
+        if self._burst:
+            self.send_burst(self.encode_burst(address, command, repeat))
+            return
+
+        pulses = self.encode_command(address, command)
         self.transmit_pulses(pulses, repeat=repeat)
 
     def transmit_repeat(self, repeat=None) -> None:
+        if self._burst:
+            self.send_burst(
+                _burst_segments(
+                    encoder.encode_burst(
+                        [encoder.NEC_REPEAT] * (repeat or self._default_repeat),
+                        encoder.NEC_FRAME_PERIOD,
+                    )
+                )
+            )
+            return
+
         self.transmit_pulses(encoder.NEC_REPEAT, repeat=repeat)
@@ -4,10 +4,56 @@
 
 """Decoder interfaces for SIRC protocol."""
 
+import time
+
+from pysdrc.timings import (
+    BIT_RATIO,
+    BIT_RATIO_DENOMINATOR,
+    BIT_RATIO_NUMERATOR,
+    NEC_AGC_PULSE_MAX,
+    NEC_AGC_PULSE_MIN,
+    NEC_HEADER_SPACE_MAX,
+    NEC_HEADER_SPACE_MIN,
+    NEC_LENGTHS,
+    NEC_REPEAT_MARK_MAX,
+    NEC_REPEAT_MARK_MIN,
+    NEC_REPEAT_SPACE_MAX,
+    NEC_REPEAT_SPACE_MIN,
+    SIRC_HEADER_MAX,
+    SIRC_HEADER_MIN,
+    SIRC_LENGTHS,
+    const,
+)
+
+# Reasons for a set of pulses not to be decoded, as reported by the interfaces that do
+# not raise exceptions (such as the batch decoders in pysdrc.batch).
+DECODE_OK = const(0)
+DECODE_BAD_LENGTH = const(1)
+DECODE_BAD_HEADER = const(2)
+DECODE_BAD_HEADER_SPACE = const(3)
+DECODE_BAD_CHECKSUM = const(4)
+DECODE_INVALID = const(5)
+
+
+# Names of the DECODE_* constants, indexed by their value, as used by the metrics.
+REASON_NAMES = (
+    "ok",
+    "bad_length",
+    "bad_header",
+    "bad_header_space",
+    "bad_checksum",
+    "invalid",
+)
+
 
 class DecodeException(Exception):
     """Raised when a set of pulse timings are not a valid SIRC command."""
 
+    def __init__(self, message: str, reason: int = DECODE_INVALID) -> None:
+        super().__init__(message)
+        # One of the DECODE_* constants, describing why the decode failed.
+        self.reason = reason
+
 
 class SIRCDecodeException(DecodeException):
     pass
@@ -17,6 +63,146 @@ class NECDecodeException(DecodeException):
     pass
 
 
+# Any pulse longer than this (in usec) is considered a gap between frames.
+FRAME_GAP = const(10000)
+
+# Stages of the decoding timed by the metrics.
+STAGE_SEGMENTATION = "segmentation"
+STAGE_VALIDATION = "validation"
+STAGE_BIT_EXTRACTION = "bit_extraction"
+
+
+class Metrics:
+    """Counters and timings of the decoding.
+
+    The attempts, successes and failures (by DECODE_* reason) are counted for each
+    protocol tried by decode_any(). Frames that no protocol accepts by length are
+    counted as failures of RAW. The time spent in each of the STAGE_* stages is
+    accumulated in nanoseconds, along with the number of times it was entered.
+
+    Each call to a protocol's try_decode function is timed as a whole, and accounted
+    to bit extraction if the pulses got that far (successes other than repeat codes,
+    and checksum failures), or to validation otherwise.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.attempts: dict = {}
+        self.successes: dict = {}
+        # From (protocol, reason) to count.
+        self.failures: dict = {}
+        self.stage_ns: dict = {}
+        self.stage_calls: dict = {}
+
+    def count(self, protocol: str, reason: int) -> None:
+        if protocol != RAW:
+            self.attempts[protocol] = self.attempts.get(protocol, 0) + 1
+        if reason == DECODE_OK:
+            self.successes[protocol] = self.successes.get(protocol, 0) + 1
+        else:
+            key = (protocol, reason)
+            self.failures[key] = self.failures.get(key, 0) + 1
+
+    def add_time(self, stage: str, started: int) -> int:
+        """Account the time since started to the stage, and return the current time."""
+        now = time.monotonic_ns()
+        self.stage_ns[stage] = self.stage_ns.get(stage, 0) + now - started
+        self.stage_calls[stage] = self.stage_calls.get(stage, 0) + 1
+        return now
+
+    def as_dict(self) -> dict:
+        """Return the metrics as a JSON-compatible dictionary."""
+        failures: dict = {}
+        for (protocol, reason), count in self.failures.items():
+            failures.setdefault(protocol, {})[REASON_NAMES[reason]] = count
+
+        return {
+            "attempts": dict(self.attempts),
+            "successes": dict(self.successes),
+            "failures": failures,
+            "stages": {
+                stage: {"calls": self.stage_calls[stage], "ns": self.stage_ns[stage]}
+                for stage in self.stage_ns
+            },
+        }
+
+    def to_prometheus(self, prefix: str = "pysdrc") -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help, samples):
+            lines.append("# HELP %s_%s %s" % (prefix, name, help))
+            lines.append("# TYPE %s_%s %s" % (prefix, name, kind))
+            for labels, value in samples:
+                labels = ",".join('%s="%s"' % label for label in labels)
+                lines.append("%s_%s{%s} %s" % (prefix, name, labels, value))
+
+        metric(
+            "decode_attempts_total",
+            "counter",
+            "Decode attempts per protocol.",
+            [((("protocol", p),), c) for p, c in sorted(self.attempts.items())],
+        )
+        metric(
+            "decode_successes_total",
+            "counter",
+            "Successful decodes per protocol.",
+            [((("protocol", p),), c) for p, c in sorted(self.successes.items())],
+        )
+        metric(
+            "decode_failures_total",
+            "counter",
+            "Failed decodes per protocol and reason.",
+            [
+                ((("protocol", p), ("reason", REASON_NAMES[r])), c)
+                for (p, r), c in sorted(self.failures.items())
+            ],
+        )
+        metric(
+            "stage_seconds_total",
+            "counter",
+            "Time spent in each decoding stage.",
+            [
+                ((("stage", stage),), "%.9f" % (ns / 1_000_000_000))
+                for stage, ns in sorted(self.stage_ns.items())
+            ],
+        )
+        metric(
+            "stage_calls_total",
+            "counter",
+            "Number of times each decoding stage was entered.",
+            [((("stage", s),), c) for s, c in sorted(self.stage_calls.items())],
+        )
+
+        return "\n".join(lines) + "\n"
+
+
+# The active Metrics, or None if the metrics are disabled (the default). The
+# try_decode functions never check this: enable_metrics() binds timed wrappers of them
+# into the decode_any() dispatch table instead, and disable_metrics() removes them.
+metrics = None
+
+
+def enable_metrics() -> Metrics:
+    """Start collecting metrics, returning the (new or current) Metrics object."""
+    global metrics
+    if metrics is None:
+        metrics = Metrics()
+        for protocol in _registered_protocols():
+            protocol.instrument(metrics)
+    return metrics
+
+
+def disable_metrics() -> None:
+    """Stop collecting metrics."""
+    global metrics
+    metrics = None
+    for protocol in _registered_protocols():
+        protocol.instrument(None)
+
+
 def _bits_to_value_lsb(bits: list):
     result = 0
 
@@ -33,7 +219,7 @@ def _pulses_to_bits(pulses: list):
     pairs = zip(evens, odds)
 
     for even, odd in pairs:
-        if odd > even * 1.75:
+        if odd > even * BIT_RATIO:
             bits.append(1)
         else:
             bits.append(0)
@@ -41,25 +227,26 @@ def _pulses_to_bits(pulses: list):
     return bits
 
 
-def decode_sirc(pulses: list) -> tuple:
-    """Decode SIRC (Sony) protocol commands from raw pulses.
+# Preallocated results of the try_decode_* functions (including the ones of
+# pysdrc.protocols), indexed by the DECODE_* reason, so that failing to decode does
+# not allocate memory.
+FAILURES = tuple((None, reason) for reason in range(len(REASON_NAMES)))
 
-    The Sony command protocol uses a different format than the normal RC-5,
-    which requires a different decoding scheme.
 
-    Details of the protocol can be found at:
+def try_decode_sirc(pulses) -> tuple:
+    """Decode SIRC (Sony) protocol commands from raw pulses, without raising.
 
-    https://www.sbprojects.net/knowledge/ir/sirc.php
-    http://www.righto.com/2010/03/understanding-sony-ir-remote-codes-lirc.html
+    Returns a (code, DECODE_OK) tuple, with the same code returned by decode_sirc(),
+    or a preallocated (None, reason) tuple if the pulses are not a SIRC command.
     """
 
     # SIRC supports 12-, 15- and 20-bit commands. There's always one header pulse,
     # and then two pulses per bit, so accept 25-, 31- and 41-pulses commands.
-    if not len(pulses) in [25, 31, 41]:
-        raise SIRCDecodeException("Invalid number of pulses %d" % len(pulses))
+    if not len(pulses) in SIRC_LENGTHS:
+        return FAILURES[DECODE_BAD_LENGTH]
 
-    if not 2200 <= pulses[0] <= 2600:
-        raise SIRCDecodeException("Invalid header pulse length (%d usec)" % pulses[0])
+    if not SIRC_HEADER_MIN <= pulses[0] <= SIRC_HEADER_MAX:
+        return FAILURES[DECODE_BAD_HEADER]
 
     bits = _pulses_to_bits(pulses[1:])
 
@@ -82,36 +269,61 @@ def decode_sirc(pulses: list) -> tuple:
         extended = None
 
     if extended is None:
-        return (command, device)
+        return (command, device), DECODE_OK
+
+    return (command, device, extended), DECODE_OK
+
+
+def decode_sirc(pulses: list) -> tuple:
+    """Decode SIRC (Sony) protocol commands from raw pulses.
 
-    return (command, device, extended)
+    The Sony command protocol uses a different format than the normal RC-5,
+    which requires a different decoding scheme.
+
+    Details of the protocol can be found at:
+
+    https://www.sbprojects.net/knowledge/ir/sirc.php
+    http://www.righto.com/2010/03/understanding-sony-ir-remote-codes-lirc.html
+    """
+
+    code, reason = try_decode_sirc(pulses)
+    if reason == DECODE_OK:
+        return code
+
+    if reason == DECODE_BAD_LENGTH:
+        message = "Invalid number of pulses %d" % len(pulses)
+    else:
+        message = "Invalid header pulse length (%d usec)" % pulses[0]
+    raise SIRCDecodeException(message, reason)
 
 
 # Constant object to signify a NEC repeat code.
 NEC_REPEAT = "NEC Repeat"
 
+_NEC_REPEAT_RESULT = (NEC_REPEAT, DECODE_OK)
 
-def decode_nec(pulses: list):
-    """Decode (extended) NEC protocol commands from raw pulses.
-
-    The NEC command protocol is a structured 16-bit protocol that can be validated.
 
-    Details of the protocol can be found at:
+def try_decode_nec(pulses) -> tuple:
+    """Decode (extended) NEC protocol commands from raw pulses, without raising.
 
-    https://www.sbprojects.net/knowledge/ir/nec.php
+    Returns a (code, DECODE_OK) tuple, with the same code returned by decode_nec(),
+    or a preallocated (None, reason) tuple if the pulses are not a NEC command.
     """
 
-    if not len(pulses) in [67, 3]:
-        raise NECDecodeException("Invalid number of pulses %d" % len(pulses))
+    if not len(pulses) in NEC_LENGTHS:
+        return FAILURES[DECODE_BAD_LENGTH]
 
-    if not 8800 <= pulses[0] <= 9300:
-        raise NECDecodeException("Invalid AGC pulse length (%d usec)" % pulses[0])
+    if not NEC_AGC_PULSE_MIN <= pulses[0] <= NEC_AGC_PULSE_MAX:
+        return FAILURES[DECODE_BAD_HEADER]
 
-    if 2100 <= pulses[1] <= 2300 and 450 <= pulses[2] <= 700:
-        return NEC_REPEAT
+    if (
+        NEC_REPEAT_SPACE_MIN <= pulses[1] <= NEC_REPEAT_SPACE_MAX
+        and NEC_REPEAT_MARK_MIN <= pulses[2] <= NEC_REPEAT_MARK_MAX
+    ):
+        return _NEC_REPEAT_RESULT
 
-    if not 4400 <= pulses[1] <= 4600:
-        raise NECDecodeException("Invalid AGC space length (%d usec)" % pulses[1])
+    if not NEC_HEADER_SPACE_MIN <= pulses[1] <= NEC_HEADER_SPACE_MAX:
+        return FAILURES[DECODE_BAD_HEADER_SPACE]
 
     bits = _pulses_to_bits(pulses[2:])
 
@@ -119,16 +331,335 @@ def decode_nec(pulses: list):
     # once inverted. The address _might_ be inverted.
     command = _bits_to_value_lsb(bits[16:24])
     command_inverted = _bits_to_value_lsb(bits[24:32])
-
-    if command_inverted != (~command & 0xFF):
-        raise NECDecodeException(
-            "Not a valid NEC command: command != ~command_inverted"
-        )
-
     address = _bits_to_value_lsb(bits[0:8])
     address_inverted = _bits_to_value_lsb(bits[8:16])
 
+    if command_inverted != (~command & 0xFF):
+        return FAILURES[DECODE_BAD_CHECKSUM]
+
     if address_inverted == (~address & 0xFF):
-        return address, command
+        return (address, command), DECODE_OK
+    else:
+        return (address | (address_inverted << 8), command), DECODE_OK
+
+
+def decode_nec(pulses: list):
+    """Decode (extended) NEC protocol commands from raw pulses.
+
+    The NEC command protocol is a structured 16-bit protocol that can be validated.
+
+    Details of the protocol can be found at:
+
+    https://www.sbprojects.net/knowledge/ir/nec.php
+    """
+
+    code, reason = try_decode_nec(pulses)
+    if reason == DECODE_OK:
+        return code
+
+    if reason == DECODE_BAD_LENGTH:
+        message = "Invalid number of pulses %d" % len(pulses)
+    elif reason == DECODE_BAD_HEADER:
+        message = "Invalid AGC pulse length (%d usec)" % pulses[0]
+    elif reason == DECODE_BAD_HEADER_SPACE:
+        message = "Invalid AGC space length (%d usec)" % pulses[1]
     else:
-        return (address + address_inverted << 8), command
+        message = "Not a valid NEC command: command != ~command_inverted"
+    raise NECDecodeException(message, reason)
+
+
+def _pulses_to_value_lsb(pulses, start: int, count: int) -> int:
+    """Decode count bits from pairs of pulses, reading them in place.
+
+    This is equivalent to _bits_to_value_lsb(_pulses_to_bits(...)) but it does not
+    slice the pulses or build a list of bits. The comparison is done in integer
+    arithmetic (odd > even * BIT_RATIO, with BIT_RATIO as a fraction) so that no
+    floating point objects are allocated either, and the loop does not allocate a
+    range iterator.
+    """
+    value = 0
+    bit = 1
+    index = start
+    end = start + count * 2
+    while index < end:
+        if (
+            pulses[index + 1] * BIT_RATIO_DENOMINATOR
+            > pulses[index] * BIT_RATIO_NUMERATOR
+        ):
+            value |= bit
+        bit <<= 1
+        index += 2
+
+    return value
+
+
+def decode_sirc_into(pulses, result, start: int = 0, length=None) -> int:
+    """Decode SIRC (Sony) protocol commands, without allocating memory.
+
+    The pulses are read in place by index, so they can be provided as a list, an
+    array.array, a memoryview, or directly as a pulseio.PulseIn object. The frame
+    starts at the provided index, and spans the provided length (or until the end of
+    the pulses).
+
+    The decoded command, device and extended device (-1 for 12- and 15-bit commands)
+    are written to the first three items of result, which should be a preallocated
+    list or array. Returns one of the DECODE_* constants; the content of result is
+    undefined unless DECODE_OK is returned.
+    """
+
+    if length is None:
+        length = len(pulses) - start
+
+    if length != 25 and length != 31 and length != 41:
+        return DECODE_BAD_LENGTH
+
+    if not SIRC_HEADER_MIN <= pulses[start] <= SIRC_HEADER_MAX:
+        return DECODE_BAD_HEADER
+
+    value = _pulses_to_value_lsb(pulses, start + 1, (length - 1) // 2)
+
+    result[0] = value & 0x7F
+    if length == 31:
+        result[1] = (value >> 7) & 0xFF
+        result[2] = -1
+    else:
+        result[1] = (value >> 7) & 0x1F
+        result[2] = (value >> 12) & 0xFF if length == 41 else -1
+
+    return DECODE_OK
+
+
+def decode_nec_into(pulses, result, start: int = 0, length=None) -> int:
+    """Decode (extended) NEC protocol commands, without allocating memory.
+
+    The pulses are read in place the same as decode_sirc_into(). The decoded address
+    and command are written to the first two items of result, and the third item is
+    set to 1 for a repeat code (with address and command set to -1), and 0 otherwise.
+    Returns one of the DECODE_* constants; the content of result is undefined unless
+    DECODE_OK is returned.
+    """
+
+    if length is None:
+        length = len(pulses) - start
+
+    if length != 67 and length != 3:
+        return DECODE_BAD_LENGTH
+
+    if not NEC_AGC_PULSE_MIN <= pulses[start] <= NEC_AGC_PULSE_MAX:
+        return DECODE_BAD_HEADER
+
+    agc_space = pulses[start + 1]
+    if (
+        NEC_REPEAT_SPACE_MIN <= agc_space <= NEC_REPEAT_SPACE_MAX
+        and NEC_REPEAT_MARK_MIN <= pulses[start + 2] <= NEC_REPEAT_MARK_MAX
+    ):
+        result[0] = -1
+        result[1] = -1
+        result[2] = 1
+        return DECODE_OK
+
+    if not NEC_HEADER_SPACE_MIN <= agc_space <= NEC_HEADER_SPACE_MAX:
+        return DECODE_BAD_HEADER_SPACE
+
+    # A 3-pulse frame that is not a repeat code carries no bits, so (the same as
+    # try_decode_nec) its missing checksum does not match.
+    if length != 67:
+        return DECODE_BAD_CHECKSUM
+
+    # Decode the two halves separately, as the full 32-bit value would not fit in a
+    # CircuitPython small integer, and would be allocated on the heap.
+    value = _pulses_to_value_lsb(pulses, start + 34, 16)
+    command = value & 0xFF
+    if value >> 8 != (~command & 0xFF):
+        return DECODE_BAD_CHECKSUM
+
+    value = _pulses_to_value_lsb(pulses, start + 2, 16)
+    address = value & 0xFF
+    address_inverted = value >> 8
+    if address_inverted != (~address & 0xFF):
+        address |= address_inverted << 8
+
+    result[0] = address
+    result[1] = command
+    result[2] = 0
+    return DECODE_OK
+
+
+# Name reported by decode_any() for pulses that could not be decoded.
+RAW = "RAW"
+
+
+class DecodeResult:
+    """Result of decode_any().
+
+    The protocol is the name of the protocol that decoded the pulses, or RAW if none
+    did, in which case the code is the original pulses, and the reason is one of the
+    DECODE_* constants describing why the decode failed.
+    """
+
+    def __init__(self, protocol: str, code, reason: int = DECODE_OK) -> None:
+        self.protocol = protocol
+        self.code = code
+        self.reason = reason
+
+    def __bool__(self) -> bool:
+        return self.protocol != RAW
+
+    def __repr__(self) -> str:
+        return "DecodeResult(%r, %r, %d)" % (self.protocol, self.code, self.reason)
+
+
+def _result_from_exception(decode):
+    """Wrap a raising decode function to return (code, reason) tuples instead."""
+
+    def try_decode(pulses):
+        try:
+            return decode(pulses), DECODE_OK
+        except DecodeException as e:
+            return None, e.reason
+
+    return try_decode
+
+
+def _timed(try_decode, current_metrics: Metrics, repeat_code):
+    def timed_try_decode(pulses) -> tuple:
+        started = time.monotonic_ns()
+        result = try_decode(pulses)
+        code, reason = result
+        if reason == DECODE_BAD_CHECKSUM or (
+            reason == DECODE_OK and code is not repeat_code
+        ):
+            current_metrics.add_time(STAGE_BIT_EXTRACTION, started)
+        else:
+            current_metrics.add_time(STAGE_VALIDATION, started)
+        return result
+
+    return timed_try_decode
+
+
+class _Protocol:
+    def __init__(
+        self, name: str, try_decode, header_min: int, header_max: int, repeat_code
+    ) -> None:
+        self.name = name
+        self.plain_try_decode = try_decode
+        self.try_decode = try_decode
+        self.header_min = header_min
+        self.header_max = header_max
+        self.repeat_code = repeat_code
+
+    def instrument(self, current_metrics) -> None:
+        """Time try_decode with current_metrics, or stop timing it if None."""
+        if current_metrics is None:
+            self.try_decode = self.plain_try_decode
+        else:
+            self.try_decode = _timed(
+                self.plain_try_decode, current_metrics, self.repeat_code
+            )
+
+
+# Dispatch table for decode_any(), from the number of pulses to the list of
+# protocols that accept it, in registration order.
+_PROTOCOLS_BY_LENGTH: dict = {}
+
+# The code returned for repeat frames, by protocol name.
+_REPEAT_CODES: dict = {}
+
+
+def register_protocol(
+    name: str, decode, lengths, header, try_decode=None, repeat_code=None
+) -> None:
+    """Register a protocol decoder with decode_any().
+
+    The decode function is only called with pulses of one of the provided lengths,
+    and with a first pulse within the (minimum, maximum) header range. It should
+    return the decoded code, or raise a DecodeException.
+
+    If the protocol also provides a non-raising try_decode function, returning
+    (code, DECODE_OK) or (None, reason) tuples like try_decode_sirc(), decode_any()
+    calls that instead, and never raises and catches exceptions for it.
+
+    Protocols with a repeat frame declare the code they return for it as
+    repeat_code, so that it can be told apart from commands with repeat_code_of().
+    """
+
+    if try_decode is None:
+        try_decode = _result_from_exception(decode)
+
+    protocol = _Protocol(name, try_decode, header[0], header[1], repeat_code)
+    if metrics is not None:
+        protocol.instrument(metrics)
+    for length in lengths:
+        _PROTOCOLS_BY_LENGTH.setdefault(length, []).append(protocol)
+
+    if repeat_code is not None:
+        _REPEAT_CODES[name] = repeat_code
+
+
+def _registered_protocols() -> set:
+    return {
+        protocol
+        for protocols in _PROTOCOLS_BY_LENGTH.values()
+        for protocol in protocols
+    }
+
+
+def repeat_code_of(protocol: str):
+    """Return the repeat code declared by a registered protocol, or None."""
+    return _REPEAT_CODES.get(protocol)
+
+
+def decode_any(pulses) -> DecodeResult:
+    """Decode pulses with whichever registered protocol matches them.
+
+    The candidate protocols are selected by the number of pulses and the length of
+    the header pulse, so that only the decoders that can possibly match are called.
+    This never raises a DecodeException; pulses that cannot be decoded are returned
+    as a RAW result instead.
+    """
+
+    current_metrics = metrics
+
+    candidates = _PROTOCOLS_BY_LENGTH.get(len(pulses))
+    if not candidates:
+        if current_metrics is not None:
+            current_metrics.count(RAW, DECODE_BAD_LENGTH)
+        return DecodeResult(RAW, pulses, DECODE_BAD_LENGTH)
+
+    header = pulses[0]
+    reason = DECODE_BAD_HEADER
+    attempted = False
+    for protocol in candidates:
+        if not protocol.header_min <= header <= protocol.header_max:
+            continue
+
+        attempted = True
+        code, protocol_reason = protocol.try_decode(pulses)
+
+        if current_metrics is not None:
+            current_metrics.count(protocol.name, protocol_reason)
+
+        if protocol_reason == DECODE_OK:
+            return DecodeResult(protocol.name, code)
+        reason = protocol_reason
+
+    if current_metrics is not None and not attempted:
+        current_metrics.count(RAW, DECODE_BAD_HEADER)
+    return DecodeResult(RAW, pulses, reason)
+
+
+register_protocol(
+    "SIRC",
+    decode_sirc,
+    SIRC_LENGTHS,
+    (SIRC_HEADER_MIN, SIRC_HEADER_MAX),
+    try_decode=try_decode_sirc,
+)
+register_protocol(
+    "NEC",
+    decode_nec,
+    NEC_LENGTHS,
+    (NEC_AGC_PULSE_MIN, NEC_AGC_PULSE_MAX),
+    try_decode=try_decode_nec,
+    repeat_code=NEC_REPEAT,
+)
@@ -0,0 +1,114 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Carrier demodulation of raw infrared captures.
+
+A receiver module (such as the TSOP4830) removes the carrier, and reports each burst
+of it as a single mark. When capturing the drive line of an IR LED, or a bare
+photodiode, each mark is instead a burst of carrier cycles, at 36-40kHz.
+
+demodulate() merges the carrier cycles of such a capture into mark/space envelopes,
+that can be split into frames and decoded as usual, and measures the frequency and
+duty cycle of the carrier. The transition times are processed as numpy arrays, so
+they can come straight from pysdrc.saleae_binary.read_transitions().
+
+The capture is expected to start on the edge that turns the carrier on.
+
+Example:
+
+    times, carrier = demodulate(saleae_binary.read_transitions(path))
+    print("Carrier at %d Hz" % carrier.frequency)
+    for event in saleae.decode_frames(saleae.times_to_frames(times)):
+        print(event)
+"""
+
+import collections
+
+import numpy as np
+
+# Measured carrier. The frequency is in Hz, and the duty cycle is the fraction of each
+# period the carrier is on: pysdrc.circuitpython.transmitter.Transmitter expresses it
+# as duty_cycle * 2**16.
+Carrier = collections.namedtuple("Carrier", ["frequency", "duty_cycle"])
+
+# A pause longer than this many carrier periods ends a burst.
+_GAP_PERIODS = 4
+
+
+def measure_carrier(times, max_gap=None) -> Carrier:
+    """Measure the carrier of a raw capture, from its transition times in seconds."""
+    return demodulate(times, max_gap)[1]
+
+
+def demodulate(times, max_gap=None) -> tuple:
+    """Merge the carrier cycles of a raw capture into mark/space envelopes.
+
+    Returns the transition times (in seconds) of the envelopes, as a numpy array, and
+    the measured Carrier. Bursts are split on pauses longer than max_gap seconds,
+    which defaults to a few periods of the carrier.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if len(times) < 3:
+        raise ValueError("Not enough transitions to measure a carrier")
+
+    intervals = np.diff(times)
+
+    # Nearly all the transitions are within carrier bursts, so the typical distance
+    # between every other transition is the period of the carrier.
+    if max_gap is None:
+        max_gap = np.median(times[2:] - times[:-2]) * _GAP_PERIODS
+
+    # The gaps are the intervals between the last transition of a burst and the first
+    # of the next one.
+    gaps = np.flatnonzero(intervals > max_gap)
+
+    envelope = np.empty((len(gaps) + 1) * 2, dtype=np.float64)
+    envelope[0] = times[0]
+    envelope[1:-1:2] = times[gaps]
+    envelope[2::2] = times[gaps + 1]
+    envelope[-1] = times[-1]
+
+    # Measure the carrier on the cycles fully within a burst, starting from each
+    # edge turning it on.
+    within = intervals <= max_gap
+    on_edges = np.arange(0, len(times) - 2, 2)
+    on_edges = on_edges[within[on_edges] & within[on_edges + 1]]
+    if not len(on_edges):
+        raise ValueError("No complete carrier cycle in the capture")
+
+    periods = times[on_edges + 2] - times[on_edges]
+    on_times = times[on_edges + 1] - times[on_edges]
+
+    carrier = Carrier(
+        float(1 / np.median(periods)), float(np.median(on_times / periods))
+    )
+    return envelope, carrier
+
+
+def modulate(
+    pulses, frequency: float = 38_000, duty_cycle: float = 0.5, start: float = 0.1
+):
+    """Return the transition times of pulses sent on a carrier, as a numpy array.
+
+    This is what a raw capture of a transmitter's LED looks like, with each mark
+    made of carrier cycles starting at its beginning. The first mark starts at start
+    seconds.
+    """
+    period = 1 / frequency
+    on_time = period * duty_cycle
+
+    durations = np.asarray(pulses, dtype=np.float64) / 1_000_000
+    edges = start + np.concatenate(([0.0], np.cumsum(durations)))
+    mark_starts = edges[0:-1:2]
+    mark_lengths = durations[0::2]
+
+    cycles = np.ceil(mark_lengths * frequency).astype(np.int64)
+    cycle_starts = np.repeat(mark_starts, cycles) + period * (
+        np.arange(cycles.sum()) - np.repeat(np.cumsum(cycles) - cycles, cycles)
+    )
+
+    times = np.empty(len(cycle_starts) * 2, dtype=np.float64)
+    times[0::2] = cycle_starts
+    times[1::2] = cycle_starts + on_time
+    return times
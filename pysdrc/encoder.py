@@ -2,7 +2,26 @@
 #
 # SPDX-License-Identifier: MIT
 
-"""Encoder for SIRC protocol."""
+"""Encoder for SIRC protocol.
+
+The encode_*_into() functions write the pulses into a caller-supplied buffer (such as
+a preallocated array.array("H") reused for every command) and return the number of
+pulses written, so that encoding a command does not allocate memory. This is the
+mode to use on boards with very little RAM.
+"""
+
+from pysdrc.timings import (
+    NEC_HEADER_MARK,
+    NEC_HEADER_SPACE,
+    NEC_MARK,
+    NEC_ONE_SPACE,
+    NEC_REPEAT_PULSES,
+    NEC_ZERO_SPACE,
+    SIRC_HEADER_MARK,
+    SIRC_ONE_MARK,
+    SIRC_SPACE,
+    SIRC_ZERO_MARK,
+)
 
 
 class EncodeError(ValueError):
@@ -17,22 +36,39 @@ class NECEncodeError(EncodeError):
     pass
 
 
-def _sirc_value_to_pulses(value: int, bits: int) -> list:
-    pulses: list = []
-    for _ in range(bits):
+# Size of the buffer needed by encode_sirc_into(), for 20-bit commands.
+SIRC_MAX_PULSES = 42
+
+
+# The loops below use while rather than range(), so that no iterator is allocated.
+
+
+def _sirc_value_into(buffer, index: int, value: int, bits: int) -> int:
+    end = index + bits * 2
+    while index < end:
         if value & 1:
-            pulses.extend((1200, 600))
+            buffer[index] = SIRC_ONE_MARK
         else:
-            pulses.extend((600, 600))
+            buffer[index] = SIRC_ZERO_MARK
+        buffer[index + 1] = SIRC_SPACE
 
+        index += 2
         value = value >> 1
 
-    return pulses
+    return index
 
 
-def encode_sirc(
-    command: int, device: int, extended_device=None, force_8bit_device: bool = False
-) -> list:
+def encode_sirc_into(
+    buffer,
+    command: int,
+    device: int,
+    extended_device=None,
+    force_8bit_device: bool = False,
+) -> int:
+    """Encode a SIRC command into buffer, returning the number of pulses written.
+
+    The buffer needs to hold at least SIRC_MAX_PULSES items.
+    """
     if command >= 2**12:
         raise EncodeError("Invalid command %x" % command)
     if extended_device:
@@ -44,35 +80,57 @@ def encode_sirc(
         if device >= 2**8:
             raise EncodeError("Invalid device ID %x" % device)
 
-    pulses = [2400, 600]
-    pulses.extend(_sirc_value_to_pulses(command, 7))
+    buffer[0] = SIRC_HEADER_MARK
+    buffer[1] = SIRC_SPACE
+    index = _sirc_value_into(buffer, 2, command, 7)
     if device >= 2**5 or force_8bit_device:
-        pulses.extend(_sirc_value_to_pulses(device, 8))
+        index = _sirc_value_into(buffer, index, device, 8)
     else:
-        pulses.extend(_sirc_value_to_pulses(device, 5))
+        index = _sirc_value_into(buffer, index, device, 5)
     if extended_device:
-        pulses.extend(_sirc_value_to_pulses(extended_device, 8))
+        index = _sirc_value_into(buffer, index, extended_device, 8)
+
+    return index
+
+
+def encode_sirc(
+    command: int, device: int, extended_device=None, force_8bit_device: bool = False
+) -> list:
+    pulses = [0] * SIRC_MAX_PULSES
+    length = encode_sirc_into(
+        pulses, command, device, extended_device, force_8bit_device
+    )
+    del pulses[length:]
 
     return pulses
 
 
-NEC_REPEAT = (9200, 2250, 560)
+NEC_REPEAT = NEC_REPEAT_PULSES
 
+# Size of the buffer needed by encode_nec_into().
+NEC_PULSES = 67
 
-def _nec_value_to_pulses(value: int, bits: int) -> list:
-    pulses: list = []
-    for _ in range(bits):
+
+def _nec_value_into(buffer, index: int, value: int, bits: int) -> int:
+    end = index + bits * 2
+    while index < end:
+        buffer[index] = NEC_MARK
         if value & 1:
-            pulses.extend((560, 2250 - 560))
+            buffer[index + 1] = NEC_ONE_SPACE
         else:
-            pulses.extend((560, 560))
+            buffer[index + 1] = NEC_ZERO_SPACE
 
+        index += 2
         value = value >> 1
 
-    return pulses
+    return index
 
 
-def encode_nec(address: int, command: int) -> list:
+def encode_nec_into(buffer, address: int, command: int) -> int:
+    """Encode a NEC command into buffer, returning the number of pulses written.
+
+    The buffer needs to hold at least NEC_PULSES items.
+    """
     if command >= 2**8:
         raise EncodeError("Invalid command %x" % command)
 
@@ -88,11 +146,101 @@ def encode_nec(address: int, command: int) -> list:
         address_low = address
         address_high = ~address & 0xFF
 
-    pulses = [9000, 4500]
-    pulses.extend(_nec_value_to_pulses(address_low, 8))
-    pulses.extend(_nec_value_to_pulses(address_high, 8))
-    pulses.extend(_nec_value_to_pulses(command, 8))
-    pulses.extend(_nec_value_to_pulses(~command & 0xFF, 8))
-    pulses.append(560)
+    buffer[0] = NEC_HEADER_MARK
+    buffer[1] = NEC_HEADER_SPACE
+    index = _nec_value_into(buffer, 2, address_low, 8)
+    index = _nec_value_into(buffer, index, address_high, 8)
+    index = _nec_value_into(buffer, index, command, 8)
+    index = _nec_value_into(buffer, index, ~command & 0xFF, 8)
+    buffer[index] = NEC_MARK
+
+    return index + 1
+
+
+def encode_nec(address: int, command: int) -> list:
+    pulses = [0] * NEC_PULSES
+    encode_nec_into(pulses, address, command)
+
+    return pulses
+
+
+# Time between the start of consecutive frames of a repeated command, in usec.
+SIRC_FRAME_PERIOD = 45000
+NEC_FRAME_PERIOD = 108000
+
+# Longest pulse that can be represented in an array("H") for PulseOut.
+_MAX_PULSE = 0xFFFF
+
+
+def encode_burst(frames, period: int) -> list:
+    """Concatenate frames into a single pulse train, one frame per period.
+
+    Each frame is padded with a space so that the following one starts period usec
+    after its start. The padding can be too long for the unsigned 16-bit array sent
+    by PulseOut: use burst_segments() to split the burst before sending it.
+    """
+    pulses: list = []
+    last = len(frames) - 1
+
+    for index, frame in enumerate(frames):
+        # Drop the trailing space, if present, as it is replaced by the padding.
+        if not len(frame) % 2:
+            frame = frame[:-1]
+        pulses.extend(frame)
+
+        if index == last:
+            break
+
+        gap = period - sum(frame)
+        if gap <= 0:
+            raise EncodeError("Frame longer than period %d usec" % period)
+
+        pulses.append(gap)
 
     return pulses
+
+
+def burst_segments(pulses) -> list:
+    """Split a burst into the (pulses, pause) segments that PulseOut can send.
+
+    The burst is split at the spaces too long for an unsigned 16-bit array, which are
+    replaced by a pause (in usec) after sending the segment before them. The pause of
+    the last segment is 0. Long spaces cannot be split with zero-length pulses, as
+    PulseOut delays the pulse following them by up to a full timer period.
+    """
+    segments = []
+    start = 0
+    index = 1
+    while index < len(pulses):
+        if pulses[index] > _MAX_PULSE:
+            segments.append((pulses[start:index], pulses[index]))
+            start = index + 1
+        index += 2
+
+    segments.append((pulses[start:], 0))
+    return segments
+
+
+def encode_sirc_burst(
+    command: int,
+    device: int,
+    extended_device=None,
+    force_8bit_device: bool = False,
+    repeat: int = 4,
+) -> list:
+    """Encode a SIRC command repeated with the protocol's frame period."""
+    if repeat < 1:
+        raise EncodeError("Invalid repeat count %d" % repeat)
+
+    frame = encode_sirc(command, device, extended_device, force_8bit_device)
+    return encode_burst([frame] * repeat, SIRC_FRAME_PERIOD)
+
+
+def encode_nec_burst(address: int, command: int, repeat: int = 1) -> list:
+    """Encode a NEC command, followed by repeat codes for a total of repeat frames."""
+    if repeat < 1:
+        raise EncodeError("Invalid repeat count %d" % repeat)
+
+    frames: list = [encode_nec(address, command)]
+    frames.extend([NEC_REPEAT] * (repeat - 1))
+    return encode_burst(frames, NEC_FRAME_PERIOD)
@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Jitter-tolerant fingerprints of raw frames.
+
+Frames that no decoder recognizes can still be identified, if the same frame was seen
+before, such as a vendor-specific code being replayed. Comparing a frame with every
+known one is too slow for long captures, so each frame is reduced to a fingerprint
+that does not change with the normal timing jitter, and looked up in a hash index.
+
+The pulse durations of a frame are quantized to the rank of the group they belong to:
+sorting the durations, a new group starts whenever a duration is more than sqrt(2)
+times the previous one. The fingerprint is a 64-bit hash of the sequence of ranks,
+which also encodes the length of the frame. Frames of different timings can share a
+fingerprint, so the candidates found in the index are verified pulse by pulse.
+
+On a log scale, sqrt(2) is halfway between equal durations and durations twice apart,
+the closest ratio of most protocols (such as the 9ms mark and 4.5ms space of NEC, or
+the 1.2ms and 0.6ms marks of SIRC). So the fingerprint of a frame with such timings
+does not change as long as each pulse is within TOLERANCE of its nominal duration,
+and lookups do not accept a larger tolerance, as it could not be guaranteed.
+
+Example:
+
+    index = FingerprintIndex()
+    index.add(known_pulses, "Soundbar POWER")
+    for event in saleae.decode_csv(input):
+        if event.protocol == decoder.RAW:
+            print(index.lookup(event.code))
+"""
+
+import hashlib
+
+# Relative jitter that never changes the fingerprint of frames whose nominal durations
+# are either equal or at least twice apart. The limit is 0.17 (where 1.17 / 0.83 is
+# sqrt(2)), minus a margin for the rounding of the durations to whole usec.
+TOLERANCE = 0.15
+
+
+def quantize(pulses) -> bytes:
+    """Return the group rank of each pulse duration, as bytes."""
+    if not pulses:
+        return b""
+
+    ranks = {}
+    rank = 0
+    previous = None
+    for duration in sorted(set(pulses)):
+        # Same as duration > previous * sqrt(2), in integer arithmetic.
+        if (
+            previous is not None
+            and duration * duration > 2 * previous * previous
+            and rank < 255
+        ):
+            rank += 1
+        ranks[duration] = rank
+        previous = duration
+
+    return bytes(ranks[duration] for duration in pulses)
+
+
+def fingerprint(pulses) -> int:
+    """Return the fingerprint of the pulses of a frame, as a signed 64-bit integer.
+
+    The fingerprint is stable across runs and hosts, so it can be stored.
+    """
+    digest = hashlib.blake2b(quantize(pulses), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def check_tolerance(tolerance: float) -> None:
+    """Raise ValueError if the tolerance is larger than TOLERANCE."""
+    if tolerance > TOLERANCE:
+        raise ValueError(
+            "tolerance should be at most %.2f, got %.2f" % (TOLERANCE, tolerance)
+        )
+
+
+def matches(pulses, reference, tolerance: float = TOLERANCE) -> bool:
+    """Whether each of the pulses is within tolerance of the reference pulses."""
+    if len(pulses) != len(reference):
+        return False
+    for pulse, nominal in zip(pulses, reference):
+        if abs(pulse - nominal) > nominal * tolerance:
+            return False
+    return True
+
+
+class FingerprintIndex:
+    """Hash index of known raw frames, by fingerprint.
+
+    Each frame is stored with a value returned when it is found. A lookup hashes the
+    frame once, and only verifies the frames sharing its fingerprint. The tolerance
+    cannot be larger than TOLERANCE.
+    """
+
+    def __init__(self, tolerance: float = TOLERANCE) -> None:
+        check_tolerance(tolerance)
+        self.tolerance = tolerance
+        self._frames: dict = {}
+
+    def __len__(self) -> int:
+        return sum(len(candidates) for candidates in self._frames.values())
+
+    def add(self, pulses, value) -> None:
+        """Add a known frame, identified by value."""
+        self._frames.setdefault(fingerprint(pulses), []).append((tuple(pulses), value))
+
+    def lookup(self, pulses):
+        """Return the value of the first known frame matching the pulses, or None."""
+        for reference, value in self._frames.get(fingerprint(pulses), ()):
+            if matches(pulses, reference, self.tolerance):
+                return value
+        return None
@@ -0,0 +1,265 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Incremental decoders, fed one pulse at a time.
+
+The decoders in pysdrc.decoder require a full frame to have been collected before
+they can look at it. The state machines in this module instead accept one pulse
+duration at a time (for example, as popped from a pulseio.PulseIn object), reject a
+protocol as soon as its header or bit timings rule it out, and report the decoded
+command as soon as its last bit is received.
+
+The decoded values are the same as those returned by pysdrc.decoder.decode_sirc and
+pysdrc.decoder.decode_nec. The state machines are slightly stricter, as they reject
+frames where a single pulse is too long to be part of a valid bit.
+"""
+
+from pysdrc import decoder, timings
+
+_SIRC_MAX_BIT_PULSE = 2000
+_NEC_MAX_BIT_PULSE = 2500
+
+
+class SIRCStateMachine:
+    """Incremental decoder for SIRC (Sony) commands.
+
+    SIRC commands can be 12-, 15- or 20-bit long, and nothing in the frame tells them
+    apart. A command is reported as soon as it reaches the longest of the accepted
+    lengths; shorter commands are only reported when the end of the frame is seen.
+    Restricting the accepted lengths (e.g. to only 12-bit commands) allows reporting
+    those on their last bit as well.
+    """
+
+    name = "SIRC"
+
+    def __init__(self, lengths=(12, 15, 20)) -> None:
+        for length in lengths:
+            if length not in (12, 15, 20):
+                raise ValueError("Invalid SIRC command length %d" % length)
+
+        self._lengths = lengths
+        self._max_length = max(lengths)
+        self.reset()
+
+    def reset(self) -> None:
+        """Prepare to receive a new frame."""
+        self.rejected = False
+        self._done = False
+        self._count = 0
+        self._bits = 0
+        self._value = 0
+        self._space = 0
+
+    def _result(self):
+        value = self._value
+        self._done = True
+
+        if self._bits == 15:
+            return (value & 0x7F, (value >> 7) & 0xFF)
+        elif self._bits == 20:
+            return (value & 0x7F, (value >> 7) & 0x1F, (value >> 12) & 0xFF)
+        else:
+            return (value & 0x7F, (value >> 7) & 0x1F)
+
+    def push(self, duration: int):
+        """Process the next pulse, returning the decoded command if complete."""
+        if self.rejected or self._done:
+            return None
+
+        count = self._count
+        self._count = count + 1
+
+        if count == 0:
+            if not timings.SIRC_HEADER_MIN <= duration <= timings.SIRC_HEADER_MAX:
+                self.rejected = True
+            return None
+
+        if duration > _SIRC_MAX_BIT_PULSE:
+            # A long space after a complete command is the end of the frame.
+            if count % 2 and self._bits in self._lengths:
+                return self._result()
+            self.rejected = True
+            return None
+
+        if count % 2:
+            self._space = duration
+            return None
+
+        if duration > self._space * timings.BIT_RATIO:
+            self._value |= 1 << self._bits
+        self._bits += 1
+
+        if self._bits == self._max_length:
+            return self._result()
+
+        return None
+
+    def finish(self):
+        """Signal the end of the frame, returning the decoded command if complete."""
+        if self.rejected or self._done:
+            return None
+
+        # The last bit is only complete after its mark, which is an even pulse.
+        if self._count % 2 and self._bits in self._lengths:
+            return self._result()
+
+        self.rejected = True
+        return None
+
+
+class NECStateMachine:
+    """Incremental decoder for (extended) NEC commands.
+
+    Commands are reported as soon as the last bit is received, without waiting for
+    the trailing pulse, and repeat codes as soon as their final pulse is received.
+    """
+
+    name = "NEC"
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Prepare to receive a new frame."""
+        self.rejected = False
+        self._done = False
+        self._count = 0
+        self._bits = 0
+        self._value = 0
+        self._mark = 0
+        self._repeat = False
+
+    def _result(self):
+        self._done = True
+
+        value = self._value
+        command = (value >> 16) & 0xFF
+        command_inverted = (value >> 24) & 0xFF
+
+        if command_inverted != (~command & 0xFF):
+            self.rejected = True
+            return None
+
+        address = value & 0xFF
+        address_inverted = (value >> 8) & 0xFF
+
+        if address_inverted == (~address & 0xFF):
+            return address, command
+        else:
+            return address | (address_inverted << 8), command
+
+    def push(self, duration: int):
+        """Process the next pulse, returning the decoded command if complete."""
+        if self.rejected or self._done:
+            return None
+
+        count = self._count
+        self._count = count + 1
+
+        if count == 0:
+            if not timings.NEC_AGC_PULSE_MIN <= duration <= timings.NEC_AGC_PULSE_MAX:
+                self.rejected = True
+        elif count == 1:
+            if timings.NEC_REPEAT_SPACE_MIN <= duration <= timings.NEC_REPEAT_SPACE_MAX:
+                self._repeat = True
+            elif not (
+                timings.NEC_HEADER_SPACE_MIN <= duration <= timings.NEC_HEADER_SPACE_MAX
+            ):
+                self.rejected = True
+        elif self._repeat:
+            if timings.NEC_REPEAT_MARK_MIN <= duration <= timings.NEC_REPEAT_MARK_MAX:
+                self._done = True
+                return decoder.NEC_REPEAT
+            self.rejected = True
+        elif duration > _NEC_MAX_BIT_PULSE:
+            self.rejected = True
+        elif count % 2 == 0:
+            self._mark = duration
+        else:
+            if duration > self._mark * timings.BIT_RATIO:
+                self._value |= 1 << self._bits
+            self._bits += 1
+
+            if self._bits == 32:
+                return self._result()
+
+        return None
+
+    def finish(self):
+        """Signal the end of the frame.
+
+        NEC commands are always reported on their last bit, so this never returns a
+        command, and only rejects an incomplete frame.
+        """
+        if not self._done:
+            self.rejected = True
+        return None
+
+
+class IncrementalDecoder:
+    """Decode pulses one at a time against multiple protocols at once.
+
+    Each protocol is tracked by its own state machine, and the first one to complete
+    a command wins. Pulses longer than decoder.FRAME_GAP are considered the end of a
+    frame, and reset all the state machines. If the source of pulses can detect an
+    idle line (e.g. with a timeout), calling finish() reports pending commands without
+    having to wait for the next frame to start.
+    """
+
+    def __init__(self, machines=None) -> None:
+        if machines is None:
+            machines = (SIRCStateMachine(), NECStateMachine())
+
+        self._machines = tuple(machines)
+        self._active = True
+
+    def reset(self) -> None:
+        """Discard the current frame and prepare to receive a new one."""
+        for machine in self._machines:
+            machine.reset()
+        self._active = True
+
+    def push(self, duration: int):
+        """Process the next pulse.
+
+        Returns a (protocol name, command) tuple when a command is complete, None
+        otherwise.
+        """
+        if duration > decoder.FRAME_GAP:
+            result = self.finish()
+            self.reset()
+            return result
+
+        if not self._active:
+            return None
+
+        active = False
+        for machine in self._machines:
+            code = machine.push(duration)
+            if code is not None:
+                self._active = False
+                return machine.name, code
+            if not machine.rejected:
+                active = True
+
+        # Once every protocol has been ruled out, skip the rest of the frame.
+        self._active = active
+        return None
+
+    def finish(self):
+        """Signal the end of the current frame.
+
+        Returns a (protocol name, command) tuple if a command was pending, None
+        otherwise. Further pulses are ignored until the decoder is reset.
+        """
+        if not self._active:
+            return None
+
+        self._active = False
+        for machine in self._machines:
+            code = machine.finish()
+            if code is not None:
+                return machine.name, code
+
+        return None
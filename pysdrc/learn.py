@@ -0,0 +1,287 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Learning the protocol of unknown remotes from captured frames.
+
+Frames that no decoder recognizes are reported as RAW, with their pulses. Given enough
+of them from the same remote, learn() clusters their pulse durations, and infers the
+header, the encoding of the bits, the number of bits, any inverted or copied bytes,
+and the repeat frame, if the remote sends one. The result is a protocol specification,
+as described in pysdrc.protocols, which can be stored as JSON and compiled with
+pysdrc.protocols.compile_protocol() to decode and encode the remote's codes.
+
+Only protocols encoding each bit as a (mark, space) pair, varying one of the two, can
+be learned. The most common frame length is taken as the layout of the protocol, and
+frames of other lengths are ignored, except for the repeat frame.
+
+Requires numpy.
+
+Example:
+
+    events = saleae.decode_csv(input)
+    spec = learn_events(events, name="Soundbar")
+    print(json.dumps(spec))
+"""
+
+import collections
+
+import numpy as np
+
+from pysdrc import decoder
+
+# Duration clusters found in the captured pulses: the median duration (in usec) of each
+# cluster, the number of pulses within it, and its boundaries.
+Clusters = collections.namedtuple("Clusters", ["centers", "counts", "edges"])
+
+# Number of histogram bins within the tolerance of a duration.
+_BINS_PER_TOLERANCE = 4
+
+# Frames shorter than this are considered repeat frames, not data frames.
+_MAX_REPEAT_LENGTH = 5
+
+# Time between the start of frames considered part of the same burst, in seconds.
+_MAX_PERIOD = 0.2
+
+
+def cluster_durations(
+    durations, tolerance: float = 0.25, min_share: float = 0.001
+) -> Clusters:
+    """Cluster pulse durations (in usec) by their logarithmic histogram.
+
+    The histogram bins holding less than min_share of the durations are ignored as
+    noise, and the runs of adjacent bins left form the clusters, which extend to the
+    tolerance around their median. The edges are the (low, high) boundaries of each
+    cluster, in usec.
+    """
+    durations = np.asarray(durations, dtype=np.float64)
+    durations = durations[durations > 0]
+    if not len(durations):
+        raise ValueError("No durations to cluster")
+
+    logs = np.log(durations)
+    width = np.log1p(tolerance) / _BINS_PER_TOLERANCE
+    low = logs.min()
+    bins = int((logs.max() - low) / width) + 1
+    histogram, bin_edges = np.histogram(
+        logs, bins=bins, range=(low, low + bins * width)
+    )
+
+    occupied = histogram >= max(1, min_share * len(durations))
+    # Pad with unoccupied bins, so that every run has a start and an end.
+    changes = np.diff(np.concatenate(([False], occupied, [False])).astype(np.int8))
+    starts = np.flatnonzero(changes == 1)
+    ends = np.flatnonzero(changes == -1)
+
+    runs = np.exp(np.stack((bin_edges[starts], bin_edges[ends]), axis=1))
+    centers = np.array(
+        [
+            np.median(durations[(durations >= low) & (durations < high)])
+            for low, high in runs
+        ]
+    )
+
+    # Extend the clusters to the tolerance around their centers, so that the sparse
+    # bins at their sides are not lost, but never past the middle of the next one.
+    middles = np.sqrt(centers[1:] * centers[:-1])
+    edges = np.stack((centers / (1 + tolerance), centers * (1 + tolerance)), axis=1)
+    edges[1:, 0] = np.maximum(edges[1:, 0], middles)
+    edges[:-1, 1] = np.minimum(edges[:-1, 1], middles)
+
+    counts = np.diff(np.searchsorted(np.sort(durations), edges.ravel()))[0::2]
+
+    return Clusters(centers, counts, edges)
+
+
+def _labels(clusters: Clusters, pulses) -> np.ndarray:
+    """Return the cluster index of each pulse, or -1 if it is not in any cluster."""
+    labels = np.searchsorted(clusters.edges.ravel(), pulses, side="right")
+    return np.where(labels % 2 == 1, labels // 2, -1)
+
+
+def _infer_fields(values: np.ndarray) -> list:
+    """Infer the fields of the bytes of each frame, one row per frame.
+
+    A byte that is always the inverse or the copy of the previous one is a check of
+    it, and the other consecutive bytes are joined into wider fields.
+    """
+    fields: list = []
+    index = 0
+    count = values.shape[1]
+
+    while index < count:
+        name = "field%d" % sum(1 for field in fields if len(field) == 2)
+        current = values[:, index]
+
+        if index + 1 < count:
+            following = values[:, index + 1]
+            if np.array_equal(following, ~current & 0xFF):
+                fields += [[name, 8], [name, 8, "inverse"]]
+                index += 2
+                continue
+            if np.array_equal(following, current):
+                fields += [[name, 8], [name, 8, "copy"]]
+                index += 2
+                continue
+
+        if fields and len(fields[-1]) == 2:
+            fields[-1][1] += 8
+        else:
+            fields.append([name, 8])
+        index += 1
+
+    return fields
+
+
+def _learn_repeat(frames: list, tolerance: float):
+    """Return the nominal pulses of the repeat frame, if enough were captured."""
+    lengths = collections.Counter(
+        len(frame) for frame in frames if len(frame) <= _MAX_REPEAT_LENGTH
+    )
+    if not lengths:
+        return None
+
+    length, count = lengths.most_common(1)[0]
+    pulses = np.array([frame for frame in frames if len(frame) == length])
+    nominal = np.median(pulses, axis=0)
+
+    # Only keep it if the repeat frames are consistent.
+    within = np.abs(pulses - nominal) <= nominal * tolerance
+    if count < 2 or within.all(axis=1).mean() < 0.9:
+        return None
+    return [int(round(pulse)) for pulse in nominal]
+
+
+def learn(
+    frames, name: str = "Learned", tolerance: float = 0.25, min_frames: int = 4
+) -> dict:
+    """Infer the protocol specification of frames captured from a remote.
+
+    frames is an iterable of sequences of pulse durations (in usec), one per frame.
+    Raises ValueError if the frames do not match a supported encoding.
+    """
+    frames = [list(frame) for frame in frames if frame]
+
+    lengths = collections.Counter(
+        len(frame) for frame in frames if len(frame) > _MAX_REPEAT_LENGTH
+    )
+    if not lengths:
+        raise ValueError("No data frames to learn from")
+    length, count = lengths.most_common(1)[0]
+    if count < min_frames:
+        raise ValueError(
+            "Only %d frames of length %d, need at least %d"
+            % (count, length, min_frames)
+        )
+
+    pulses = np.array([frame for frame in frames if len(frame) == length])
+    clusters = cluster_durations(pulses.ravel(), tolerance)
+    labels = _labels(clusters, pulses)
+    # Drop the frames with pulses outside of any cluster, as noise.
+    valid = (labels >= 0).all(axis=1)
+    pulses = pulses[valid]
+    labels = labels[valid]
+    if len(pulses) < min_frames:
+        raise ValueError("Only %d frames without noise" % len(pulses))
+
+    # The bits make up most of the frame, so the two most common durations encode
+    # them. The header is made of the (mark, space) pairs before them.
+    counts = np.bincount(labels.ravel(), minlength=len(clusters.centers))
+    if np.count_nonzero(counts) < 2:
+        raise ValueError("Frames with a single pulse duration")
+    bit_clusters = np.argsort(counts)[::-1][:2]
+    short, long = sorted(bit_clusters, key=lambda index: clusters.centers[index])
+
+    is_bit = np.isin(labels, bit_clusters).all(axis=0)
+    header_length = int(np.argmax(is_bit)) if is_bit.any() else length
+    header_length += header_length % 2
+    if header_length >= length - 1:
+        raise ValueError("No bits found after a header of %d pulses" % header_length)
+
+    bit_pulses = labels[:, header_length:]
+    marks = bit_pulses[:, 0::2]
+    spaces = bit_pulses[:, 1::2]
+    if not np.isin(bit_pulses, bit_clusters).all():
+        raise ValueError("Pulses of other durations between the bits")
+
+    marks_vary = (marks == long).any()
+    spaces_vary = (spaces == long).any()
+    if marks_vary and spaces_vary:
+        raise ValueError("Both marks and spaces vary, not a supported encoding")
+    if not marks_vary and not spaces_vary:
+        raise ValueError("Captured frames all carry the same bits")
+
+    header = [int(round(pulse)) for pulse in np.median(pulses[:, :header_length], 0)]
+    short_pulse = int(round(clusters.centers[short]))
+    long_pulse = int(round(clusters.centers[long]))
+
+    remaining = length - header_length
+    footer = []
+    if marks_vary:
+        # The space of the last bit is not captured.
+        bits = (remaining + 1) // 2
+        data = pulses[:, header_length::2]
+        zero = (short_pulse, short_pulse)
+        one = (long_pulse, short_pulse)
+    else:
+        # The last bit is followed by a mark, to end its space.
+        if not remaining % 2:
+            raise ValueError("Frames without a closing mark after the last space")
+        bits = remaining // 2
+        data = pulses[:, slice(header_length + 1, length - 1, 2)]
+        footer = [int(round(np.median(pulses[:, -1])))]
+        zero = (short_pulse, short_pulse)
+        one = (short_pulse, long_pulse)
+
+    threshold = (short_pulse + long_pulse) / 2
+    data_bits = data > threshold
+
+    if bits % 8:
+        layout = [["field0", bits]]
+    else:
+        values = np.packbits(data_bits, axis=1, bitorder="little")
+        layout = _infer_fields(values)
+
+    spec: dict = {
+        "name": name,
+        "header": header,
+        "zero": list(zero),
+        "one": list(one),
+    }
+    if footer:
+        spec["footer"] = footer
+
+    repeat = _learn_repeat(frames, tolerance)
+    if repeat:
+        spec["repeat"] = repeat
+
+    spec["tolerance"] = tolerance
+    spec["layouts"] = [layout]
+    return spec
+
+
+def learn_events(
+    events, name: str = "Learned", tolerance: float = 0.25, min_frames: int = 4
+) -> dict:
+    """Infer the protocol specification of RAW pysdrc.saleae.CaptureEvent objects.
+
+    Events decoded by a known protocol are ignored. The period of the protocol is
+    measured from the time between consecutive frames, when they are close enough
+    to be part of the same burst.
+    """
+    frames = []
+    timestamps = []
+    for event in events:
+        if event.protocol != decoder.RAW:
+            continue
+        frames.append(event.code)
+        timestamps.append(event.timestamp)
+
+    spec = learn(frames, name, tolerance, min_frames)
+
+    intervals = np.diff(np.asarray(timestamps, dtype=np.float64))
+    intervals = intervals[(intervals > 0) & (intervals < _MAX_PERIOD)]
+    if len(intervals):
+        spec["period"] = int(round(np.median(intervals) * 1_000_000))
+
+    return spec
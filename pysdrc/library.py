@@ -0,0 +1,342 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Persistent library of named remote codes.
+
+A CodeLibrary stores the codes of any number of remotes in an SQLite database, each
+identified by the name of the remote and the name of the button, together with the
+pulses it encodes to, ready to be sent by a pysdrc.circuitpython.transmitter
+Transmitter. Codes can be looked up by name, or by their decoded value, to name the
+button that sent a decoded frame, each with a single indexed query.
+
+Codes that no decoder supports can be stored as raw pulses instead, and looked up by
+their pysdrc.fingerprint fingerprint, so that RAW frames can be named as well.
+
+The codes are encoded with the functions in ENCODERS, by protocol name, when added.
+The device is the SIRC device or the NEC address, and the extended field is the SIRC
+extended device.
+
+Example:
+
+    with CodeLibrary("codes.db") as library:
+        library.add("TV", "POWER", "SIRC", 1, 21)
+        transmitter.transmit_pulses(library.get("TV", "POWER").pulses)
+
+        result = decoder.decode_any(pulses)
+        for code in library.find_decoded(result.protocol, result.code):
+            print(code.remote, code.name)
+
+        library.add_raw("Soundbar", "POWER", learned_pulses)
+        for code in library.find_raw(pulses):
+            print(code.remote, code.name)
+"""
+
+import array
+import collections
+import json
+import sqlite3
+import sys
+
+from pysdrc import encoder, fingerprint
+
+# A stored code. The pulses are an array.array("H"), to be treated as read-only.
+Code = collections.namedtuple(
+    "Code",
+    [
+        "remote",
+        "name",
+        "protocol",
+        "device",
+        "command",
+        "extended",
+        "force_8bit_device",
+        "pulses",
+    ],
+)
+
+# A stored raw code, with its pulses as an array.array("H").
+RawCode = collections.namedtuple("RawCode", ["remote", "name", "pulses"])
+
+# The fields of the codes in imported and exported rows.
+FIELDS = Code._fields[:-1]
+
+
+def _encode_sirc(device: int, command: int, extended, force_8bit_device: bool):
+    return encoder.encode_sirc(command, device, extended, force_8bit_device)
+
+
+def _encode_nec(device: int, command: int, extended, force_8bit_device: bool):
+    if extended is not None or force_8bit_device:
+        raise encoder.EncodeError("NEC codes have no extended device")
+    return encoder.encode_nec(device, command)
+
+
+# Functions encoding the codes of each protocol, called with the device, command,
+# extended device, and force_8bit_device fields.
+ENCODERS = {
+    "SIRC": _encode_sirc,
+    "NEC": _encode_nec,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS codes (
+    remote TEXT NOT NULL,
+    name TEXT NOT NULL,
+    protocol TEXT NOT NULL,
+    device INTEGER NOT NULL,
+    command INTEGER NOT NULL,
+    extended INTEGER,
+    force_8bit_device INTEGER NOT NULL,
+    pulses BLOB NOT NULL,
+    PRIMARY KEY (remote, name)
+);
+CREATE INDEX IF NOT EXISTS codes_by_value
+    ON codes (protocol, device, command, extended);
+CREATE TABLE IF NOT EXISTS raw_codes (
+    remote TEXT NOT NULL,
+    name TEXT NOT NULL,
+    fingerprint INTEGER NOT NULL,
+    pulses BLOB NOT NULL,
+    PRIMARY KEY (remote, name)
+);
+CREATE INDEX IF NOT EXISTS raw_codes_by_fingerprint ON raw_codes (fingerprint);
+"""
+
+_COLUMNS = ", ".join(Code._fields)
+
+_INSERT = "INSERT OR REPLACE INTO codes (%s) VALUES (%s)" % (
+    _COLUMNS,
+    ", ".join("?" * len(Code._fields)),
+)
+
+
+def _pulses_to_blob(pulses) -> bytes:
+    # Stored little-endian, so that the database can be moved between hosts.
+    pulse_array = array.array("H", pulses)
+    if sys.byteorder != "little":
+        pulse_array.byteswap()
+    return pulse_array.tobytes()
+
+
+def _blob_to_pulses(blob: bytes) -> array.array:
+    pulse_array = array.array("H")
+    pulse_array.frombytes(blob)
+    if sys.byteorder != "little":
+        pulse_array.byteswap()
+    return pulse_array
+
+
+def _row_to_code(row) -> Code:
+    remote, name, protocol, device, command, extended, force_8bit_device, blob = row
+    return Code(
+        remote,
+        name,
+        protocol,
+        device,
+        command,
+        extended,
+        bool(force_8bit_device),
+        _blob_to_pulses(blob),
+    )
+
+
+class CodeLibrary:
+    """SQLite-backed library of remote codes.
+
+    The path is the database file, created if missing, or ":memory:" for a
+    temporary library.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> "CodeLibrary":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM codes").fetchone()[0]
+
+    @staticmethod
+    def _row(
+        remote: str,
+        name: str,
+        protocol: str,
+        device: int,
+        command: int,
+        extended=None,
+        force_8bit_device: bool = False,
+    ) -> tuple:
+        try:
+            encode = ENCODERS[protocol]
+        except KeyError:
+            raise ValueError("Unknown protocol %r" % protocol)
+
+        pulses = encode(device, command, extended, force_8bit_device)
+        return (
+            remote,
+            name,
+            protocol,
+            device,
+            command,
+            extended,
+            int(force_8bit_device),
+            _pulses_to_blob(pulses),
+        )
+
+    def add(
+        self,
+        remote: str,
+        name: str,
+        protocol: str,
+        device: int,
+        command: int,
+        extended=None,
+        force_8bit_device: bool = False,
+    ) -> None:
+        """Add a code, replacing any code with the same remote and name.
+
+        Raises pysdrc.encoder.EncodeError if the code cannot be encoded.
+        """
+        row = self._row(
+            remote, name, protocol, device, command, extended, force_8bit_device
+        )
+        with self._connection:
+            self._connection.execute(_INSERT, row)
+
+    def import_codes(self, rows) -> int:
+        """Add all the codes from an iterable, in a single transaction.
+
+        Each row is a dictionary with the keys in FIELDS, or a sequence of the same
+        values in order, such as returned by export_codes(). Returns the number of
+        codes added. If any code cannot be encoded, none are added.
+        """
+        encoded = []
+        for row in rows:
+            if isinstance(row, dict):
+                encoded.append(self._row(**row))
+            else:
+                encoded.append(self._row(*row))
+
+        with self._connection:
+            self._connection.executemany(_INSERT, encoded)
+        return len(encoded)
+
+    def export_codes(self):
+        """Generate all the codes, ordered by remote and name, without their pulses."""
+        cursor = self._connection.execute(
+            "SELECT %s FROM codes ORDER BY remote, name" % ", ".join(FIELDS)
+        )
+        for row in cursor:
+            yield row[:-1] + (bool(row[-1]),)
+
+    def load_json(self, input) -> int:
+        """Import the codes from a JSON file object, as written by dump_json()."""
+        return self.import_codes(json.load(input))
+
+    def dump_json(self, output) -> None:
+        """Export all the codes to a JSON file object, as a list of objects."""
+        json.dump([dict(zip(FIELDS, row)) for row in self.export_codes()], output)
+
+    def get(self, remote: str, name: str):
+        """Return the Code with the given remote and name, or None if missing."""
+        row = self._connection.execute(
+            "SELECT %s FROM codes WHERE remote = ? AND name = ?" % _COLUMNS,
+            (remote, name),
+        ).fetchone()
+        if row is None:
+            return None
+        return _row_to_code(row)
+
+    def remove(self, remote: str, name: str) -> bool:
+        """Remove a code, returning whether it was present."""
+        with self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM codes WHERE remote = ? AND name = ?", (remote, name)
+            )
+        return cursor.rowcount > 0
+
+    def find(self, protocol: str, device: int, command: int, extended=None) -> list:
+        """Return the Codes (of any remote) with the given value."""
+        cursor = self._connection.execute(
+            "SELECT %s FROM codes WHERE protocol = ? AND device = ? AND command = ? "
+            "AND extended IS ? ORDER BY remote, name" % _COLUMNS,
+            (protocol, device, command, extended),
+        )
+        return [_row_to_code(row) for row in cursor]
+
+    def find_decoded(self, protocol: str, code) -> list:
+        """Return the Codes matching a code returned by the decoders.
+
+        Repeat codes and codes of unknown protocols match nothing.
+        """
+        if not isinstance(code, tuple):
+            return []
+        if protocol == "SIRC":
+            return self.find(protocol, code[1], code[0], *code[2:])
+        if protocol == "NEC":
+            return self.find(protocol, code[0], code[1])
+        return []
+
+    def remotes(self) -> list:
+        """Return the names of the remotes in the library."""
+        cursor = self._connection.execute(
+            "SELECT DISTINCT remote FROM codes ORDER BY remote"
+        )
+        return [remote for remote, in cursor]
+
+    def names(self, remote: str) -> list:
+        """Return the names of the codes of a remote."""
+        cursor = self._connection.execute(
+            "SELECT name FROM codes WHERE remote = ? ORDER BY name", (remote,)
+        )
+        return [name for name, in cursor]
+
+    def add_raw(self, remote: str, name: str, pulses) -> None:
+        """Add a raw code, replacing any raw code with the same remote and name."""
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO raw_codes (remote, name, fingerprint, pulses) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    remote,
+                    name,
+                    fingerprint.fingerprint(pulses),
+                    _pulses_to_blob(pulses),
+                ),
+            )
+
+    def get_raw(self, remote: str, name: str):
+        """Return the RawCode with the given remote and name, or None if missing."""
+        row = self._connection.execute(
+            "SELECT remote, name, pulses FROM raw_codes WHERE remote = ? AND name = ?",
+            (remote, name),
+        ).fetchone()
+        if row is None:
+            return None
+        return RawCode(row[0], row[1], _blob_to_pulses(row[2]))
+
+    def find_raw(self, pulses, tolerance: float = fingerprint.TOLERANCE) -> list:
+        """Return the RawCodes matching the pulses of a frame, within tolerance.
+
+        The tolerance cannot be larger than pysdrc.fingerprint.TOLERANCE.
+        """
+        fingerprint.check_tolerance(tolerance)
+        cursor = self._connection.execute(
+            "SELECT remote, name, pulses FROM raw_codes WHERE fingerprint = ? "
+            "ORDER BY remote, name",
+            (fingerprint.fingerprint(pulses),),
+        )
+        found = []
+        for remote, name, blob in cursor:
+            reference = _blob_to_pulses(blob)
+            if fingerprint.matches(pulses, reference, tolerance):
+                found.append(RawCode(remote, name, reference))
+        return found
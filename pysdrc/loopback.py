@@ -0,0 +1,165 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Simulated transmitter hardware, looped back into a receiver.
+
+LoopbackBackend can be passed as the backend of the
+pysdrc.circuitpython.transmitter transmitters in place of the default PulseioBackend.
+It simulates a PulseOut/PulseIn pair on a virtual clock, so that the encode, transmit,
+capture and decode path can be exercised on a host computer, much faster than real
+time.
+
+This module is for host computers only, and is not meant to be copied to the boards.
+"""
+
+import collections
+import random
+
+from pysdrc import decoder, saleae
+
+# PulseIn saturates the durations it records at this value.
+_MAX_PULSEIN_DURATION = 0xFFFF
+
+# Idle time before the virtual clock starts, in usec, so that the first transition is
+# not mistaken for the end of a pulse.
+_LOOPBACK_START = 100_000
+
+
+class VirtualPulseIn:
+    """Simulated pulseio.PulseIn, receiving from a LoopbackBackend."""
+
+    def __init__(self, maxlen: int = 2**16) -> None:
+        self.maxlen = maxlen
+        self.paused = False
+        self._pulses: collections.deque = collections.deque()
+
+    def _receive(self, duration: int) -> None:
+        if self.paused or len(self._pulses) >= self.maxlen:
+            return
+        self._pulses.append(min(duration, _MAX_PULSEIN_DURATION))
+
+    def __len__(self) -> int:
+        return len(self._pulses)
+
+    def __getitem__(self, index: int) -> int:
+        return self._pulses[index]
+
+    def popleft(self) -> int:
+        return self._pulses.popleft()
+
+    def clear(self) -> None:
+        self._pulses.clear()
+
+    def pause(self) -> None:
+        self.paused = True
+
+    def resume(self, trigger_duration: int = 0) -> None:
+        self.paused = False
+
+
+class VirtualPulseOut:
+    """Simulated pulseio.PulseOut, sending to a LoopbackBackend."""
+
+    def __init__(self, backend, carrier_frequency: int, duty_cycle: int) -> None:
+        self.carrier_frequency = carrier_frequency
+        self.duty_cycle = duty_cycle
+        self._backend = backend
+
+    def send(self, pulses) -> None:
+        self._backend._transmit(pulses)
+
+    def deinit(self) -> None:
+        pass
+
+
+class LoopbackBackend:
+    """Backend simulating a transmitter looped back into a receiver.
+
+    Time is virtual: sending pulses advances the clock by their duration, and sleeping
+    advances it without waiting. Every transition is recorded with its virtual
+    timestamp (in usec, in edges), and the durations are also fed to a VirtualPulseIn
+    (in pulsein). Optionally, a relative jitter is applied to each duration, as a real
+    receiver would introduce.
+    """
+
+    def __init__(
+        self, jitter: float = 0.0, seed=None, pulsein_maxlen: int = 2**16
+    ) -> None:
+        self.jitter = jitter
+        self.pulsein = VirtualPulseIn(pulsein_maxlen)
+        self.edges: list = []
+        self.pulseouts: list = []
+
+        self._random = random.Random(seed)
+        # The clock is kept in integer usec to avoid accumulating rounding errors.
+        self._now = _LOOPBACK_START
+
+    def make_pulseout(self, pin, carrier_frequency: int, duty_cycle: int):
+        pulseout = VirtualPulseOut(self, carrier_frequency, duty_cycle)
+        self.pulseouts.append(pulseout)
+        return pulseout
+
+    def sleep(self, seconds: float) -> None:
+        self._now += int(seconds * 1_000_000)
+
+    def monotonic(self) -> float:
+        return self._now / 1_000_000
+
+    def _edge(self) -> None:
+        # Like PulseIn, start recording durations from the first transition.
+        if self.edges:
+            self.pulsein._receive(self._now - self.edges[-1])
+        self.edges.append(self._now)
+
+    def _transmit(self, pulses) -> None:
+        jitter = self.jitter
+        last = len(pulses) - 1
+
+        self._edge()
+        for index, pulse in enumerate(pulses):
+            if jitter:
+                pulse = int(pulse * self._random.uniform(1 - jitter, 1 + jitter))
+            self._now += pulse
+
+            # A trailing space leaves the line idle, without a further edge.
+            if index < last or not index % 2:
+                self._edge()
+
+    def clear(self) -> None:
+        """Forget the recorded transitions and received pulses."""
+        # The last transition is kept, as the next one is still measured from it.
+        self.edges = self.edges[-1:]
+        self.pulsein.clear()
+
+    def transitions(self) -> list:
+        """Return the recorded transition times in seconds, as in a Saleae capture."""
+        return [edge / 1_000_000 for edge in self.edges]
+
+    def frames(self):
+        """Generate the (timestamp, pulses) frames of the recorded transitions.
+
+        This is the equivalent of pysdrc.saleae.times_to_frames, but works on the
+        integer timestamps, so that the durations are exactly the ones transmitted.
+        """
+        previous = 0
+        frame_start = 0
+        signal: list = []
+
+        for edge in self.edges:
+            duration = edge - previous
+            previous = edge
+            if duration > decoder.FRAME_GAP:
+                if signal:
+                    yield frame_start / 1_000_000, signal
+                signal = []
+                frame_start = edge
+                continue
+            signal.append(duration)
+
+        if signal:
+            yield frame_start / 1_000_000, signal
+
+    def decode(self):
+        """Generate the pysdrc.saleae.CaptureEvent objects for the recorded pulses."""
+        return saleae.decode_frames(self.frames())
@@ -0,0 +1,196 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Pre-compiled sequences of commands.
+
+A Macro describes a sequence of commands and pauses, such as "power on, wait 2
+seconds, select VIDEO5, press VOL+ ten times", possibly mixing protocols. Compiling it
+produces a Program: the distinct pulse buffers needed (each command already encoded,
+with its repeats, as a burst), and the schedule of buffers and delays to play.
+
+Programs can be serialized to JSON and back, and played with play(), which only sends
+the buffers and waits, with no encoding work per step. The delays are measured from
+the start of the program, so that any time spent in Python does not accumulate over
+long macros.
+
+Example:
+
+    macro = Macro()
+    macro.sirc(46, 1)
+    macro.wait(2)
+    macro.sirc(72, 1)
+    macro.sirc(18, 1, times=10)
+
+    program = macro.compile()
+    sirc_transmitter.transmit_program(program)
+"""
+
+import array
+import json
+import time
+
+from pysdrc import encoder
+
+
+class Program:
+    """A compiled macro, ready to be played.
+
+    The steps are (buffer index, delay) tuples: the buffer is sent (unless the index
+    is -1), and then the player waits for the delay (in seconds) before moving to the
+    next step.
+    """
+
+    def __init__(self, buffers, steps) -> None:
+        self.buffers = [array.array("H", buffer) for buffer in buffers]
+        self.steps = [(index, delay) for index, delay in steps]
+
+        # Time taken to send each of the buffers, in seconds.
+        self._durations = [sum(buffer) / 1_000_000 for buffer in self.buffers]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Program):
+            return NotImplemented
+        return self.buffers == other.buffers and self.steps == other.steps
+
+    def duration(self) -> float:
+        """Return the total time (in seconds) it takes to play the program."""
+        total = 0.0
+        for index, delay in self.steps:
+            if index >= 0:
+                total += self._durations[index]
+            total += delay
+        return total
+
+    def to_dict(self) -> dict:
+        return {
+            "version": 1,
+            "buffers": [list(buffer) for buffer in self.buffers],
+            "steps": [[index, delay] for index, delay in self.steps],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Program":
+        if data.get("version") != 1:
+            raise ValueError("Unsupported program version %r" % data.get("version"))
+        return cls(data["buffers"], data["steps"])
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, text: str) -> "Program":
+        return cls.from_dict(json.loads(text))
+
+
+class Macro:
+    """Builder for a sequence of commands and pauses."""
+
+    def __init__(self) -> None:
+        # Each step is a (pulses, delay) tuple, with pulses set to None for pauses.
+        self._steps: list = []
+
+    def _add(self, pulses, tail: int, times: int) -> "Macro":
+        if times < 1:
+            raise ValueError("times should be at least 1, got %d" % times)
+
+        # Bursts with spaces too long for PulseOut are sent as one buffer per segment,
+        # waiting for the spaces in between.
+        segments = encoder.burst_segments(pulses)
+        last, _ = segments.pop()
+        for _ in range(times):
+            for segment, pause in segments:
+                self._steps.append((segment, pause / 1_000_000))
+            self._steps.append((last, tail / 1_000_000))
+        return self
+
+    def sirc(
+        self,
+        command: int,
+        device: int,
+        extended_device=None,
+        force_8bit_device: bool = False,
+        repeat: int = 4,
+        times: int = 1,
+    ) -> "Macro":
+        """Add a SIRC command, sent with repeat frames, pressed times times."""
+        frame = encoder.encode_sirc(
+            command, device, extended_device, force_8bit_device=force_8bit_device
+        )
+        pulses = encoder.encode_sirc_burst(
+            command, device, extended_device, force_8bit_device, repeat
+        )
+        # Wait until the end of the last frame's period before the next command.
+        return self._add(pulses, encoder.SIRC_FRAME_PERIOD - sum(frame[:-1]), times)
+
+    def nec(
+        self, address: int, command: int, repeat: int = 1, times: int = 1
+    ) -> "Macro":
+        """Add a NEC command, followed by repeat codes, pressed times times."""
+        pulses = encoder.encode_nec_burst(address, command, repeat)
+        if repeat > 1:
+            last_frame = encoder.NEC_REPEAT
+        else:
+            last_frame = tuple(encoder.encode_nec(address, command))
+        return self._add(pulses, encoder.NEC_FRAME_PERIOD - sum(last_frame), times)
+
+    def pulses(self, pulses, gap: float = 0.025) -> "Macro":
+        """Add a set of pre-calculated pulses, followed by a gap in seconds."""
+        self._steps.append((list(pulses), gap))
+        return self
+
+    def wait(self, seconds: float) -> "Macro":
+        """Add a pause."""
+        if seconds < 0:
+            raise ValueError("Invalid wait of %f seconds" % seconds)
+        self._steps.append((None, seconds))
+        return self
+
+    def compile(self) -> Program:
+        """Compile the macro into a Program.
+
+        Identical commands share the same buffer, and pauses are merged into the delay
+        of the preceding step.
+        """
+        buffers: list = []
+        indexes: dict = {}
+        steps: list = []
+
+        for pulses, delay in self._steps:
+            if pulses is None:
+                if steps:
+                    index, previous_delay = steps[-1]
+                    steps[-1] = (index, previous_delay + delay)
+                else:
+                    steps.append((-1, delay))
+                continue
+
+            key = tuple(pulses)
+            index = indexes.get(key)
+            if index is None:
+                index = indexes[key] = len(buffers)
+                buffers.append(pulses)
+            steps.append((index, delay))
+
+        return Program(buffers, steps)
+
+
+def play(program: Program, send, sleep=time.sleep, monotonic=time.monotonic) -> None:
+    """Play a program, calling send() with each buffer to transmit.
+
+    Each step is scheduled relative to the start of the program. The send() call is
+    expected to return once the buffer has been sent.
+    """
+    buffers = program.buffers
+    durations = program._durations
+
+    deadline = monotonic()
+    for index, delay in program.steps:
+        if index >= 0:
+            send(buffers[index])
+            deadline += durations[index]
+        deadline += delay
+
+        remaining = deadline - monotonic()
+        if remaining > 0:
+            sleep(remaining)
@@ -0,0 +1,131 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Decoding of captures recording multiple receivers at once.
+
+A Saleae CSV export of multiple digital channels has a column for the state of each
+channel, and a row whenever any of them changes. The export is read once, and its
+rows are de-interleaved into the transition times of each channel. The channels are
+then decoded concurrently, one worker process per channel, and their events are
+merged back into a single stream, in the order of their timestamps, each tagged with
+the name of its channel.
+
+Logic 2 binary exports write one file per channel, which are decoded the same way.
+
+The events are passed back from worker processes, so (as described in
+pysdrc.parallel) their repeat codes should be compared by value.
+
+Example:
+
+    with open("capture.csv", newline="") as input:
+        for event in decode_csv_channels(input):
+            print(event.channel, event.protocol, event.code)
+"""
+
+import array
+import collections
+import concurrent.futures
+import csv
+import heapq
+
+from pysdrc import parallel
+
+# A decoded frame from one of the channels of a capture, with the same fields as
+# pysdrc.saleae.CaptureEvent, followed by the name of the channel.
+ChannelEvent = collections.namedtuple(
+    "ChannelEvent",
+    ["timestamp", "protocol", "code", "pulse_count", "reason", "channel"],
+)
+
+
+def read_csv_channels(input) -> dict:
+    """Read the transition times (in seconds) of each channel of a CSV export.
+
+    Returns a dictionary of array.array("d") of times, by channel name, in the order
+    of the columns.
+    """
+    reader = csv.reader(input)
+
+    headers = next(reader, None)
+    initial = next(reader, None)
+    if not headers or len(headers) < 2:
+        raise ValueError("No channels in the CSV export")
+
+    names = [name.strip() for name in headers[1:]]
+    if len(set(names)) != len(names):
+        raise ValueError("Duplicate channel names in %r" % names)
+
+    channels = [array.array("d") for _ in names]
+    if initial is None:
+        return dict(zip(names, channels))
+
+    states = initial[1:]
+    for row in reader:
+        time = float(row[0])
+        for index, state in enumerate(row[1:]):
+            if state != states[index]:
+                states[index] = state
+                channels[index].append(time)
+
+    return dict(zip(names, channels))
+
+
+def _tag(events, channel: str):
+    for timestamp, protocol, code, pulse_count, reason in events:
+        yield ChannelEvent(timestamp, protocol, code, pulse_count, reason, channel)
+
+
+def merge_channels(events_by_channel: dict):
+    """Merge the events of each channel into ChannelEvent objects, by timestamp.
+
+    The events of each channel should be in timestamp order, as decoded. Events with
+    the same timestamp are ordered as their channels.
+    """
+    return heapq.merge(
+        *(_tag(events, channel) for channel, events in events_by_channel.items()),
+        key=lambda event: event.timestamp,
+    )
+
+
+def decode_channels(channels: dict, workers=None):
+    """Decode the transition times of each channel, one worker per channel.
+
+    channels is a dictionary of transition times (in seconds), by channel name, as
+    returned by read_csv_channels(). Generates the ChannelEvent objects of all the
+    channels, in timestamp order.
+    """
+    if not channels:
+        return
+    if workers is None:
+        workers = len(channels)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(parallel.decode_times, channels.values())
+        yield from merge_channels(dict(zip(channels, results)))
+
+
+def decode_csv_channels(input, workers=None):
+    """Generate the ChannelEvent objects decoded from a multi-channel CSV export."""
+    return decode_channels(read_csv_channels(input), workers)
+
+
+def _decode_binary(path) -> list:
+    from pysdrc import saleae_binary
+
+    return list(saleae_binary.decode_binary(path))
+
+
+def decode_binary_channels(paths: dict, workers=None):
+    """Decode Logic 2 binary exports, one per channel, one worker per channel.
+
+    paths is a dictionary of file paths, by channel name. Requires numpy.
+    """
+    if not paths:
+        return
+    if workers is None:
+        workers = len(paths)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_decode_binary, paths.values())
+        yield from merge_channels(dict(zip(paths, results)))
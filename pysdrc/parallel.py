@@ -0,0 +1,123 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Parallel decoding of large captures.
+
+A capture is split into chunks of roughly the same number of transitions, with each
+boundary moved forward to the next gap between frames (as defined by
+pysdrc.decoder.FRAME_GAP), so that no frame straddles two chunks. The chunks are then
+decoded in a pool of worker processes, and the decoded events are returned in the
+order of the capture, as if decoded sequentially.
+
+Since the events are passed back from other processes, repeat codes are not the same
+object as pysdrc.decoder.NEC_REPEAT, and should be compared by value.
+"""
+
+import collections
+import concurrent.futures
+import os
+
+from pysdrc import decoder, saleae
+
+
+def _next_frame_start(times, index: int) -> int:
+    total = len(times)
+    while index < total:
+        pulse_duration = int((times[index] - times[index - 1]) * 1_000_000)
+        if pulse_duration > decoder.FRAME_GAP:
+            return index
+        index += 1
+
+    return total
+
+
+def split_at_gaps(times, chunk_size: int) -> list:
+    """Split transition times into (start, end) ranges at gaps between frames.
+
+    Each range covers at least chunk_size transitions (except the last one), and
+    starts at the first transition of a frame.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size should be at least 1, got %d" % chunk_size)
+
+    ranges = []
+    start = 0
+    while start < len(times):
+        end = _next_frame_start(times, start + chunk_size)
+        ranges.append((start, end))
+        start = end
+
+    return ranges
+
+
+def decode_times(times) -> list:
+    """Decode transition times (in seconds) into a list of CaptureEvent objects.
+
+    This is the work done by each worker process, on a whole capture or a chunk.
+    """
+    return list(saleae.decode_frames(saleae.times_to_frames(times)))
+
+
+def _decode_binary_range(path, start: int, end: int) -> list:
+    from pysdrc import saleae_binary
+
+    times = saleae_binary.read_transitions(path)[start:end]
+    return list(saleae.decode_frames(saleae_binary.transitions_to_frames(times)))
+
+
+def _map_bounded(executor, function, arguments, window: int):
+    """Generate the events of function(*args) for each of the arguments, in order.
+
+    Unlike executor.map(), the arguments are only consumed as the calls are submitted,
+    and at most window calls are pending at a time, so that neither the chunks nor
+    their decoded events are all held in memory at once.
+    """
+    pending: collections.deque = collections.deque()
+    for args in arguments:
+        if len(pending) >= window:
+            yield from pending.popleft().result()
+        pending.append(executor.submit(function, *args))
+
+    while pending:
+        yield from pending.popleft().result()
+
+
+def _workers(workers) -> int:
+    if workers is None:
+        return os.cpu_count() or 1
+    return workers
+
+
+def decode_times_parallel(times, workers=None, chunk_size: int = 1 << 18):
+    """Decode transition times (in seconds) in parallel.
+
+    Generates the same pysdrc.saleae.CaptureEvent objects as pysdrc.saleae.decode_frames
+    would for the whole capture, in the same order. Chunks are sliced and decoded as
+    the events are consumed, with up to two chunks per worker in flight.
+    """
+    workers = _workers(workers)
+    chunks = ((times[start:end],) for start, end in split_at_gaps(times, chunk_size))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from _map_bounded(executor, decode_times, chunks, 2 * workers)
+
+
+def decode_binary_parallel(path, workers=None, chunk_size: int = 1 << 20):
+    """Decode a Saleae binary export in parallel.
+
+    Each worker memory-maps the file itself, so that only the chunk boundaries are
+    passed between processes.
+    """
+    from pysdrc import saleae_binary
+
+    workers = _workers(workers)
+    ranges = split_at_gaps(saleae_binary.read_transitions(path), chunk_size)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from _map_bounded(
+            executor,
+            _decode_binary_range,
+            ((path, start, end) for start, end in ranges),
+            2 * workers,
+        )
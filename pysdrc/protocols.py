@@ -0,0 +1,508 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Declarative description of infrared protocols.
+
+A protocol is described by a specification dictionary (which can be stored as JSON),
+and compiled into a Protocol object that encodes and decodes it through precomputed
+tables, so that adding a protocol does not require writing new code.
+
+The supported protocols encode each bit as a pair of pulses (a mark and a space), and
+tell the two values apart by the length of one of the two: pulse-width encodings
+(such as SIRC) vary the mark, pulse-distance encodings (such as NEC) vary the space.
+The specification has the following keys:
+
+    name: the name reported when decoding.
+    header: the nominal pulses (in usec) sent before the bits.
+    zero, one: the nominal (mark, space) pulses of each bit value.
+    footer: the nominal pulses sent after the bits (optional).
+    repeat: the nominal pulses of the repeat frame, if the protocol has one.
+    period: the time between the start of repeated frames, in usec.
+    tolerance: the relative tolerance of the header, footer and repeat pulses.
+    windows: explicit [minimum, maximum] windows (in usec) replacing the tolerance,
+        as a dictionary of lists for the header, footer and repeat pulses, with null
+        for the pulses that are not checked (optional).
+    ratio: tell the bit values apart by comparing the varying pulse with the pulse
+        before it, instead of with the midpoint of the two nominal values: a one is
+        longer than ratio times it (optional).
+    layouts: the list of accepted layouts of the bits, each a list of fields.
+
+Each field is a [name, bits] list, possibly followed by a kind, and the bits are sent
+least significant first. Plain fields are returned in the decoded code, in order. The
+other kinds refer to a preceding plain field with the same name:
+
+    inverse: the bitwise inverse of the field, validated and not returned.
+    copy: a copy of the field, validated and not returned.
+    extend: the inverse of the field, or its high bits if the field is too large to
+        fit, like the address of extended NEC commands.
+
+Frames are captured without their trailing space, as the line stays idle after it.
+
+The SIRC and NEC specifications are built from pysdrc.timings, the same as the
+hand-written encoder and decoders (which are kept as they run on CircuitPython), so
+their compiled protocols decode and encode the same as those.
+"""
+
+from pysdrc import decoder, encoder, timings
+
+SIRC_SPEC = {
+    "name": "SIRC",
+    "header": [timings.SIRC_HEADER_MARK, timings.SIRC_SPACE],
+    "zero": [timings.SIRC_ZERO_MARK, timings.SIRC_SPACE],
+    "one": [timings.SIRC_ONE_MARK, timings.SIRC_SPACE],
+    "period": encoder.SIRC_FRAME_PERIOD,
+    "tolerance": 0.25,
+    "windows": {
+        "header": [[timings.SIRC_HEADER_MIN, timings.SIRC_HEADER_MAX], None],
+    },
+    "ratio": timings.BIT_RATIO,
+    "layouts": [
+        [["command", 7], ["device", 5]],
+        [["command", 7], ["device", 8]],
+        [["command", 7], ["device", 5], ["extended", 8]],
+    ],
+}
+
+NEC_SPEC = {
+    "name": "NEC",
+    "header": [timings.NEC_HEADER_MARK, timings.NEC_HEADER_SPACE],
+    "zero": [timings.NEC_MARK, timings.NEC_ZERO_SPACE],
+    "one": [timings.NEC_MARK, timings.NEC_ONE_SPACE],
+    "footer": [timings.NEC_MARK],
+    "repeat": list(timings.NEC_REPEAT_PULSES),
+    "period": encoder.NEC_FRAME_PERIOD,
+    "tolerance": 0.25,
+    "windows": {
+        "header": [
+            [timings.NEC_AGC_PULSE_MIN, timings.NEC_AGC_PULSE_MAX],
+            [timings.NEC_HEADER_SPACE_MIN, timings.NEC_HEADER_SPACE_MAX],
+        ],
+        "footer": [None],
+        "repeat": [
+            [timings.NEC_AGC_PULSE_MIN, timings.NEC_AGC_PULSE_MAX],
+            [timings.NEC_REPEAT_SPACE_MIN, timings.NEC_REPEAT_SPACE_MAX],
+            [timings.NEC_REPEAT_MARK_MIN, timings.NEC_REPEAT_MARK_MAX],
+        ],
+    },
+    "ratio": timings.BIT_RATIO,
+    "layouts": [
+        [
+            ["address", 8],
+            ["address", 8, "extend"],
+            ["command", 8],
+            ["command", 8, "inverse"],
+        ],
+    ],
+}
+
+SAMSUNG_SPEC = {
+    "name": "Samsung",
+    "header": [4500, 4500],
+    "zero": [560, 560],
+    "one": [560, 1690],
+    "footer": [560],
+    "period": encoder.NEC_FRAME_PERIOD,
+    "tolerance": 0.25,
+    "layouts": [
+        [
+            ["address", 8],
+            ["address", 8, "copy"],
+            ["command", 8],
+            ["command", 8, "inverse"],
+        ],
+    ],
+}
+
+_FIELD_PLAIN = 0
+_FIELD_INVERSE = 1
+_FIELD_COPY = 2
+_FIELD_EXTEND = 3
+
+_FIELD_KINDS = {
+    "inverse": _FIELD_INVERSE,
+    "copy": _FIELD_COPY,
+    "extend": _FIELD_EXTEND,
+}
+
+
+def _window(nominal: int, tolerance: float) -> tuple:
+    return int(nominal * (1 - tolerance)), int(nominal * (1 + tolerance))
+
+
+def _windows(nominal, explicit, tolerance: float) -> list:
+    # The (minimum, maximum) window of each pulse, or None if it is not checked.
+    if explicit is None:
+        return [_window(pulse, tolerance) for pulse in nominal]
+    if len(explicit) != len(nominal):
+        raise ValueError("Windows %r do not match pulses %r" % (explicit, nominal))
+    return [None if window is None else tuple(window) for window in explicit]
+
+
+def _captured_length(length: int) -> int:
+    # The trailing space of a frame is not captured.
+    if length % 2:
+        return length
+    return length - 1
+
+
+class _Layout:
+    """Tables to decode and encode one layout of the bits of a protocol."""
+
+    def __init__(self, fields, header_length: int, data_offset: int) -> None:
+        # Each operation is a (kind, shift, mask, output position, field width) tuple.
+        self.operations: list = []
+        self.outputs = 0
+        # Largest number of bits of each output value, including any extension.
+        self.limits: list = []
+
+        positions: dict = {}
+        widths: dict = {}
+        shift = 0
+
+        for field in fields:
+            if len(field) == 2:
+                name, bits = field
+                kind = _FIELD_PLAIN
+            elif len(field) == 3 and field[2] in _FIELD_KINDS:
+                name, bits, kind = field[0], field[1], _FIELD_KINDS[field[2]]
+            else:
+                raise ValueError("Invalid field %r" % (field,))
+
+            if bits < 1:
+                raise ValueError("Invalid field width %r" % (field,))
+
+            if kind == _FIELD_PLAIN:
+                if name in positions:
+                    raise ValueError("Duplicate field %r" % name)
+                position = positions[name] = self.outputs
+                widths[name] = bits
+                self.limits.append(bits)
+                self.outputs += 1
+            elif name not in positions:
+                raise ValueError("Field %r refers to an unknown field" % (field,))
+            else:
+                position = positions[name]
+                if kind == _FIELD_EXTEND:
+                    self.limits[position] += bits
+
+            self.operations.append(
+                (kind, shift, (1 << bits) - 1, position, widths[name])
+            )
+            shift += bits
+
+        if not self.outputs:
+            raise ValueError("Layout with no plain fields")
+
+        self.bits = shift
+        # Index of the pulses carrying the value of each bit, in order.
+        start = header_length + data_offset
+        self.indexes = range(start, start + shift * 2, 2)
+
+    def unpack(self, value: int):
+        """Return the plain field values, or None if the validation fails."""
+        outputs = [0] * self.outputs
+
+        for kind, shift, mask, position, width in self.operations:
+            field = (value >> shift) & mask
+            if kind == _FIELD_PLAIN:
+                outputs[position] = field
+            elif kind == _FIELD_INVERSE:
+                if field != ~outputs[position] & mask:
+                    return None
+            elif kind == _FIELD_COPY:
+                if field != outputs[position] & mask:
+                    return None
+            elif field != ~outputs[position] & mask:
+                outputs[position] |= field << width
+
+        return tuple(outputs)
+
+    def fits(self, values) -> bool:
+        if len(values) != self.outputs:
+            return False
+        for value, limit in zip(values, self.limits):
+            if not 0 <= value < 1 << limit:
+                return False
+        return True
+
+    def pack(self, values) -> int:
+        packed = 0
+
+        for kind, shift, mask, position, width in self.operations:
+            original = values[position]
+            if kind == _FIELD_PLAIN:
+                field = original & mask
+            elif kind == _FIELD_INVERSE:
+                field = ~original & mask
+            elif kind == _FIELD_COPY:
+                field = original & mask
+            elif original >> width:
+                field = original >> width
+                if field == ~original & mask:
+                    raise encoder.EncodeError(
+                        "Invalid value %x (extension == ~value)" % original
+                    )
+            else:
+                field = ~original & mask
+
+            packed |= field << shift
+
+        return packed
+
+
+class Protocol:
+    """A compiled protocol specification."""
+
+    def __init__(self, spec: dict) -> None:
+        self.spec = spec
+        self.name = spec["name"]
+        self.period = spec.get("period")
+
+        tolerance = spec.get("tolerance", 0.25)
+        header = list(spec.get("header", ()))
+        footer = list(spec.get("footer", ()))
+        repeat = spec.get("repeat")
+        windows = spec.get("windows", {})
+        self._ratio = spec.get("ratio")
+
+        zero = tuple(spec["zero"])
+        one = tuple(spec["one"])
+        if len(zero) != 2 or len(one) != 2:
+            raise ValueError("Bits should be encoded as (mark, space) pairs")
+
+        # Tell the bit values apart by the pulse that differs the most between them,
+        # comparing it with the midpoint of the two nominal values.
+        if abs(one[0] - zero[0]) >= abs(one[1] - zero[1]):
+            data_offset = 0
+        else:
+            data_offset = 1
+        if one[data_offset] == zero[data_offset]:
+            raise ValueError("The zero and one bits cannot be told apart")
+        self._threshold = (one[data_offset] + zero[data_offset]) // 2
+        self._one_longer = one[data_offset] > zero[data_offset]
+        if self._ratio is not None:
+            if not self._one_longer:
+                raise ValueError("The ratio requires the one bits to be longer")
+            if not len(header) + data_offset:
+                raise ValueError("The ratio requires a pulse before the first bit")
+
+        self.header = header
+        self.footer = footer
+        self.zero = zero
+        self.one = one
+
+        # Decoding tables, from the captured length of the frame.
+        self._layouts: dict = {}
+        self._checks: dict = {}
+        self.layouts: list = []
+
+        header_windows = _windows(header, windows.get("header"), tolerance)
+        footer_windows = _windows(footer, windows.get("footer"), tolerance)
+
+        for fields in spec["layouts"]:
+            layout = _Layout(fields, len(header), data_offset)
+            total = len(header) + layout.bits * 2 + len(footer)
+            length = _captured_length(total)
+
+            if length in self._layouts:
+                raise ValueError("Layouts with the same length %d" % length)
+            if not footer and data_offset and length < total:
+                raise ValueError("The last bit would be lost with the trailing space")
+
+            self.layouts.append(layout)
+            self._layouts[length] = layout
+
+            frame_windows = header_windows + [None] * (layout.bits * 2) + footer_windows
+            self._checks[length] = self._make_checks(frame_windows, length)
+
+        self.repeat: "list | None"
+        self.repeat_code: "str | None"
+        if repeat:
+            self.repeat = list(repeat)
+            self._repeat_length = _captured_length(len(repeat))
+            self._repeat_checks = self._make_checks(
+                _windows(self.repeat, windows.get("repeat"), tolerance),
+                self._repeat_length,
+            )
+            # Checks of the header pulses a frame of the same length would have.
+            self._short_checks = self._make_checks(
+                header_windows, min(len(header), self._repeat_length)
+            )
+            # Same convention as pysdrc.decoder.NEC_REPEAT.
+            self.repeat_code = "%s Repeat" % self.name
+        else:
+            self.repeat = None
+            self._repeat_length = -1
+            self._repeat_checks = []
+            self._short_checks = []
+            self.repeat_code = None
+
+        self.lengths = tuple(self._layouts)
+        if self.repeat is not None:
+            self.lengths += (self._repeat_length,)
+
+        if header and header_windows[0] is not None:
+            self.header_window = header_windows[0]
+        else:
+            self.header_window = (0, decoder.FRAME_GAP)
+
+    @staticmethod
+    def _make_checks(windows, length: int) -> list:
+        # The (index, minimum, maximum, reason) of each pulse with a fixed length.
+        checks = []
+        for index in range(length):
+            if windows[index] is None:
+                continue
+            minimum, maximum = windows[index]
+            if index:
+                reason = decoder.DECODE_BAD_HEADER_SPACE
+            else:
+                reason = decoder.DECODE_BAD_HEADER
+            checks.append((index, minimum, maximum, reason))
+        return checks
+
+    def __repr__(self) -> str:
+        return "<Protocol %s>" % self.name
+
+    @staticmethod
+    def _check(pulses, checks) -> int:
+        for index, minimum, maximum, reason in checks:
+            if not minimum <= pulses[index] <= maximum:
+                return reason
+        return decoder.DECODE_OK
+
+    def try_decode(self, pulses) -> tuple:
+        """Decode pulses, without raising.
+
+        Returns a (code, DECODE_OK) tuple, where the code is a tuple of the plain
+        fields or the repeat code, or a (None, reason) tuple if the pulses do not
+        match, the same as pysdrc.decoder.try_decode_sirc().
+        """
+        length = len(pulses)
+
+        if length == self._repeat_length:
+            if not self._check(pulses, self._repeat_checks):
+                return self.repeat_code, decoder.DECODE_OK
+            # Report it as a frame with a valid header that carries no bits, and so
+            # fails the checksum, the same as pysdrc.decoder.try_decode_nec().
+            reason = self._check(pulses, self._short_checks)
+            return decoder.FAILURES[reason or decoder.DECODE_BAD_CHECKSUM]
+
+        layout = self._layouts.get(length)
+        if layout is None:
+            return decoder.FAILURES[decoder.DECODE_BAD_LENGTH]
+
+        reason = self._check(pulses, self._checks[length])
+        if reason:
+            return decoder.FAILURES[reason]
+
+        value = 0
+        bit = 1
+        ratio = self._ratio
+        if ratio is None:
+            threshold = self._threshold
+            for index in layout.indexes:
+                if pulses[index] > threshold:
+                    value |= bit
+                bit <<= 1
+        else:
+            for index in layout.indexes:
+                if pulses[index] > pulses[index - 1] * ratio:
+                    value |= bit
+                bit <<= 1
+
+        if not self._one_longer:
+            value ^= bit - 1
+
+        code = layout.unpack(value)
+        if code is None:
+            return decoder.FAILURES[decoder.DECODE_BAD_CHECKSUM]
+        return code, decoder.DECODE_OK
+
+    def decode(self, pulses):
+        """Decode pulses, returning a tuple of the plain fields or the repeat code.
+
+        Raises pysdrc.decoder.DecodeException if the pulses do not match.
+        """
+        code, reason = self.try_decode(pulses)
+        if reason:
+            raise decoder.DecodeException(
+                "Invalid %s frame: %s" % (self.name, decoder.REASON_NAMES[reason]),
+                reason,
+            )
+        return code
+
+    def encode(self, *values, bits=None) -> list:
+        """Encode the plain field values into pulses.
+
+        The first layout (or the one with the provided number of bits) that can fit
+        the values is used. Raises pysdrc.encoder.EncodeError if none can.
+        """
+        for layout in self.layouts:
+            if bits is not None and layout.bits != bits:
+                continue
+            if layout.fits(values):
+                break
+        else:
+            raise encoder.EncodeError(
+                "Invalid values %r for protocol %s" % (values, self.name)
+            )
+
+        value = layout.pack(values)
+        zero = self.zero
+        one = self.one
+
+        pulses = list(self.header)
+        for _ in range(layout.bits):
+            pulses.extend(one if value & 1 else zero)
+            value >>= 1
+        pulses.extend(self.footer)
+
+        return pulses
+
+    def encode_burst(self, *values, repeat: int = 1, bits=None) -> list:
+        """Encode a command sent repeat times, one frame per period.
+
+        Protocols with a repeat frame send the command once, followed by repeat
+        frames, otherwise the command itself is repeated.
+        """
+        if repeat < 1:
+            raise encoder.EncodeError("Invalid repeat count %d" % repeat)
+        if not self.period:
+            raise encoder.EncodeError("Protocol %s has no period" % self.name)
+
+        frame = self.encode(*values, bits=bits)
+        if self.repeat is not None:
+            frames = [frame] + [self.repeat] * (repeat - 1)
+        else:
+            frames = [frame] * repeat
+
+        return encoder.encode_burst(frames, self.period)
+
+    def register(self) -> None:
+        """Register the protocol with pysdrc.decoder.decode_any()."""
+        decoder.register_protocol(
+            self.name,
+            self.decode,
+            self.lengths,
+            self.header_window,
+            try_decode=self.try_decode,
+            repeat_code=self.repeat_code,
+        )
+
+
+def compile_protocol(spec: dict) -> Protocol:
+    """Compile a protocol specification, raising ValueError if it is invalid."""
+    try:
+        return Protocol(spec)
+    except (KeyError, TypeError) as e:
+        raise ValueError("Invalid protocol specification: %r" % e)
+
+
+SIRC = compile_protocol(SIRC_SPEC)
+NEC = compile_protocol(NEC_SPEC)
+SAMSUNG = compile_protocol(SAMSUNG_SPEC)
+
+# The compiled protocols shipped with the package, by name.
+PROTOCOLS = {protocol.name: protocol for protocol in (SIRC, NEC, SAMSUNG)}
@@ -0,0 +1,95 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+# SPDX-FileCopyrightText: 2020 Facebook Inc.
+#
+# SPDX-License-Identifier: MIT
+
+"""Decoder for Saleae Logic captures.
+
+This allows decoding traces coming from an IR Decoder chip (such as the TSOP4830)
+signal line, exported from the Saleae Logic software as the CSV timing of a single
+digital channel.
+
+The capture is processed as a pipeline of generators: the transition times are read
+from the file one row at a time, split into frames on gaps longer than
+pysdrc.decoder.FRAME_GAP, and each frame is decoded as soon as it is complete. Memory
+use does not depend on the size of the capture, and decoded events are available
+while the file is still being read.
+"""
+
+import collections
+import csv
+import time
+
+from pysdrc import decoder
+
+# A decoded frame from a capture. The timestamp is the time (in seconds) of the first
+# transition of the frame, the protocol, code and reason are the same as the
+# pysdrc.decoder.DecodeResult for the frame.
+CaptureEvent = collections.namedtuple(
+    "CaptureEvent", ["timestamp", "protocol", "code", "pulse_count", "reason"]
+)
+
+
+def read_csv_times(input):
+    """Generate the transition times (in seconds) from a CSV export file object."""
+    reader = csv.reader(input)
+
+    next(reader, None)  # Ignore the headers
+    next(reader, None)  # Ignore the starting state
+
+    for row in reader:
+        yield float(row[0])
+
+
+def times_to_frames(times):
+    """Split transition times into frames of pulse durations.
+
+    Generates (timestamp, pulses) tuples, where the timestamp is the time of the first
+    transition of the frame, and the pulses are the durations (in usec) between the
+    transitions of the frame. A frame still open at the end of the capture is also
+    generated.
+    """
+    previous_pulse_time = 0.0
+    frame_start = 0.0
+    signal: list = []
+
+    # The time spent splitting the frames includes reading the times, but not the
+    # time the consumer takes to process each frame.
+    metrics = decoder.metrics
+    if metrics is not None:
+        started = time.monotonic_ns()
+
+    for pulse_time in times:
+        pulse_duration = int((pulse_time - previous_pulse_time) * 1_000_000)
+        previous_pulse_time = pulse_time
+        if pulse_duration > decoder.FRAME_GAP:
+            if signal:
+                if metrics is not None:
+                    metrics.add_time(decoder.STAGE_SEGMENTATION, started)
+                yield frame_start, signal
+                if metrics is not None:
+                    started = time.monotonic_ns()
+            signal = []
+            frame_start = pulse_time
+            continue
+        signal.append(pulse_duration)
+
+    if metrics is not None:
+        metrics.add_time(decoder.STAGE_SEGMENTATION, started)
+
+    if signal:
+        yield frame_start, signal
+
+
+def decode_frames(frames):
+    """Decode (timestamp, pulses) frames into CaptureEvent objects."""
+    for timestamp, pulses in frames:
+        result = decoder.decode_any(pulses)
+        yield CaptureEvent(
+            timestamp, result.protocol, result.code, len(pulses), result.reason
+        )
+
+
+def decode_csv(input):
+    """Generate the CaptureEvent objects decoded from a CSV export file object."""
+    return decode_frames(times_to_frames(read_csv_times(input)))
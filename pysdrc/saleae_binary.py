@@ -0,0 +1,106 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Decoder for Saleae Logic 2 binary digital exports.
+
+The binary export format stores the transition times of a digital channel as packed
+doubles, after a short header. This module memory-maps the file with numpy, so that
+transitions are accessed without parsing or copying the whole capture, and computes
+the pulse durations in chunks with vectorized operations.
+
+Frames are split with the same rules as pysdrc.saleae.times_to_frames, and decoded
+into the same pysdrc.saleae.CaptureEvent objects.
+
+The format is documented at:
+
+https://support.saleae.com/faq/technical-faq/binary-export-format-logic-2
+"""
+
+import numpy as np
+
+from pysdrc import decoder, saleae
+
+_IDENTIFIER = b"<SALEAE>"
+_TYPE_DIGITAL = 0
+
+_HEADER = np.dtype(
+    [
+        ("identifier", "S8"),
+        ("version", "<i4"),
+        ("type", "<i4"),
+        ("initial_state", "<u4"),
+        ("begin_time", "<f8"),
+        ("end_time", "<f8"),
+        ("num_transitions", "<u8"),
+    ]
+)
+
+
+class BinaryFormatError(ValueError):
+    """Raised when a file is not a supported Saleae binary digital export."""
+
+
+def read_transitions(path):
+    """Memory-map the transition times (in seconds) of a binary digital export."""
+    header = np.fromfile(path, dtype=_HEADER, count=1)
+    if len(header) != 1 or header["identifier"][0] != _IDENTIFIER:
+        raise BinaryFormatError("Not a Saleae binary export: %s" % path)
+
+    version = int(header["version"][0])
+    if version not in (0, 1):
+        raise BinaryFormatError("Unsupported binary export version %d" % version)
+
+    if header["type"][0] != _TYPE_DIGITAL:
+        raise BinaryFormatError("Not a digital channel export: %s" % path)
+
+    count = int(header["num_transitions"][0])
+    if not count:
+        return np.zeros(0, dtype="<f8")
+
+    return np.memmap(
+        path, dtype="<f8", mode="r", offset=_HEADER.itemsize, shape=(count,)
+    )
+
+
+def transitions_to_frames(times, chunk_size: int = 1 << 20):
+    """Split transition times into frames of pulse durations.
+
+    This is a vectorized equivalent of pysdrc.saleae.times_to_frames, processing the
+    times in chunks so that memory use does not depend on the size of the capture.
+    """
+    previous_pulse_time = 0.0
+    frame_start = 0.0
+    pending: list = []
+
+    for offset in range(0, len(times), chunk_size):
+        end = offset + chunk_size
+        chunk = np.asarray(times[offset:end], dtype=np.float64)
+
+        previous = np.empty_like(chunk)
+        previous[0] = previous_pulse_time
+        previous[1:] = chunk[:-1]
+        previous_pulse_time = float(chunk[-1])
+
+        durations = ((chunk - previous) * 1_000_000).astype(np.int64)
+
+        start = 0
+        for gap in np.flatnonzero(durations > decoder.FRAME_GAP):
+            pending.extend(durations[start:gap].tolist())
+            if pending:
+                yield frame_start, pending
+            pending = []
+            frame_start = float(chunk[gap])
+            start = gap + 1
+
+        pending.extend(durations[start:].tolist())
+
+    if pending:
+        yield frame_start, pending
+
+
+def decode_binary(path, chunk_size: int = 1 << 20):
+    """Generate the CaptureEvent objects decoded from a binary export file."""
+    return saleae.decode_frames(
+        transitions_to_frames(read_transitions(path), chunk_size)
+    )
@@ -0,0 +1,137 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Tracking of button presses across repeated frames.
+
+Holding a button on a NEC remote sends the full command once, followed by a repeat
+code every 108ms, which pysdrc.decoder.decode_nec reports as NEC_REPEAT without the
+command it refers to. SIRC remotes instead send the full command over and over.
+
+A SessionTracker follows the decoded frames, and collapses them into PRESS events
+when a button is pressed, HOLD events at a fixed interval while it is held, and a
+RELEASE event once the frames stop. Each event carries the command, so the consumers
+do not need to keep track of the last full command themselves.
+
+Example:
+
+    tracker = SessionTracker()
+    for event in tracker.track(saleae.decode_csv(input)):
+        print(event.kind, event.code, event.count, event.duration)
+"""
+
+import collections
+
+from pysdrc import decoder
+
+PRESS = "press"
+HOLD = "hold"
+RELEASE = "release"
+
+# The timestamp is the time (in seconds) of the frame that caused the event, the count
+# is the number of repeated frames since the press, and the duration is the time since
+# the press, in seconds.
+SessionEvent = collections.namedtuple(
+    "SessionEvent", ["kind", "timestamp", "protocol", "code", "count", "duration"]
+)
+
+
+class SessionTracker:
+    """Collapse repeated frames into press, hold and release events.
+
+    A frame is considered a repeat of the current press if it is a repeat code (one
+    of repeat_codes), or the same command as the press, and it arrives within timeout
+    seconds of the previous frame. Repeat codes with no press to refer to are
+    ignored, and counted in orphan_repeats.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 0.15,
+        hold_interval: float = 1.0,
+        repeat_codes=(decoder.NEC_REPEAT,),
+    ) -> None:
+        self.timeout = timeout
+        self.hold_interval = hold_interval
+        self.repeat_codes = frozenset(repeat_codes)
+        self.orphan_repeats = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the current press, without reporting its release."""
+        self._protocol: "str | None" = None
+        self._code: object = None
+        self._start = 0.0
+        self._last = 0.0
+        self._last_hold = 0.0
+        self._count = 0
+
+    @property
+    def active(self) -> bool:
+        """Whether a button is currently considered pressed."""
+        return self._code is not None
+
+    def _event(self, kind: str, timestamp: float) -> SessionEvent:
+        return SessionEvent(
+            kind,
+            timestamp,
+            self._protocol,
+            self._code,
+            self._count,
+            timestamp - self._start,
+        )
+
+    def _release(self) -> SessionEvent:
+        event = self._event(RELEASE, self._last)
+        self.reset()
+        return event
+
+    def expire(self, now: float) -> list:
+        """Report the release of the current press, if it timed out by now."""
+        if self._code is not None and now - self._last > self.timeout:
+            return [self._release()]
+        return []
+
+    def finish(self) -> list:
+        """Report the release of the current press, at the end of the input."""
+        if self._code is not None:
+            return [self._release()]
+        return []
+
+    def push(self, timestamp: float, protocol: str, code) -> list:
+        """Process a decoded frame, returning the resulting events (possibly none)."""
+        events = self.expire(timestamp)
+
+        if code in self.repeat_codes:
+            if self._code is None:
+                self.orphan_repeats += 1
+                return events
+        elif code != self._code or protocol != self._protocol:
+            if self._code is not None:
+                events.append(self._release())
+
+            self._protocol = protocol
+            self._code = code
+            self._start = self._last = self._last_hold = timestamp
+            events.append(self._event(PRESS, timestamp))
+            return events
+
+        self._count += 1
+        self._last = timestamp
+        if timestamp - self._last_hold >= self.hold_interval:
+            self._last_hold = timestamp
+            events.append(self._event(HOLD, timestamp))
+
+        return events
+
+    def track(self, events):
+        """Generate the session events for pysdrc.saleae.CaptureEvent objects.
+
+        Frames that could not be decoded are ignored.
+        """
+        for event in events:
+            if event.protocol == decoder.RAW:
+                continue
+            yield from self.push(event.timestamp, event.protocol, event.code)
+
+        yield from self.finish()
@@ -0,0 +1,190 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Structured output of decoded events.
+
+A sink receives pysdrc.saleae.CaptureEvent objects, buffers them, and writes them in
+batches, so that large captures are not written one line at a time. All the formats
+share the same fields:
+
+    timestamp: time of the first transition of the frame, in seconds.
+    protocol: the name of the protocol, or pysdrc.decoder.RAW.
+    code: the decoded fields, as a list of integers, or empty for repeat codes and
+        frames that could not be decoded.
+    repeat: whether the frame is the repeat code declared by its protocol.
+    pulse_count: the number of pulses in the frame.
+    reason: one of the pysdrc.decoder.DECODE_* constants.
+
+NDJSONSink and CSVSink write to text file objects. ParquetSink writes a columnar file
+with pyarrow, which needs to be installed separately.
+
+Example:
+
+    with open("events.ndjson", "w") as output:
+        with NDJSONSink(output) as sink:
+            sink.write_all(saleae.decode_csv(input))
+"""
+
+import abc
+import csv
+import json
+
+from pysdrc import decoder
+
+FIELDS = ("timestamp", "protocol", "code", "repeat", "pulse_count", "reason")
+
+
+def _code_fields(event) -> tuple:
+    """Return the (code, repeat) fields for an event."""
+    code = event.code
+    if event.protocol == decoder.RAW:
+        return [], False
+    if isinstance(code, tuple):
+        return list(code), False
+    return [], code is not None and code == decoder.repeat_code_of(event.protocol)
+
+
+class Sink(abc.ABC):
+    """Base class for the sinks, buffering events to write them in batches.
+
+    Subclasses implement _write_batch(), receiving a list of (timestamp, protocol,
+    code, repeat, pulse_count, reason) tuples.
+    """
+
+    def __init__(self, batch_size: int = 4096) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size should be at least 1, got %d" % batch_size)
+
+        self.batch_size = batch_size
+        self.count = 0
+        self._rows: list = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, event) -> None:
+        """Add an event to the output."""
+        code, repeat = _code_fields(event)
+        self._rows.append(
+            (
+                event.timestamp,
+                event.protocol,
+                code,
+                repeat,
+                event.pulse_count,
+                event.reason,
+            )
+        )
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def write_all(self, events) -> None:
+        """Add all the events from an iterable to the output."""
+        for event in events:
+            self.write(event)
+
+    def flush(self) -> None:
+        """Write the buffered events."""
+        if self._rows:
+            self._write_batch(self._rows)
+            self.count += len(self._rows)
+            self._rows = []
+
+    def close(self) -> None:
+        """Write the buffered events and finalize the output."""
+        self.flush()
+
+    @abc.abstractmethod
+    def _write_batch(self, rows: list) -> None:
+        pass
+
+
+class NDJSONSink(Sink):
+    """Write events as newline-delimited JSON objects."""
+
+    def __init__(self, output, batch_size: int = 4096) -> None:
+        super().__init__(batch_size)
+        self._output = output
+        self._encoder = json.JSONEncoder(separators=(",", ":"))
+
+    def _write_batch(self, rows: list) -> None:
+        encode = self._encoder.encode
+        self._output.write(
+            "".join(encode(dict(zip(FIELDS, row))) + "\n" for row in rows)
+        )
+
+
+class CSVSink(Sink):
+    """Write events as CSV, with the code fields separated by spaces."""
+
+    def __init__(self, output, batch_size: int = 4096) -> None:
+        super().__init__(batch_size)
+        self._writer = csv.writer(output)
+        self._writer.writerow(FIELDS)
+
+    def _write_batch(self, rows: list) -> None:
+        self._writer.writerows(
+            (
+                timestamp,
+                protocol,
+                " ".join(str(field) for field in code),
+                int(repeat),
+                pulse_count,
+                reason,
+            )
+            for timestamp, protocol, code, repeat, pulse_count, reason in rows
+        )
+
+
+class ParquetSink(Sink):
+    """Write events to a Parquet file, one row group per batch.
+
+    The output can be a path or a binary file object. Requires pyarrow.
+    """
+
+    def __init__(self, output, batch_size: int = 65536) -> None:
+        super().__init__(batch_size)
+
+        import pyarrow
+        import pyarrow.parquet
+
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema(
+            [
+                ("timestamp", pyarrow.float64()),
+                ("protocol", pyarrow.string()),
+                ("code", pyarrow.list_(pyarrow.int64())),
+                ("repeat", pyarrow.bool_()),
+                ("pulse_count", pyarrow.int32()),
+                ("reason", pyarrow.int8()),
+            ]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(output, self._schema)
+
+    def _write_batch(self, rows: list) -> None:
+        columns = [list(column) for column in zip(*rows)]
+        self._writer.write_table(
+            self._pyarrow.Table.from_arrays(
+                [
+                    self._pyarrow.array(column, type=field.type)
+                    for column, field in zip(columns, self._schema)
+                ],
+                schema=self._schema,
+            )
+        )
+
+    def close(self) -> None:
+        super().close()
+        self._writer.close()
+
+
+# The sinks by format name, as used by the examples.
+SINKS = {
+    "ndjson": NDJSONSink,
+    "csv": CSVSink,
+    "parquet": ParquetSink,
+}
@@ -0,0 +1,16 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Helpers shared by the test modules."""
+
+# Largest transient allocation allowed for a single call of the encode_*_into() and
+# decode_*_into() functions, as documented in README.md. On CPython this only covers
+# boxed integers; nothing may be retained after the call.
+ENCODE_INTO_BUDGET_BYTES = 128
+DECODE_INTO_BUDGET_BYTES = 256
+
+
+def jitter(pulses, rng, fraction=0.05) -> list:
+    """Return the pulses, each scaled by a random factor within 1 ± fraction."""
+    return [round(pulse * rng.uniform(1 - fraction, 1 + fraction)) for pulse in pulses]
@@ -0,0 +1,109 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import io
+import unittest
+
+from pysdrc import aio, encoder, loopback
+from pysdrc.circuitpython import transmitter
+
+
+def _loopback(commands):
+    simulated = loopback.LoopbackBackend()
+    sirc_transmitter = transmitter.SIRCTransmitter(
+        None, backend=simulated, default_repeat=1
+    )
+    for command in commands:
+        sirc_transmitter.transmit_command(command, 1)
+    return simulated
+
+
+def _durations(simulated) -> bytes:
+    return b"".join(b"%d\n" % duration for duration in simulated.pulsein._pulses)
+
+
+async def _collect(subscription, delay: float = 0):
+    events = []
+    async for event in subscription:
+        events.append(event.code)
+        if delay:
+            await asyncio.sleep(delay)
+    return events
+
+
+class EventStreamTest(unittest.TestCase):
+    def test_csv_fan_out(self):
+        simulated = _loopback(range(100))
+        csv = "Time [s], Channel 0\n0.0,1\n" + "".join(
+            "%f,0\n" % time for time in simulated.transitions()
+        )
+
+        async def main():
+            stream = aio.EventStream(aio.csv_source(io.StringIO(csv)))
+            first = stream.subscribe(maxsize=4)
+            second = stream.subscribe(maxsize=4)
+            return await asyncio.gather(_collect(first), _collect(second), stream.run())
+
+        first, second, _ = asyncio.run(main())
+        expected = [(command, 1) for command in range(100)]
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+
+    def test_backpressure_and_drop(self):
+        simulated = _loopback(range(20))
+
+        async def main():
+            reader = asyncio.StreamReader()
+            reader.feed_data(_durations(simulated))
+            reader.feed_eof()
+
+            stream = aio.EventStream(aio.stream_source(reader))
+            slow = stream.subscribe(maxsize=2)
+            lossy = stream.subscribe(maxsize=2, drop=True)
+            results = await asyncio.gather(
+                _collect(slow, 0.001), stream.run(), _collect(lossy, 0.01)
+            )
+            return results[0], results[2], lossy.dropped
+
+        slow, lossy, dropped = asyncio.run(main())
+        self.assertEqual(slow, [(command, 1) for command in range(20)])
+        self.assertEqual(len(lossy) + dropped, 20)
+        self.assertGreater(dropped, 0)
+
+    def test_many_receivers(self):
+        async def receiver(index):
+            reader = asyncio.StreamReader()
+            pulses = encoder.encode_nec(index, 5) + [20000]
+            reader.feed_data(b"".join(b"%d\n" % pulse for pulse in pulses * 10))
+            reader.feed_eof()
+
+            stream = aio.EventStream(aio.stream_source(reader))
+            subscription = stream.subscribe()
+            events, _ = await asyncio.gather(_collect(subscription), stream.run())
+            return events
+
+        async def main():
+            return await asyncio.gather(*(receiver(index) for index in range(200)))
+
+        results = asyncio.run(main())
+        for index, events in enumerate(results):
+            self.assertEqual(events, [(index, 5)] * 10)
+
+    def test_pulsein(self):
+        simulated = _loopback([18, 19])
+
+        async def main():
+            stream = aio.EventStream(aio.pulsein_source(simulated.pulsein, 0.001))
+            subscription = stream.subscribe()
+            task = asyncio.ensure_future(stream.run())
+
+            events = []
+            async for event in subscription:
+                events.append(event.code)
+                if len(events) == 2:
+                    task.cancel()
+            return events
+
+        self.assertEqual(asyncio.run(main()), [(18, 1), (19, 1)])
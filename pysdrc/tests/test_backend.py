@@ -0,0 +1,67 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import ast
+import os
+import unittest
+
+# Modules available on CircuitPython, that the board-side modules may import.
+_CIRCUITPYTHON_MODULES = {
+    "array",
+    "asyncio",
+    "collections",
+    "micropython",
+    "pulseio",
+    "sys",
+    "time",
+}
+
+_BOARD_MODULES = (
+    "circuitpython/backend.py",
+    "circuitpython/transmitter.py",
+    "encoder.py",
+    "timings.py",
+)
+
+
+def _module_level(node):
+    """Generate the nodes run on import, skipping the bodies of functions."""
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        yield child
+        yield from _module_level(child)
+
+
+def _imports(path: str):
+    """Generate the names of the modules imported by a source file on import."""
+    with open(path) as source:
+        tree = ast.parse(source.read())
+
+    for node in _module_level(tree):
+        if isinstance(node, ast.Import):
+            yield from (alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+            # Either "from pysdrc.package import module" or "from pysdrc.module import
+            # name": only the former names modules.
+            if module in ("pysdrc", "pysdrc.circuitpython"):
+                yield from ("%s.%s" % (module, alias.name) for alias in node.names)
+            else:
+                yield module
+
+
+class BoardImportsTest(unittest.TestCase):
+    def test_circuitpython_imports(self):
+        package = os.path.dirname(os.path.dirname(__file__))
+        board_modules = {
+            "pysdrc.%s" % module[:-3].replace("/", ".") for module in _BOARD_MODULES
+        }
+
+        for module in _BOARD_MODULES:
+            for name in _imports(os.path.join(package, module)):
+                if name.startswith("pysdrc."):
+                    self.assertIn(name, board_modules, module)
+                else:
+                    self.assertIn(name.split(".")[0], _CIRCUITPYTHON_MODULES, module)
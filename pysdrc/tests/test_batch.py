@@ -0,0 +1,165 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import random
+import unittest
+
+from pysdrc import decoder, encoder
+from pysdrc.tests.helpers import jitter
+
+try:
+    import numpy
+
+    from pysdrc import batch
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+
+def _scalar_sirc(pulses):
+    try:
+        code = decoder.decode_sirc(pulses)
+    except decoder.SIRCDecodeException:
+        return None
+    if len(code) == 2:
+        return code + (-1,)
+    return code
+
+
+def _scalar_nec(pulses):
+    try:
+        code = decoder.decode_nec(pulses)
+    except decoder.NECDecodeException:
+        return None
+    if code is decoder.NEC_REPEAT:
+        return "repeat"
+    return code
+
+
+@unittest.skipIf(numpy is None, "numpy not available")
+class BatchDecoderTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(42)
+
+    def _sirc_frames(self):
+        frames = []
+        for _ in range(200):
+            command = self.rng.randrange(2**7)
+            kind = self.rng.choice(["12", "15", "20"])
+            if kind == "12":
+                pulses = encoder.encode_sirc(command, self.rng.randrange(2**5))
+            elif kind == "15":
+                pulses = encoder.encode_sirc(
+                    command, self.rng.randrange(2**8), force_8bit_device=True
+                )
+            else:
+                pulses = encoder.encode_sirc(
+                    command, self.rng.randrange(2**5), self.rng.randrange(1, 2**8)
+                )
+            # The encoder adds a trailing space that captures do not include.
+            frames.append(jitter(pulses[:-1], self.rng, 0.15))
+
+        # Add some invalid frames to the mix.
+        frames.append([200000] + frames[0][1:])
+        frames.append(frames[0][:-3])
+        frames.append([2400, 600, 600])
+        frames.append([])
+        return frames
+
+    def _nec_frames(self):
+        frames = []
+        for _ in range(200):
+            command = self.rng.randrange(2**8)
+            address = self.rng.choice(
+                [self.rng.randrange(2**8), 0x1234, self.rng.randrange(2**16)]
+            )
+            try:
+                pulses = encoder.encode_nec(address, command)
+            except encoder.EncodeError:
+                continue
+            frames.append(jitter(pulses, self.rng, 0.15))
+
+        frames.append(list(encoder.NEC_REPEAT))
+        frames.append([9000, 4500, 560])
+        frames.append([9000, 3000] + frames[0][2:])
+        frames.append([5000] + frames[0][1:])
+        broken = list(frames[0])
+        broken[-2] = 2000 if broken[-2] < 1000 else 560
+        frames.append(broken)
+        return frames
+
+    def _assert_sirc_matches(self, frames, result):
+        for index, pulses in enumerate(frames):
+            expected = _scalar_sirc(pulses)
+            if expected is None:
+                self.assertNotEqual(result.errors[index], decoder.DECODE_OK)
+                self.assertEqual(result.commands[index], -1)
+            else:
+                self.assertEqual(result.errors[index], decoder.DECODE_OK)
+                self.assertEqual(
+                    (
+                        result.commands[index],
+                        result.devices[index],
+                        result.extended[index],
+                    ),
+                    expected,
+                )
+
+    def test_sirc_padded(self):
+        frames = self._sirc_frames()
+        flat = [pulse for pulses in frames for pulse in pulses]
+        offsets = numpy.cumsum([0] + [len(pulses) for pulses in frames])
+
+        padded, lengths = batch.frames_from_buffer(flat, offsets)
+        self._assert_sirc_matches(frames, batch.decode_sirc_batch(padded, lengths))
+
+    def test_sirc_error_codes(self):
+        frames = [
+            [200000] + [600] * 24,
+            [2400] + [600] * 20,
+        ]
+        padded, lengths = batch.frames_from_buffer(
+            [pulse for pulses in frames for pulse in pulses], [0, 25, 46]
+        )
+        result = batch.decode_sirc_batch(padded, lengths)
+        self.assertEqual(
+            list(result.errors),
+            [decoder.DECODE_BAD_HEADER, decoder.DECODE_BAD_LENGTH],
+        )
+
+    def test_sirc_uniform(self):
+        frames = [encoder.encode_sirc(18, 1)[:-1], encoder.encode_sirc(19, 1)[:-1]]
+        result = batch.decode_sirc_batch(numpy.array(frames, dtype=numpy.uint16))
+        self.assertEqual(list(result.commands), [18, 19])
+        self.assertEqual(list(result.devices), [1, 1])
+
+    def test_nec_padded(self):
+        frames = self._nec_frames()
+        flat = [pulse for pulses in frames for pulse in pulses]
+        offsets = numpy.cumsum([0] + [len(pulses) for pulses in frames])
+
+        padded, lengths = batch.frames_from_buffer(flat, offsets)
+        result = batch.decode_nec_batch(padded, lengths)
+
+        for index, pulses in enumerate(frames):
+            expected = _scalar_nec(pulses)
+            if expected == "repeat":
+                self.assertTrue(result.repeats[index])
+                self.assertEqual(result.errors[index], decoder.DECODE_OK)
+            elif expected is None:
+                self.assertFalse(result.repeats[index])
+                self.assertNotEqual(result.errors[index], decoder.DECODE_OK)
+            else:
+                self.assertFalse(result.repeats[index])
+                self.assertEqual(
+                    (result.addresses[index], result.commands[index]), expected
+                )
+
+    def test_nec_extended_address(self):
+        result = batch.decode_nec_batch([encoder.encode_nec(0x1234, 5)])
+        self.assertEqual(result.addresses[0], 0x1234)
+        self.assertEqual(decoder.decode_nec(encoder.encode_nec(0x1234, 5)), (0x1234, 5))
+
+    def test_empty(self):
+        result = batch.decode_nec_batch(numpy.zeros((0, 0)))
+        self.assertEqual(len(result.errors), 0)
@@ -0,0 +1,54 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from pysdrc import decoder
+from pysdrc.benchmarks import corpus, runner
+
+
+class CorpusTest(unittest.TestCase):
+    def test_repeatable(self):
+        self.assertEqual(
+            corpus.Corpus(count=100, seed=1).frames,
+            corpus.Corpus(count=100, seed=1).frames,
+        )
+        self.assertNotEqual(
+            corpus.Corpus(count=100, seed=1).frames,
+            corpus.Corpus(count=100, seed=2).frames,
+        )
+
+    def test_decodable(self):
+        test_corpus = corpus.Corpus(count=200, jitter=0)
+
+        for kind, _, pulses in test_corpus.frames:
+            result = decoder.decode_any(pulses)
+            if kind == "GARBAGE":
+                continue
+            self.assertEqual(result.protocol, "SIRC" if "SIRC" in kind else "NEC")
+
+
+class RunnerTest(unittest.TestCase):
+    def test_run(self):
+        results = runner.run_benchmarks(corpus.Corpus(count=50), repeat=1, samples=5)
+
+        self.assertIn("decode_any", results["benchmarks"])
+        self.assertIn("times_to_frames", results["benchmarks"])
+        for name, result in results["benchmarks"].items():
+            self.assertGreater(result["frames"], 0)
+            # The non-raising decoders do not allocate for frames they reject.
+            if not name.startswith("try_decode"):
+                self.assertGreater(result["peak_bytes_per_frame"], 0)
+
+        # The batch decoders cover the whole corpus in one call, but their figures
+        # are still per frame, well below a single frame's scalar decode.
+        benchmarks = results["benchmarks"]
+        if "decode_sirc_batch" in benchmarks:
+            self.assertLess(
+                benchmarks["decode_sirc_batch"]["blocks_per_frame"],
+                benchmarks["decode_sirc"]["blocks_per_frame"],
+            )
+
+        ratios = runner.compare(results, results)
+        self.assertEqual(set(ratios.values()), {1.0})
@@ -0,0 +1,80 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import array
+import unittest
+
+from pysdrc import cache, encoder
+
+
+class PulseCacheTest(unittest.TestCase):
+    def test_sirc(self):
+        pulse_cache = cache.PulseCache()
+
+        pulses = pulse_cache.encode_sirc(18, 1)
+        self.assertIsInstance(pulses, array.array)
+        self.assertEqual(list(pulses), encoder.encode_sirc(18, 1))
+        self.assertIs(pulse_cache.encode_sirc(18, 1), pulses)
+
+        self.assertEqual(pulse_cache.hits, 1)
+        self.assertEqual(pulse_cache.misses, 1)
+
+    def test_nec(self):
+        pulse_cache = cache.PulseCache()
+
+        pulses = pulse_cache.encode_nec(128, 5)
+        self.assertEqual(list(pulses), encoder.encode_nec(128, 5))
+        self.assertIsNot(pulse_cache.encode_nec(5, 128), pulses)
+
+    def test_burst(self):
+        pulse_cache = cache.PulseCache()
+
+        burst = pulse_cache.encode_nec_burst(128, 5, repeat=3)
+        self.assertEqual(
+            [(list(pulses), pause) for pulses, pause in burst],
+            encoder.burst_segments(encoder.encode_nec_burst(128, 5, repeat=3)),
+        )
+        self.assertIs(pulse_cache.encode_nec_burst(128, 5, repeat=3), burst)
+        self.assertNotEqual(pulse_cache.encode_nec(128, 5), burst)
+
+        self.assertNotEqual(
+            pulse_cache.encode_sirc_burst(18, 1, repeat=2),
+            pulse_cache.encode_sirc_burst(18, 1, repeat=3),
+        )
+
+    def test_flags_in_key(self):
+        pulse_cache = cache.PulseCache()
+
+        self.assertNotEqual(
+            pulse_cache.encode_sirc(18, 1),
+            pulse_cache.encode_sirc(18, 1, force_8bit_device=True),
+        )
+        self.assertEqual(len(pulse_cache), 2)
+
+    def test_lru_eviction(self):
+        pulse_cache = cache.PulseCache(maxsize=2)
+
+        first = pulse_cache.encode_sirc(1, 1)
+        pulse_cache.encode_sirc(2, 1)
+        # Using the first entry makes the second one the least recently used.
+        self.assertIs(pulse_cache.encode_sirc(1, 1), first)
+        pulse_cache.encode_sirc(3, 1)
+
+        self.assertEqual(len(pulse_cache), 2)
+        self.assertIs(pulse_cache.encode_sirc(1, 1), first)
+        pulse_cache.encode_sirc(2, 1)
+        self.assertEqual(
+            pulse_cache.stats(), {"hits": 2, "misses": 4, "size": 2, "maxsize": 2}
+        )
+
+    def test_invalid_not_cached(self):
+        pulse_cache = cache.PulseCache()
+
+        with self.assertRaises(encoder.EncodeError):
+            pulse_cache.encode_nec(128, 256)
+        self.assertEqual(len(pulse_cache), 0)
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            cache.PulseCache(maxsize=0)
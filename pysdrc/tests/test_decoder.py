@@ -2,9 +2,13 @@
 #
 # SPDX-License-Identifier: MIT
 
+import array
+import tracemalloc
 import unittest
 
-from pysdrc import decoder
+from pysdrc import decoder, encoder
+from pysdrc.benchmarks import corpus
+from pysdrc.tests.helpers import DECODE_INTO_BUDGET_BYTES
 
 
 class SIRCDecoderTest(unittest.TestCase):
@@ -284,3 +288,294 @@ class NECDecoderTest(unittest.TestCase):
 
         with self.assertRaises(decoder.NECDecodeException):
             decoder.decode_nec(pulses)
+
+    def test_extended_address(self):
+        pulses = [9000, 4500]
+        for byte in (0x34, 0x12, 0x05, 0xFA):
+            for _ in range(8):
+                pulses.extend((560, 1690 if byte & 1 else 560))
+                byte >>= 1
+        pulses.append(560)
+
+        self.assertEqual(decoder.decode_nec(pulses), (0x1234, 5))
+
+
+class DecodeAnyTest(unittest.TestCase):
+    def test_sirc(self):
+        pulses = [2400] + [600] * 24
+        result = decoder.decode_any(pulses)
+        self.assertTrue(result)
+        self.assertEqual(result.protocol, "SIRC")
+        self.assertEqual(result.code, (0, 0))
+
+    def test_nec_repeat(self):
+        result = decoder.decode_any([9000, 2250, 560])
+        self.assertEqual(result.protocol, "NEC")
+        self.assertIs(result.code, decoder.NEC_REPEAT)
+
+    def test_raw_length(self):
+        pulses = [2400, 600, 600, 600, 600]
+        result = decoder.decode_any(pulses)
+        self.assertFalse(result)
+        self.assertEqual(result.protocol, decoder.RAW)
+        self.assertIs(result.code, pulses)
+        self.assertEqual(result.reason, decoder.DECODE_BAD_LENGTH)
+
+    def test_raw_header(self):
+        result = decoder.decode_any([5000] + [600] * 24)
+        self.assertEqual(result.protocol, decoder.RAW)
+        self.assertEqual(result.reason, decoder.DECODE_BAD_HEADER)
+
+    def test_raw_checksum(self):
+        pulses = [9000, 4500] + [560] * 65
+        result = decoder.decode_any(pulses)
+        self.assertEqual(result.protocol, decoder.RAW)
+        self.assertEqual(result.reason, decoder.DECODE_BAD_CHECKSUM)
+
+    def test_register_protocol(self):
+        def decode_test(pulses):
+            if pulses[1] != 1000:
+                raise decoder.DecodeException("Invalid space")
+            return "test"
+
+        decoder.register_protocol("TEST", decode_test, (4,), (3000, 4000))
+        try:
+            self.assertEqual(decoder.decode_any([3500, 1000, 1, 1]).protocol, "TEST")
+            result = decoder.decode_any([3500, 900, 1, 1])
+            self.assertEqual(result.protocol, decoder.RAW)
+            self.assertEqual(result.reason, decoder.DECODE_INVALID)
+        finally:
+            decoder._PROTOCOLS_BY_LENGTH.pop(4)
+
+    def test_repeat_code_of(self):
+        self.assertEqual(decoder.repeat_code_of("NEC"), decoder.NEC_REPEAT)
+        self.assertIsNone(decoder.repeat_code_of("SIRC"))
+        self.assertIsNone(decoder.repeat_code_of(decoder.RAW))
+
+
+class _FakePulseIn:
+    """Minimal stand-in for pulseio.PulseIn, only supporting indexed access."""
+
+    def __init__(self, pulses):
+        self._pulses = list(pulses)
+
+    def __len__(self):
+        return len(self._pulses)
+
+    def __getitem__(self, index):
+        if not isinstance(index, int):
+            raise TypeError("PulseIn only supports integer indexes")
+        return self._pulses[index]
+
+
+class DecodeIntoTest(unittest.TestCase):
+    def setUp(self):
+        self.corpus = corpus.Corpus(count=500, jitter=0.05)
+
+    def _expected_sirc(self, pulses):
+        try:
+            code = decoder.decode_sirc(pulses)
+        except decoder.DecodeException as e:
+            return e.reason, None
+        return decoder.DECODE_OK, list(code) + [-1] * (3 - len(code))
+
+    def _expected_nec(self, pulses):
+        try:
+            code = decoder.decode_nec(pulses)
+        except decoder.DecodeException as e:
+            return e.reason, None
+        if code is decoder.NEC_REPEAT:
+            return decoder.DECODE_OK, [-1, -1, 1]
+        return decoder.DECODE_OK, list(code) + [0]
+
+    def _check(self, decode_into, expected, wrap):
+        result = array.array("l", [0, 0, 0])
+        for pulses in self.corpus.pulses():
+            reason, code = expected(pulses)
+            self.assertEqual(decode_into(wrap(pulses), result), reason)
+            if code is not None:
+                self.assertEqual(list(result), code)
+
+    def test_sirc_list(self):
+        self._check(decoder.decode_sirc_into, self._expected_sirc, list)
+
+    def test_sirc_array(self):
+        self._check(
+            decoder.decode_sirc_into,
+            self._expected_sirc,
+            lambda pulses: memoryview(array.array("H", pulses)),
+        )
+
+    def test_nec_array(self):
+        self._check(
+            decoder.decode_nec_into,
+            self._expected_nec,
+            lambda pulses: array.array("H", pulses),
+        )
+
+    def test_nec_pulsein(self):
+        self._check(decoder.decode_nec_into, self._expected_nec, _FakePulseIn)
+
+    def test_memory_budget(self):
+        result = array.array("l", (0, 0, 0))
+        calls = (
+            (decoder.decode_sirc_into, self.corpus.pulses("SIRC20")),
+            (decoder.decode_nec_into, self.corpus.pulses("NEC", "GARBAGE")),
+        )
+
+        for function, frames in calls:
+            tracemalloc.start()
+            try:
+                for pulses in frames:
+                    pulses = array.array("H", pulses)
+                    tracemalloc.clear_traces()
+                    function(pulses, result)
+                    current, peak = tracemalloc.get_traced_memory()
+
+                    self.assertEqual(current, 0, function.__name__)
+                    self.assertLessEqual(
+                        peak, DECODE_INTO_BUDGET_BYTES, function.__name__
+                    )
+            finally:
+                tracemalloc.stop()
+
+    def test_offset(self):
+        pulses = array.array("H", [1, 2, 3] + self.corpus.pulses("SIRC20")[0] + [4])
+        result = [0, 0, 0]
+
+        self.assertEqual(
+            decoder.decode_sirc_into(pulses, result, start=3, length=41),
+            decoder.DECODE_OK,
+        )
+        self.assertEqual(tuple(result), decoder.decode_sirc(list(pulses[3:44])))
+
+    def test_nec_lengths(self):
+        full = encoder.encode_nec(128, 5)
+        frames = [
+            # A 3-pulse frame that is not a repeat code.
+            [9000, 4500, 560],
+            [9000, 2250, 560],
+            # Truncated frames, only decoding the first pulses in range.
+            full[:3],
+            full[:20],
+        ]
+        result = [0, 0, 0]
+
+        for pulses in frames:
+            expected = self._expected_nec(pulses)[0]
+            padded = array.array("H", [1, 2] + pulses + full)
+            for decode_args in (
+                (array.array("H", pulses), result),
+                (padded, result, 2, len(pulses)),
+            ):
+                self.assertEqual(
+                    decoder.decode_nec_into(*decode_args), expected, pulses
+                )
+
+        self.assertEqual(
+            decoder.decode_nec_into(full, result, 0, 3), decoder.DECODE_BAD_CHECKSUM
+        )
+        self.assertEqual(
+            decoder.decode_nec_into([1] + full, result, 1, 67), decoder.DECODE_OK
+        )
+        self.assertEqual(result, [128, 5, 0])
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.metrics = decoder.enable_metrics()
+        self.metrics.reset()
+
+    def tearDown(self):
+        decoder.disable_metrics()
+
+    def test_counters(self):
+        test_corpus = corpus.Corpus(count=200, seed=4, jitter=0)
+        results = [decoder.decode_any(pulses) for pulses in test_corpus.pulses()]
+
+        decoded = sum(1 for result in results if result)
+        self.assertEqual(sum(self.metrics.successes.values()), decoded)
+        self.assertEqual(sum(self.metrics.failures.values()), len(results) - decoded)
+        self.assertEqual(
+            self.metrics.attempts["SIRC"],
+            len(test_corpus.pulses("SIRC12", "SIRC15", "SIRC20")),
+        )
+
+        stages = self.metrics.as_dict()["stages"]
+        self.assertEqual(
+            stages[decoder.STAGE_BIT_EXTRACTION]["calls"],
+            len(test_corpus.pulses("SIRC12", "SIRC15", "SIRC20", "NEC")),
+        )
+        self.assertGreater(stages[decoder.STAGE_VALIDATION]["ns"], 0)
+
+    def test_failure_reasons(self):
+        decoder.decode_any([9000, 3000, 560])
+        decoder.decode_any([1, 2, 3, 4, 5])
+        decoder.decode_any([100] * 25)
+
+        self.assertEqual(
+            self.metrics.as_dict()["failures"],
+            {
+                "NEC": {"bad_header_space": 1},
+                "RAW": {"bad_length": 1, "bad_header": 1},
+            },
+        )
+
+    def test_prometheus(self):
+        decoder.decode_any([9000, 2250, 560])
+
+        text = self.metrics.to_prometheus()
+        self.assertIn("# TYPE pysdrc_decode_attempts_total counter\n", text)
+        self.assertIn('pysdrc_decode_successes_total{protocol="NEC"} 1\n', text)
+        self.assertIn('pysdrc_stage_calls_total{stage="validation"} 1\n', text)
+
+    def test_disabled(self):
+        decoder.disable_metrics()
+        decoder.decode_any([9000, 2250, 560])
+
+        self.assertIsNone(decoder.metrics)
+        self.assertEqual(self.metrics.attempts, {})
+        self.assertEqual(self.metrics.stage_calls, {})
+
+    def test_disabled_dispatch(self):
+        sirc = decoder._PROTOCOLS_BY_LENGTH[25][0]
+        self.assertIsNot(sirc.try_decode, decoder.try_decode_sirc)
+
+        decoder.disable_metrics()
+        self.assertIs(sirc.try_decode, decoder.try_decode_sirc)
+
+
+class TryDecodeTest(unittest.TestCase):
+    corpus = corpus.Corpus(count=500, seed=5)
+
+    def _check(self, try_decode, decode):
+        for pulses in self.corpus.pulses():
+            try:
+                expected = (decode(pulses), decoder.DECODE_OK)
+            except decoder.DecodeException as e:
+                expected = (None, e.reason)
+
+            self.assertEqual(try_decode(pulses), expected)
+
+    def test_sirc(self):
+        self._check(decoder.try_decode_sirc, decoder.decode_sirc)
+
+    def test_nec(self):
+        self._check(decoder.try_decode_nec, decoder.decode_nec)
+
+    def test_failure_preallocated(self):
+        pulses = [2400] + [600] * 10
+
+        first = decoder.try_decode_sirc(pulses)
+        self.assertIs(decoder.try_decode_nec(pulses), first)
+        self.assertEqual(first, (None, decoder.DECODE_BAD_LENGTH))
+
+        tracemalloc.start()
+        try:
+            for _ in range(100):
+                tracemalloc.clear_traces()
+                decoder.try_decode_sirc(pulses)
+                decoder.try_decode_nec(pulses)
+                self.assertEqual(tracemalloc.get_traced_memory(), (0, 0))
+        finally:
+            tracemalloc.stop()
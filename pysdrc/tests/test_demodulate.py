@@ -0,0 +1,58 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from pysdrc import encoder, saleae
+
+try:
+    import numpy
+
+    from pysdrc import demodulate
+except ImportError:
+    numpy = None  # type: ignore
+
+
+@unittest.skipIf(numpy is None, "numpy not available")
+class DemodulateTest(unittest.TestCase):
+    def _decode(self, times):
+        return [
+            (event.protocol, event.code)
+            for event in saleae.decode_frames(saleae.times_to_frames(times))
+        ]
+
+    def test_nec(self):
+        pulses = encoder.encode_nec_burst(128, 5, repeat=3)
+        raw = demodulate.modulate(pulses, 38_000, 1 / 3)
+
+        # Every carrier cycle is a frame of its own before demodulation.
+        self.assertGreater(len(raw), 1000)
+
+        times, carrier = demodulate.demodulate(raw)
+        self.assertEqual(
+            self._decode(times),
+            [("NEC", (128, 5)), ("NEC", "NEC Repeat"), ("NEC", "NEC Repeat")],
+        )
+        self.assertAlmostEqual(carrier.frequency, 38_000, delta=100)
+        self.assertAlmostEqual(carrier.duty_cycle, 1 / 3, delta=0.01)
+
+    def test_sirc(self):
+        pulses = encoder.encode_sirc_burst(18, 1, 151, repeat=2)
+        raw = demodulate.modulate(pulses, 40_000, 0.5)
+
+        times, carrier = demodulate.demodulate(raw)
+        self.assertEqual(self._decode(times), [("SIRC", (18, 1, 151))] * 2)
+        self.assertAlmostEqual(carrier.frequency, 40_000, delta=100)
+        self.assertAlmostEqual(carrier.duty_cycle, 0.5, delta=0.01)
+
+    def test_measure_carrier(self):
+        raw = demodulate.modulate(encoder.encode_sirc(18, 1), 36_000, 0.25)
+
+        carrier = demodulate.measure_carrier(raw)
+        self.assertAlmostEqual(carrier.frequency, 36_000, delta=100)
+        self.assertAlmostEqual(carrier.duty_cycle, 0.25, delta=0.01)
+
+    def test_too_short(self):
+        with self.assertRaises(ValueError):
+            demodulate.demodulate([0.1, 0.2])
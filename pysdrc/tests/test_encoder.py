@@ -2,9 +2,12 @@
 #
 # SPDX-License-Identifier: MIT
 
+import array
+import tracemalloc
 import unittest
 
 from pysdrc import encoder
+from pysdrc.tests.helpers import ENCODE_INTO_BUDGET_BYTES
 
 
 class EncoderTest(unittest.TestCase):
@@ -38,3 +41,97 @@ class EncoderTest(unittest.TestCase):
             600,
         ]
         self.assertEqual(encoder.encode_sirc(18, 1), pulses)
+
+
+class BurstEncoderTest(unittest.TestCase):
+    def _frame_starts(self, pulses):
+        starts = [0]
+        time = 0
+        for index, pulse in enumerate(pulses):
+            time += pulse
+            # A new frame starts with a header pulse after a long space.
+            if index % 2 and pulse > 10000 and index + 1 < len(pulses):
+                starts.append(time)
+        return starts
+
+    def test_sirc_burst(self):
+        frame = encoder.encode_sirc(18, 1)
+        pulses = encoder.encode_sirc_burst(18, 1, repeat=3)
+
+        captured = len(frame) - 1
+        self.assertEqual(pulses[:captured], frame[:-1])
+        self.assertEqual(pulses[-captured:], frame[:-1])
+        self.assertEqual(len(pulses), 3 * captured + 2)
+        self.assertEqual(self._frame_starts(pulses), [0, 45000, 90000])
+
+    def test_nec_burst(self):
+        frame = encoder.encode_nec(128, 5)
+        pulses = encoder.encode_nec_burst(128, 5, repeat=3)
+
+        self.assertEqual(pulses[: len(frame)], frame)
+        self.assertEqual(tuple(pulses[-3:]), encoder.NEC_REPEAT)
+        self.assertEqual(self._frame_starts(pulses), [0, 108000, 216000])
+
+    def test_segments(self):
+        pulses = encoder.encode_nec_burst(128, 5, repeat=3)
+        segments = encoder.burst_segments(pulses)
+
+        # Only the space after a repeat code is too long for 16 bits.
+        (first, pause), (last, last_pause) = segments
+        self.assertEqual(first + [pause] + last, pulses)
+        self.assertEqual(pause, 108000 - sum(encoder.NEC_REPEAT))
+        self.assertEqual((last, last_pause), (list(encoder.NEC_REPEAT), 0))
+        for segment, _ in segments:
+            self.assertTrue(all(0 < pulse <= 0xFFFF for pulse in segment))
+
+        # Spaces that fit in 16 bits are sent as part of the segment.
+        pulses = encoder.encode_sirc_burst(18, 1, repeat=3)
+        self.assertEqual(encoder.burst_segments(pulses), [(pulses, 0)])
+
+    def test_single(self):
+        self.assertEqual(encoder.encode_nec_burst(128, 5), encoder.encode_nec(128, 5))
+
+    def test_frame_too_long(self):
+        with self.assertRaises(encoder.EncodeError):
+            encoder.encode_burst([[60000, 600], [600]], 45000)
+
+
+class EncodeIntoTest(unittest.TestCase):
+    def test_sirc(self):
+        buffer = array.array("H", [0] * encoder.SIRC_MAX_PULSES)
+        for args in ((18, 1), (18, 151), (18, 1, 151)):
+            length = encoder.encode_sirc_into(buffer, *args)
+            self.assertEqual(buffer[:length].tolist(), encoder.encode_sirc(*args))
+
+    def test_nec(self):
+        buffer = array.array("H", [0] * encoder.NEC_PULSES)
+        for args in ((128, 5), (0x1234, 5)):
+            length = encoder.encode_nec_into(buffer, *args)
+            self.assertEqual(length, encoder.NEC_PULSES)
+            self.assertEqual(buffer.tolist(), encoder.encode_nec(*args))
+
+    def test_invalid(self):
+        buffer = array.array("H", [0] * encoder.NEC_PULSES)
+        with self.assertRaises(encoder.EncodeError):
+            encoder.encode_sirc_into(buffer, 2**12, 1)
+        with self.assertRaises(encoder.EncodeError):
+            encoder.encode_nec_into(buffer, 0xFE01, 1)
+
+    def test_memory_budget(self):
+        buffer = array.array("H", [0] * encoder.NEC_PULSES)
+        calls = (
+            (encoder.encode_sirc_into, (buffer, 18, 1, 151)),
+            (encoder.encode_nec_into, (buffer, 0x1234, 200)),
+        )
+
+        for function, args in calls:
+            tracemalloc.start()
+            try:
+                tracemalloc.clear_traces()
+                function(*args)
+                current, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            self.assertEqual(current, 0, function.__name__)
+            self.assertLessEqual(peak, ENCODE_INTO_BUDGET_BYTES, function.__name__)
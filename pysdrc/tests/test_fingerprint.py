@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import random
+import unittest
+
+from pysdrc import encoder, fingerprint, protocols
+from pysdrc.tests.helpers import jitter
+
+
+class FingerprintTest(unittest.TestCase):
+    def test_quantize(self):
+        self.assertEqual(
+            fingerprint.quantize([9000, 4500, 560, 1690, 560]), bytes([3, 2, 0, 1, 0])
+        )
+        self.assertEqual(fingerprint.quantize([]), b"")
+
+    def test_jitter(self):
+        rng = random.Random(1)
+        pulses = encoder.encode_nec(0x04, 8)
+        expected = fingerprint.fingerprint(pulses)
+
+        for _ in range(100):
+            jittered = jitter(pulses, rng, fingerprint.TOLERANCE)
+            self.assertEqual(fingerprint.fingerprint(jittered), expected)
+
+        self.assertNotEqual(
+            fingerprint.fingerprint(encoder.encode_nec(0x04, 9)), expected
+        )
+        self.assertNotEqual(fingerprint.fingerprint(pulses[:-2]), expected)
+
+    def test_worst_case(self):
+        # The short pulses as long, and the long pulses as short, as the tolerance
+        # allows, and the other way around.
+        low = 1 - fingerprint.TOLERANCE
+        high = 1 + fingerprint.TOLERANCE
+        for pulses in (encoder.encode_sirc(18, 1, 151), encoder.encode_nec(0x04, 8)):
+            expected = fingerprint.fingerprint(pulses)
+            shortest = min(pulses)
+            for short, long in ((high, low), (low, high)):
+                jittered = [
+                    int(pulse * (short if pulse < shortest * 2 else long))
+                    for pulse in pulses
+                ]
+                self.assertEqual(fingerprint.fingerprint(jittered), expected)
+
+    def test_stable(self):
+        # Fingerprints can be stored, so they must not change between versions.
+        self.assertEqual(
+            fingerprint.fingerprint([9000, 4500, 560]), -3452073000738959095
+        )
+        self.assertEqual(
+            fingerprint.fingerprint([9100, 4400, 600]), -3452073000738959095
+        )
+
+    def test_matches(self):
+        pulses = encoder.encode_nec(0x04, 8)
+        self.assertTrue(fingerprint.matches([p + 50 for p in pulses], pulses))
+        self.assertFalse(fingerprint.matches([p * 2 for p in pulses], pulses))
+        self.assertFalse(fingerprint.matches(pulses[:-1], pulses))
+
+
+class FingerprintIndexTest(unittest.TestCase):
+    def test_lookup(self):
+        rng = random.Random(2)
+        index = fingerprint.FingerprintIndex()
+        for command in range(256):
+            index.add(protocols.SAMSUNG.encode(0x07, command), command)
+        # Same bits with twice the timings: same fingerprint, but not a match.
+        index.add([pulse * 2 for pulse in protocols.SAMSUNG.encode(0x07, 1)], "slow")
+        self.assertEqual(len(index), 257)
+
+        for command in range(256):
+            pulses = jitter(
+                protocols.SAMSUNG.encode(0x07, command), rng, fingerprint.TOLERANCE
+            )
+            self.assertEqual(index.lookup(pulses), command)
+
+        self.assertIsNone(index.lookup(encoder.encode_nec(0x07, 1)))
+        self.assertEqual(
+            index.lookup([pulse * 2 for pulse in protocols.SAMSUNG.encode(0x07, 1)]),
+            "slow",
+        )
+
+    def test_advertised_tolerance(self):
+        rng = random.Random(3)
+        index = fingerprint.FingerprintIndex()
+        for command in range(128):
+            index.add(encoder.encode_sirc(command, 1), ("SIRC", command))
+            index.add(encoder.encode_nec(0x04, command), ("NEC", command))
+
+        for _ in range(10):
+            for command in range(128):
+                pulses = jitter(encoder.encode_sirc(command, 1), rng, index.tolerance)
+                self.assertEqual(index.lookup(pulses), ("SIRC", command))
+                pulses = jitter(encoder.encode_nec(4, command), rng, index.tolerance)
+                self.assertEqual(index.lookup(pulses), ("NEC", command))
+
+    def test_invalid_tolerance(self):
+        with self.assertRaises(ValueError):
+            fingerprint.FingerprintIndex(tolerance=0.25)
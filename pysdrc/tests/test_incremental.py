@@ -0,0 +1,108 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from pysdrc import decoder, encoder, incremental
+
+
+def _push_all(ir_decoder, pulses):
+    results = []
+    for pulse in pulses:
+        result = ir_decoder.push(pulse)
+        if result is not None:
+            results.append(result)
+    return results
+
+
+class IncrementalDecoderTest(unittest.TestCase):
+    def test_sirc_20bit_on_last_bit(self):
+        pulses = encoder.encode_sirc(18, 1, 151)[:-1]
+        ir_decoder = incremental.IncrementalDecoder()
+
+        for pulse in pulses[:-1]:
+            self.assertIsNone(ir_decoder.push(pulse))
+        self.assertEqual(ir_decoder.push(pulses[-1]), ("SIRC", (18, 1, 151)))
+        self.assertEqual(decoder.decode_sirc(pulses), (18, 1, 151))
+
+    def test_sirc_12bit_on_gap(self):
+        pulses = encoder.encode_sirc(18, 1)[:-1]
+        ir_decoder = incremental.IncrementalDecoder()
+
+        self.assertEqual(_push_all(ir_decoder, pulses), [])
+        self.assertEqual(ir_decoder.push(30000), ("SIRC", (18, 1)))
+
+    def test_sirc_12bit_on_finish(self):
+        pulses = encoder.encode_sirc(18, 1)[:-1]
+        ir_decoder = incremental.IncrementalDecoder()
+
+        self.assertEqual(_push_all(ir_decoder, pulses), [])
+        self.assertEqual(ir_decoder.finish(), ("SIRC", (18, 1)))
+        self.assertIsNone(ir_decoder.finish())
+
+    def test_sirc_restricted_lengths(self):
+        pulses = encoder.encode_sirc(18, 1)[:-1]
+        ir_decoder = incremental.IncrementalDecoder(
+            [incremental.SIRCStateMachine(lengths=(12,))]
+        )
+
+        self.assertEqual(ir_decoder.push(pulses[0]), None)
+        self.assertEqual(_push_all(ir_decoder, pulses[1:]), [("SIRC", (18, 1))])
+
+    def test_sirc_15bit(self):
+        pulses = encoder.encode_sirc(18, 151)[:-1]
+        ir_decoder = incremental.IncrementalDecoder()
+
+        self.assertEqual(_push_all(ir_decoder, pulses + [30000]), [("SIRC", (18, 151))])
+
+    def test_nec(self):
+        pulses = encoder.encode_nec(0x1234, 5)
+        ir_decoder = incremental.IncrementalDecoder()
+
+        # The command is available before the trailing pulse.
+        self.assertEqual(_push_all(ir_decoder, pulses[:-1]), [("NEC", (0x1234, 5))])
+        self.assertEqual(decoder.decode_nec(pulses), (0x1234, 5))
+
+    def test_nec_repeat(self):
+        ir_decoder = incremental.IncrementalDecoder()
+
+        self.assertEqual(
+            _push_all(ir_decoder, encoder.NEC_REPEAT),
+            [("NEC", decoder.NEC_REPEAT)],
+        )
+
+    def test_nec_bad_checksum(self):
+        pulses = encoder.encode_nec(128, 5)
+        pulses[-2] = 560 if pulses[-2] > 1000 else 1690
+        ir_decoder = incremental.IncrementalDecoder()
+
+        self.assertEqual(_push_all(ir_decoder, pulses + [30000]), [])
+
+    def test_early_reject(self):
+        machine = incremental.NECStateMachine()
+        machine.push(2400)
+        self.assertTrue(machine.rejected)
+
+        machine = incremental.SIRCStateMachine()
+        machine.push(2400)
+        machine.push(600)
+        machine.push(5000)
+        self.assertTrue(machine.rejected)
+
+    def test_stream(self):
+        stream = []
+        expected = []
+        for command in range(0, 128, 7):
+            stream.extend(encoder.encode_sirc(command, 1)[:-1])
+            stream.append(30000)
+            expected.append(("SIRC", (command, 1)))
+
+            stream.extend(encoder.encode_nec(128, command))
+            stream.append(40000)
+            expected.append(("NEC", (128, command)))
+
+            stream.extend([500, 600, 700])
+            stream.append(40000)
+
+        self.assertEqual(_push_all(incremental.IncrementalDecoder(), stream), expected)
@@ -0,0 +1,131 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import random
+import unittest
+
+from pysdrc import decoder, encoder, protocols, saleae
+from pysdrc.tests.helpers import jitter
+
+try:
+    import numpy
+
+    from pysdrc import learn
+except ImportError:
+    numpy = None  # type: ignore
+
+
+@unittest.skipIf(numpy is None, "numpy not available")
+class LearnTest(unittest.TestCase):
+    def test_cluster_durations(self):
+        rng = random.Random(1)
+        durations = jitter([560] * 1000 + [1690] * 500 + [9000] * 30, rng)
+
+        clusters = learn.cluster_durations(durations)
+        self.assertEqual(len(clusters.centers), 3)
+        self.assertEqual(list(clusters.counts), [1000, 500, 30])
+        for center, nominal in zip(clusters.centers, (560, 1690, 9000)):
+            self.assertAlmostEqual(center, nominal, delta=nominal * 0.02)
+
+    def test_nec(self):
+        rng = random.Random(2)
+        commands = [rng.randrange(256) for _ in range(200)]
+        frames = []
+        for command in commands:
+            frames.append(jitter(encoder.encode_nec(0x04, command), rng))
+            frames.append(jitter(encoder.NEC_REPEAT, rng))
+
+        spec = learn.learn(frames, name="Learned NEC")
+        self.assertEqual(
+            spec["layouts"],
+            [
+                [
+                    ["field0", 8],
+                    ["field0", 8, "inverse"],
+                    ["field1", 8],
+                    ["field1", 8, "inverse"],
+                ]
+            ],
+        )
+        for key in ("header", "zero", "one", "footer", "repeat"):
+            for pulse, nominal in zip(spec[key], protocols.NEC_SPEC[key]):
+                self.assertAlmostEqual(pulse, nominal, delta=nominal * 0.05)
+
+        protocol = protocols.compile_protocol(spec)
+        self.assertEqual(
+            [protocol.decode(frame) for frame in frames[0::2]],
+            [(0x04, command) for command in commands],
+        )
+        self.assertEqual(protocol.decode(frames[1]), "Learned NEC Repeat")
+
+    def test_copy(self):
+        rng = random.Random(3)
+        frames = [
+            jitter(protocols.SAMSUNG.encode(0x07, rng.randrange(256)), rng)
+            for _ in range(100)
+        ]
+
+        spec = learn.learn(frames)
+        self.assertEqual(spec["layouts"][0][1], ["field0", 8, "copy"])
+        self.assertNotIn("repeat", spec)
+
+    def test_sirc(self):
+        rng = random.Random(4)
+        frames = [
+            jitter(encoder.encode_sirc(rng.randrange(128), 1)[:-1], rng)
+            for _ in range(100)
+        ]
+
+        spec = learn.learn(frames)
+        self.assertEqual(spec["layouts"], [[["field0", 12]]])
+        self.assertNotIn("footer", spec)
+        self.assertAlmostEqual(spec["one"][0], 1200, delta=60)
+        self.assertAlmostEqual(spec["zero"][0], 600, delta=30)
+
+        protocol = protocols.compile_protocol(spec)
+        self.assertEqual(
+            protocol.decode(encoder.encode_sirc(18, 1)[:-1]), (18 | 1 << 7,)
+        )
+
+    def test_noise(self):
+        rng = random.Random(5)
+        frames = [
+            jitter(encoder.encode_nec(0x04, rng.randrange(256)), rng)
+            for _ in range(100)
+        ]
+        # Frames with a glitch, and unrelated frames of another length.
+        frames += [[9000, 4500, 30000] + frame[3:] for frame in frames[:3]]
+        frames += [[rng.randrange(100, 5000) for _ in range(20)] for _ in range(10)]
+
+        spec = learn.learn(frames)
+        protocol = protocols.compile_protocol(spec)
+        for frame in frames[:100]:
+            protocol.decode(frame)
+
+    def test_not_enough_frames(self):
+        with self.assertRaises(ValueError):
+            learn.learn([encoder.encode_nec(0x04, 5)] * 2)
+        with self.assertRaises(ValueError):
+            learn.learn([encoder.NEC_REPEAT] * 10)
+        with self.assertRaises(ValueError):
+            # Without any variation, the bit values cannot be told apart.
+            learn.learn([[9000, 4500] + [560] * 65] * 10)
+
+    def test_learn_events(self):
+        rng = random.Random(6)
+        events = []
+        timestamp = 0.0
+        for _ in range(20):
+            pulses = jitter(encoder.encode_nec(0x04, rng.randrange(256)), rng)
+            events.append(
+                saleae.CaptureEvent(
+                    timestamp, decoder.RAW, pulses, len(pulses), decoder.DECODE_OK
+                )
+            )
+            timestamp += encoder.NEC_FRAME_PERIOD / 1_000_000
+        # Frames decoded by a known protocol are ignored.
+        events.append(saleae.CaptureEvent(timestamp, "SIRC", (18, 1), 25, 0))
+
+        spec = learn.learn_events(events)
+        self.assertEqual(spec["period"], encoder.NEC_FRAME_PERIOD)
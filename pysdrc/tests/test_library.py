@@ -0,0 +1,135 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import io
+import os
+import tempfile
+import unittest
+
+from pysdrc import decoder, encoder, library, protocols
+
+_CODES = [
+    ("TV", "POWER", "SIRC", 1, 21, None, False),
+    ("TV", "VOL+", "SIRC", 1, 18, None, False),
+    ("Receiver", "VIDEO1", "SIRC", 16, 64, 151, False),
+    ("Projector", "POWER", "SIRC", 1, 21, None, True),
+    ("Soundbar", "POWER", "NEC", 0x04, 8, None, False),
+]
+
+
+class CodeLibraryTest(unittest.TestCase):
+    def setUp(self):
+        self.library = library.CodeLibrary()
+        self.library.import_codes(_CODES)
+
+    def tearDown(self):
+        self.library.close()
+
+    def test_get(self):
+        code = self.library.get("Receiver", "VIDEO1")
+        self.assertEqual(code[:-1], _CODES[2])
+        self.assertEqual(list(code.pulses), encoder.encode_sirc(64, 16, 151))
+
+        code = self.library.get("Soundbar", "POWER")
+        self.assertEqual(list(code.pulses), encoder.encode_nec(0x04, 8))
+
+        self.assertIsNone(self.library.get("TV", "MUTE"))
+
+    def test_find_decoded(self):
+        for remote, name, protocol, device, command, extended, force in _CODES:
+            pulses = list(self.library.get(remote, name).pulses)
+            if protocol == "SIRC":
+                # The trailing space is not captured.
+                pulses = pulses[:-1]
+            result = decoder.decode_any(pulses)
+            self.assertIn(
+                (remote, name),
+                [
+                    (code.remote, code.name)
+                    for code in self.library.find_decoded(result.protocol, result.code)
+                ],
+            )
+
+        self.assertEqual(
+            [code.remote for code in self.library.find("SIRC", 1, 21)],
+            ["Projector", "TV"],
+        )
+        self.assertEqual(self.library.find_decoded("NEC", decoder.NEC_REPEAT), [])
+
+    def test_replace_and_remove(self):
+        self.library.add("TV", "POWER", "SIRC", 1, 46)
+        self.assertEqual(self.library.get("TV", "POWER").command, 46)
+        self.assertEqual(len(self.library), len(_CODES))
+
+        self.assertTrue(self.library.remove("TV", "POWER"))
+        self.assertFalse(self.library.remove("TV", "POWER"))
+        self.assertEqual(self.library.names("TV"), ["VOL+"])
+
+        self.library.remove("TV", "VOL+")
+        self.assertEqual(self.library.remotes(), ["Projector", "Receiver", "Soundbar"])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.library.add("TV", "MUTE", "RC5", 1, 20)
+        with self.assertRaises(encoder.EncodeError):
+            self.library.add("TV", "MUTE", "SIRC", 300, 20)
+
+        # A failing import adds nothing.
+        with self.assertRaises(encoder.EncodeError):
+            self.library.import_codes(
+                [("TV", "MUTE", "SIRC", 1, 20), ("TV", "BAD", "SIRC", 300, 20)]
+            )
+        self.assertIsNone(self.library.get("TV", "MUTE"))
+
+    def test_json_round_trip(self):
+        output = io.StringIO()
+        self.library.dump_json(output)
+
+        with library.CodeLibrary() as copy:
+            self.assertEqual(copy.load_json(io.StringIO(output.getvalue())), 5)
+            self.assertEqual(list(copy.export_codes()), sorted(_CODES))
+
+    def test_indexed_lookups(self):
+        connection = self.library._connection
+        for query, args in (
+            (
+                "SELECT * FROM codes WHERE remote = ? AND name = ?",
+                ("TV", "POWER"),
+            ),
+            (
+                "SELECT * FROM codes WHERE protocol = ? AND device = ? "
+                "AND command = ? AND extended IS ?",
+                ("SIRC", 1, 21, None),
+            ),
+        ):
+            plan = " ".join(
+                str(row[-1])
+                for row in connection.execute("EXPLAIN QUERY PLAN " + query, args)
+            )
+            self.assertIn("USING INDEX", plan)
+
+    def test_persistent(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "codes.db")
+            with library.CodeLibrary(path) as first:
+                first.import_codes(_CODES)
+            with library.CodeLibrary(path) as second:
+                self.assertEqual(len(second), len(_CODES))
+
+    def test_raw(self):
+        pulses = protocols.SAMSUNG.encode(0x07, 2)
+        self.library.add_raw("Samsung TV", "POWER", pulses)
+        self.library.add_raw("Samsung TV", "MUTE", protocols.SAMSUNG.encode(0x07, 15))
+
+        self.assertEqual(
+            list(self.library.get_raw("Samsung TV", "POWER").pulses), pulses
+        )
+        self.assertIsNone(self.library.get_raw("Samsung TV", "VOL+"))
+
+        found = self.library.find_raw([pulse + 30 for pulse in pulses])
+        self.assertEqual(
+            [(code.remote, code.name) for code in found], [("Samsung TV", "POWER")]
+        )
+        self.assertEqual(self.library.find_raw([pulse * 2 for pulse in pulses]), [])
+        self.assertEqual(self.library.find_raw(encoder.encode_nec(0x07, 2)), [])
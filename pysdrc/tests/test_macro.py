@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from pysdrc import encoder, macro
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class MacroTest(unittest.TestCase):
+    def _macro(self):
+        return (
+            macro.Macro()
+            .sirc(46, 1)
+            .wait(2)
+            .sirc(72, 1)
+            .sirc(18, 1, times=10)
+            .nec(128, 5, repeat=2)
+        )
+
+    def test_compile(self):
+        program = self._macro().compile()
+
+        self.assertEqual(len(program.buffers), 4)
+        self.assertEqual(len(program.steps), 13)
+        self.assertEqual(
+            list(program.buffers[0]), encoder.encode_sirc_burst(46, 1, repeat=4)
+        )
+        self.assertEqual(
+            list(program.buffers[3]), encoder.encode_nec_burst(128, 5, repeat=2)
+        )
+        # The wait is folded into the delay after the first command.
+        self.assertGreater(program.steps[0][1], 2)
+        self.assertEqual({index for index, _ in program.steps[2:12]}, {2})
+
+    def test_period(self):
+        program = macro.Macro().sirc(18, 1, repeat=3, times=2).compile()
+
+        # Each burst of 3 frames, and its tail, takes exactly 3 frame periods.
+        self.assertAlmostEqual(program.duration(), 2 * 3 * 0.045)
+
+        # The NEC repeat codes are followed by spaces too long for PulseOut, so the
+        # burst is split into separate buffers, keeping the same period.
+        program = macro.Macro().nec(128, 5, repeat=3, times=2).compile()
+        self.assertEqual(len(program.buffers), 2)
+        self.assertEqual(tuple(program.buffers[1]), encoder.NEC_REPEAT)
+        self.assertAlmostEqual(program.duration(), 2 * 3 * 0.108)
+
+    def test_leading_wait(self):
+        program = macro.Macro().wait(1).nec(128, 5).compile()
+        self.assertEqual(program.steps[0], (-1, 1))
+
+    def test_serialize(self):
+        program = self._macro().compile()
+        self.assertEqual(macro.Program.from_json(program.to_json()), program)
+
+    def test_play(self):
+        program = self._macro().compile()
+        clock = _FakeClock()
+        sent = []
+
+        def send(buffer):
+            sent.append((clock.now, buffer))
+            clock.now += sum(buffer) / 1_000_000
+
+        macro.play(program, send, sleep=clock.sleep, monotonic=clock.monotonic)
+
+        self.assertEqual(len(sent), 13)
+        self.assertIs(sent[0][1], program.buffers[0])
+        self.assertAlmostEqual(sent[1][0] - sent[0][0], 4 * 0.045 + 2)
+        self.assertAlmostEqual(clock.now - 100, program.duration())
@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import io
+import os
+import random
+import struct
+import tempfile
+import unittest
+
+from pysdrc import encoder, multichannel, saleae
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+
+def _channel_times(seed: int) -> list:
+    rng = random.Random(seed)
+    times = []
+    time = rng.uniform(0.05, 0.15)
+    for _ in range(10):
+        command = rng.randrange(128)
+        if rng.random() < 0.5:
+            pulses = encoder.encode_sirc(command, 1)[:-1]
+        else:
+            pulses = encoder.encode_nec(128, command)
+        times.append(time)
+        for pulse in pulses:
+            time += pulse * rng.uniform(0.97, 1.03) / 1_000_000
+            times.append(time)
+        time += rng.uniform(0.02, 0.1)
+    return times
+
+
+def _export(channels: dict) -> io.StringIO:
+    """Write the transition times of the channels as a multi-channel CSV export."""
+    names = list(channels)
+    changes = sorted(
+        (time, index) for index, name in enumerate(names) for time in channels[name]
+    )
+
+    output = io.StringIO()
+    output.write("Time [s],%s\n" % ",".join(names))
+    states = [1] * len(names)
+    output.write("0.0,%s\n" % ",".join(str(state) for state in states))
+    for time, index in changes:
+        states[index] ^= 1
+        output.write("%r,%s\n" % (time, ",".join(str(state) for state in states)))
+
+    output.seek(0)
+    return output
+
+
+class MultiChannelTest(unittest.TestCase):
+    def setUp(self):
+        self.channels = {
+            "Channel %d" % index: _channel_times(index) for index in range(4)
+        }
+
+    def test_read_csv_channels(self):
+        channels = multichannel.read_csv_channels(_export(self.channels))
+
+        self.assertEqual(list(channels), list(self.channels))
+        for name, times in channels.items():
+            self.assertEqual(list(times), self.channels[name])
+
+    def test_read_csv_invalid(self):
+        with self.assertRaises(ValueError):
+            multichannel.read_csv_channels(io.StringIO(""))
+        with self.assertRaises(ValueError):
+            multichannel.read_csv_channels(io.StringIO("Time [s],A,A\n0.0,1,1\n"))
+
+        channels = multichannel.read_csv_channels(io.StringIO("Time [s],A,B\n"))
+        self.assertEqual(list(channels), ["A", "B"])
+
+    def test_decode_csv_channels(self):
+        events = list(multichannel.decode_csv_channels(_export(self.channels)))
+
+        self.assertEqual(len(events), 40)
+        timestamps = [event.timestamp for event in events]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+        for name, times in self.channels.items():
+            expected = list(saleae.decode_frames(saleae.times_to_frames(times)))
+            self.assertEqual(
+                [event[:-1] for event in events if event.channel == name], expected
+            )
+
+    def test_merge_channels(self):
+        event = saleae.CaptureEvent(1.0, "NEC", (128, 1), 67, 0)
+        merged = list(
+            multichannel.merge_channels(
+                {"A": [event._replace(timestamp=2.0)], "B": [event, event]}
+            )
+        )
+        self.assertEqual([event.channel for event in merged], ["B", "B", "A"])
+        self.assertEqual(merged[0], multichannel.ChannelEvent(*event, "B"))
+
+    def test_no_channels(self):
+        self.assertEqual(list(multichannel.decode_channels({})), [])
+
+    @unittest.skipIf(numpy is None, "numpy not available")
+    def test_decode_binary_channels(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = {}
+            for name, times in self.channels.items():
+                paths[name] = os.path.join(directory, "%s.bin" % name)
+                with open(paths[name], "wb") as output:
+                    output.write(b"<SALEAE>")
+                    output.write(
+                        struct.pack("<iiIddQ", 0, 0, 1, 0.0, times[-1] + 1, len(times))
+                    )
+                    output.write(struct.pack("<%dd" % len(times), *times))
+
+            events = list(multichannel.decode_binary_channels(paths, workers=2))
+
+        self.assertEqual(
+            events, list(multichannel.decode_channels(self.channels, workers=2))
+        )
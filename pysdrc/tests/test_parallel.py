@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import concurrent.futures
+import random
+import unittest
+
+from pysdrc import encoder, parallel, saleae
+
+
+def _capture_times():
+    rng = random.Random(42)
+    times = []
+    time = 0.1
+    for command in range(0, 128, 5):
+        for pulses in (
+            encoder.encode_sirc(command, 1)[:-1],
+            encoder.encode_nec(128, command),
+            encoder.NEC_REPEAT,
+        ):
+            times.append(time)
+            for pulse in pulses:
+                time += pulse * rng.uniform(0.95, 1.05) / 1_000_000
+                times.append(time)
+            time += rng.uniform(0.02, 0.1)
+    return times
+
+
+class ParallelDecodeTest(unittest.TestCase):
+    def test_split_at_gaps(self):
+        times = _capture_times()
+        ranges = parallel.split_at_gaps(times, 100)
+
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], len(times))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertGreater(times[start] - times[start - 1], 0.01)
+
+    def test_matches_sequential(self):
+        times = _capture_times()
+        expected = list(saleae.decode_frames(saleae.times_to_frames(times)))
+
+        events = list(parallel.decode_times_parallel(times, workers=2, chunk_size=100))
+
+        self.assertEqual(events, expected)
+        self.assertEqual(len(events), 3 * 26)
+
+
+class _RecordingExecutor:
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, function, *args):
+        self.submitted += 1
+        future = concurrent.futures.Future()
+        future.set_result(function(*args))
+        return future
+
+
+class BoundedMapTest(unittest.TestCase):
+    def test_window(self):
+        executor = _RecordingExecutor()
+        consumed = []
+
+        def arguments():
+            for index in range(10):
+                consumed.append(index)
+                yield (index,)
+
+        events = parallel._map_bounded(executor, lambda index: [index], arguments(), 3)
+
+        self.assertEqual(next(events), 0)
+        # No more than the window is submitted before the first result is waited for.
+        self.assertEqual(executor.submitted, 3)
+        self.assertEqual(len(consumed), 4)
+        self.assertEqual(list(events), list(range(1, 10)))
+        self.assertEqual(executor.submitted, 10)
@@ -0,0 +1,159 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import collections
+import unittest
+
+from pysdrc import decoder, encoder, protocols
+from pysdrc.benchmarks import corpus
+
+
+class CompiledProtocolTest(unittest.TestCase):
+    def test_sirc_encode(self):
+        self.assertEqual(protocols.SIRC.encode(18, 1), encoder.encode_sirc(18, 1))
+        self.assertEqual(protocols.SIRC.encode(18, 151), encoder.encode_sirc(18, 151))
+        self.assertEqual(
+            protocols.SIRC.encode(18, 1, 151), encoder.encode_sirc(18, 1, 151)
+        )
+        self.assertEqual(
+            protocols.SIRC.encode(18, 1, bits=15),
+            encoder.encode_sirc(18, 1, force_8bit_device=True),
+        )
+
+    def test_nec_encode(self):
+        self.assertEqual(protocols.NEC.encode(128, 5), encoder.encode_nec(128, 5))
+        self.assertEqual(protocols.NEC.encode(0x1234, 5), encoder.encode_nec(0x1234, 5))
+
+    def test_encode_invalid(self):
+        with self.assertRaises(encoder.EncodeError):
+            protocols.SIRC.encode(128, 1)
+        with self.assertRaises(encoder.EncodeError):
+            protocols.NEC.encode(0xFE01, 5)
+        with self.assertRaises(encoder.EncodeError):
+            protocols.NEC.encode(1, 2, 3)
+
+    def test_burst(self):
+        self.assertEqual(
+            protocols.SIRC.encode_burst(18, 1, repeat=4),
+            encoder.encode_sirc_burst(18, 1, repeat=4),
+        )
+        pulses = protocols.NEC.encode_burst(128, 5, repeat=2)
+        self.assertEqual(pulses[-3:], protocols.NEC.repeat)
+
+    def test_corpus_equivalence(self):
+        # The larger jitter goes beyond the decoder windows, so that frames are
+        # rejected as well.
+        frames = (
+            corpus.Corpus(count=2000, seed=3).pulses()
+            + corpus.Corpus(count=2000, seed=4, jitter=0.2).pulses()
+        )
+        frames += [
+            [9000, 4500, 560],
+            [9000, 2250, 800],
+            [9000, 2250, 400],
+            [9400, 2250, 560],
+            encoder.encode_sirc(18, 1)[:-1],
+            encoder.encode_sirc(18, 1),
+        ]
+
+        for try_decode, protocol in (
+            (decoder.try_decode_sirc, protocols.SIRC),
+            (decoder.try_decode_nec, protocols.NEC),
+        ):
+            results = collections.Counter()
+            for pulses in frames:
+                expected = try_decode(pulses)
+                self.assertEqual(protocol.try_decode(pulses), expected, pulses)
+                results[expected[1]] += 1
+
+            # Both decoded and rejected frames were compared.
+            self.assertGreater(results[decoder.DECODE_OK], 100)
+            self.assertGreater(sum(results.values()) - results[decoder.DECODE_OK], 100)
+
+    def test_nec_extended(self):
+        pulses = encoder.encode_nec(0x1234, 5)
+        self.assertEqual(protocols.NEC.decode(pulses), (0x1234, 5))
+
+    def test_decode_errors(self):
+        pulses = encoder.encode_nec(128, 5)
+
+        with self.assertRaises(decoder.DecodeException) as context:
+            protocols.NEC.decode(pulses[:-2])
+        self.assertEqual(context.exception.reason, decoder.DECODE_BAD_LENGTH)
+
+        with self.assertRaises(decoder.DecodeException) as context:
+            protocols.NEC.decode([4500] + pulses[1:])
+        self.assertEqual(context.exception.reason, decoder.DECODE_BAD_HEADER)
+
+        with self.assertRaises(decoder.DecodeException) as context:
+            protocols.NEC.decode(pulses[:1] + [3000] + pulses[2:])
+        self.assertEqual(context.exception.reason, decoder.DECODE_BAD_HEADER_SPACE)
+
+        # Flip the last bit of the inverted command.
+        pulses[-2] = 560
+        with self.assertRaises(decoder.DecodeException) as context:
+            protocols.NEC.decode(pulses)
+        self.assertEqual(context.exception.reason, decoder.DECODE_BAD_CHECKSUM)
+
+    def test_try_decode(self):
+        self.assertEqual(
+            protocols.NEC.try_decode(encoder.encode_nec(128, 5)),
+            ((128, 5), decoder.DECODE_OK),
+        )
+        self.assertEqual(
+            protocols.NEC.try_decode([9000, 2250, 560]),
+            (decoder.NEC_REPEAT, decoder.DECODE_OK),
+        )
+        self.assertEqual(
+            protocols.SIRC.try_decode([1, 2, 3]),
+            (None, decoder.DECODE_BAD_LENGTH),
+        )
+
+    def test_samsung(self):
+        pulses = protocols.SAMSUNG.encode(7, 2)
+        self.assertEqual(pulses[:2], [4500, 4500])
+        self.assertEqual(protocols.SAMSUNG.decode(pulses), (7, 2))
+
+        # The address is sent twice.
+        pulses[2 + 8 * 2 + 1] = 560
+        with self.assertRaises(decoder.DecodeException) as context:
+            protocols.SAMSUNG.decode(pulses)
+        self.assertEqual(context.exception.reason, decoder.DECODE_BAD_CHECKSUM)
+
+    def test_pulse_distance_inverted(self):
+        # Longer space for the zero bit, and no header.
+        protocol = protocols.compile_protocol(
+            {
+                "name": "Test",
+                "zero": [300, 1500],
+                "one": [300, 500],
+                "footer": [300],
+                "layouts": [[["value", 4]]],
+            }
+        )
+        pulses = protocol.encode(5)
+        self.assertEqual(pulses[:2], [300, 500])
+        self.assertEqual(protocol.decode(pulses), (5,))
+
+    def test_invalid_spec(self):
+        with self.assertRaises(ValueError):
+            protocols.compile_protocol({"name": "Test"})
+        with self.assertRaises(ValueError):
+            protocols.compile_protocol(
+                {
+                    "name": "Test",
+                    "zero": [500, 500],
+                    "one": [500, 500],
+                    "layouts": [[["value", 4]]],
+                }
+            )
+        with self.assertRaises(ValueError):
+            protocols.compile_protocol(
+                {
+                    "name": "Test",
+                    "zero": [500, 500],
+                    "one": [1000, 500],
+                    "layouts": [[["value", 4], ["other", 4, "inverse"]]],
+                }
+            )
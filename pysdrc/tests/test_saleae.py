@@ -0,0 +1,67 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import io
+import unittest
+
+from pysdrc import decoder, encoder, saleae
+
+
+def _pulses_to_csv(frames, start=0.1, gap=0.045):
+    lines = ["Time[s], Channel 0", "0.000000000000000, 1"]
+    timestamps = []
+    time = start
+    for pulses in frames:
+        timestamps.append(time)
+        lines.append("%.15f, 0" % time)
+        for index, pulse in enumerate(pulses):
+            time += pulse / 1_000_000
+            lines.append("%.15f, %d" % (time, index % 2))
+        time += gap
+    return "\n".join(lines) + "\n", timestamps
+
+
+class SaleaeTest(unittest.TestCase):
+    def test_decode_csv(self):
+        frames = [
+            encoder.encode_sirc(18, 1)[:-1],
+            encoder.encode_nec(128, 5),
+            encoder.NEC_REPEAT,
+            [600, 600, 600],
+        ]
+        capture, timestamps = _pulses_to_csv(frames)
+
+        events = list(saleae.decode_csv(io.StringIO(capture)))
+
+        self.assertEqual(
+            [(event.protocol, event.code) for event in events[:3]],
+            [
+                ("SIRC", (18, 1)),
+                ("NEC", (128, 5)),
+                ("NEC", decoder.NEC_REPEAT),
+            ],
+        )
+        self.assertEqual(events[3].protocol, decoder.RAW)
+        self.assertEqual(events[3].reason, decoder.DECODE_BAD_HEADER)
+        self.assertEqual([event.pulse_count for event in events], [25, 67, 3, 3])
+        for event, timestamp in zip(events, timestamps):
+            self.assertAlmostEqual(event.timestamp, timestamp)
+
+    def test_times_to_frames(self):
+        frames = list(saleae.times_to_frames([0.5, 0.5006, 0.5012, 0.6, 0.6005]))
+        self.assertEqual(len(frames), 2)
+        self.assertAlmostEqual(frames[0][0], 0.5)
+        self.assertEqual(len(frames[0][1]), 2)
+        self.assertAlmostEqual(frames[1][0], 0.6)
+        self.assertEqual(len(frames[1][1]), 1)
+
+    def test_streaming(self):
+        def times():
+            yield 0.5
+            yield 0.5024005
+            yield 0.6
+            raise AssertionError("Read past the first complete frame")
+
+        frames = saleae.times_to_frames(times())
+        self.assertEqual(next(frames)[1], [2400])
@@ -0,0 +1,90 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import random
+import struct
+import tempfile
+import unittest
+
+from pysdrc import encoder, parallel, saleae
+
+try:
+    import numpy
+
+    from pysdrc import saleae_binary
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+
+def _capture_times(frames, rng):
+    times = []
+    time = 0.1
+    for pulses in frames:
+        times.append(time)
+        for pulse in pulses:
+            time += pulse / 1_000_000
+            times.append(time)
+        time += rng.uniform(0.02, 0.1)
+    return times
+
+
+@unittest.skipIf(numpy is None, "numpy not available")
+class BinaryExportTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        frames = []
+        for command in range(0, 128, 3):
+            frames.append(encoder.encode_sirc(command, 1)[:-1])
+            frames.append(encoder.encode_nec(128, command))
+            frames.append([rng.randrange(200, 3000) for _ in range(rng.randrange(9))])
+        self.times = _capture_times(frames, rng)
+
+        fd, self.path = tempfile.mkstemp(suffix=".bin")
+        with os.fdopen(fd, "wb") as output:
+            output.write(b"<SALEAE>")
+            output.write(
+                struct.pack(
+                    "<iiIddQ", 0, 0, 1, 0.0, self.times[-1] + 1, len(self.times)
+                )
+            )
+            output.write(struct.pack("<%dd" % len(self.times), *self.times))
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_read_transitions(self):
+        transitions = saleae_binary.read_transitions(self.path)
+        self.assertEqual(list(transitions), self.times)
+
+    def test_frames_match_scalar(self):
+        expected = list(saleae.times_to_frames(self.times))
+        # Use a small chunk size to make sure frames across chunks are reassembled.
+        frames = list(
+            saleae_binary.transitions_to_frames(
+                saleae_binary.read_transitions(self.path), chunk_size=50
+            )
+        )
+        self.assertEqual(frames, expected)
+
+    def test_decode_binary(self):
+        events = list(saleae_binary.decode_binary(self.path))
+        self.assertEqual(
+            events, list(saleae.decode_frames(saleae.times_to_frames(self.times)))
+        )
+        self.assertEqual(events[0].protocol, "SIRC")
+        self.assertEqual(events[1].protocol, "NEC")
+
+    def test_decode_parallel(self):
+        events = list(
+            parallel.decode_binary_parallel(self.path, workers=2, chunk_size=200)
+        )
+        self.assertEqual(events, list(saleae_binary.decode_binary(self.path)))
+
+    def test_invalid(self):
+        with open(self.path, "wb") as output:
+            output.write(b"Time[s], Channel 0\n")
+
+        with self.assertRaises(saleae_binary.BinaryFormatError):
+            saleae_binary.read_transitions(self.path)
@@ -0,0 +1,88 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from pysdrc import decoder, loopback, session
+from pysdrc.circuitpython import transmitter
+
+
+class SessionTrackerTest(unittest.TestCase):
+    def test_nec_hold(self):
+        simulated = loopback.LoopbackBackend()
+        nec_transmitter = transmitter.NECTransmitter(
+            None, backend=simulated, burst=True
+        )
+        nec_transmitter.transmit_command(128, 5, repeat=28)
+
+        frames = list(simulated.decode())
+        events = list(session.SessionTracker().track(frames))
+
+        self.assertEqual(len(frames), 28)
+        self.assertEqual(
+            [(event.kind, event.code, event.count) for event in events],
+            [
+                (session.PRESS, (128, 5), 0),
+                (session.HOLD, (128, 5), 10),
+                (session.HOLD, (128, 5), 20),
+                (session.RELEASE, (128, 5), 27),
+            ],
+        )
+        self.assertAlmostEqual(events[-1].duration, 27 * 0.108)
+
+    def test_separate_presses(self):
+        tracker = session.SessionTracker()
+
+        self.assertEqual(
+            [event.kind for event in tracker.push(0.0, "NEC", (1, 2))],
+            [session.PRESS],
+        )
+        self.assertEqual(tracker.push(0.108, "NEC", decoder.NEC_REPEAT), [])
+
+        # A different command releases the previous one.
+        events = tracker.push(0.216, "NEC", (1, 3))
+        self.assertEqual(
+            [(event.kind, event.code) for event in events],
+            [(session.RELEASE, (1, 2)), (session.PRESS, (1, 3))],
+        )
+
+        # The same command after the timeout is a new press.
+        events = tracker.push(1.0, "NEC", (1, 3))
+        self.assertEqual(
+            [event.kind for event in events], [session.RELEASE, session.PRESS]
+        )
+
+        self.assertEqual(tracker.expire(1.1), [])
+        self.assertEqual(
+            [event.kind for event in tracker.expire(1.2)], [session.RELEASE]
+        )
+        self.assertFalse(tracker.active)
+        self.assertEqual(tracker.finish(), [])
+
+    def test_orphan_repeat(self):
+        tracker = session.SessionTracker()
+
+        self.assertEqual(tracker.push(0.0, "NEC", decoder.NEC_REPEAT), [])
+        self.assertEqual(tracker.orphan_repeats, 1)
+        self.assertFalse(tracker.active)
+
+    def test_sirc_repeats(self):
+        simulated = loopback.LoopbackBackend()
+        sirc_transmitter = transmitter.SIRCTransmitter(
+            None, backend=simulated, burst=True
+        )
+        sirc_transmitter.transmit_command(18, 1, repeat=4)
+        simulated.sleep(1)
+        sirc_transmitter.transmit_command(18, 1, repeat=4)
+
+        events = list(session.SessionTracker().track(simulated.decode()))
+        self.assertEqual(
+            [(event.kind, event.count) for event in events],
+            [
+                (session.PRESS, 0),
+                (session.RELEASE, 3),
+                (session.PRESS, 0),
+                (session.RELEASE, 3),
+            ],
+        )
@@ -0,0 +1,118 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from pysdrc import decoder, protocols, saleae, sinks
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None  # type: ignore
+
+_EVENTS = [
+    saleae.CaptureEvent(0.5, "SIRC", (18, 1), 25, decoder.DECODE_OK),
+    saleae.CaptureEvent(1.0, "NEC", decoder.NEC_REPEAT, 3, decoder.DECODE_OK),
+    saleae.CaptureEvent(1.5, decoder.RAW, [100, 200], 2, decoder.DECODE_BAD_LENGTH),
+]
+
+
+class SinkTest(unittest.TestCase):
+    def test_ndjson(self):
+        output = io.StringIO()
+        with sinks.NDJSONSink(output, batch_size=2) as sink:
+            sink.write_all(_EVENTS)
+            # Only the first full batch was written so far.
+            self.assertEqual(output.getvalue().count("\n"), 2)
+
+        rows = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(sink.count, 3)
+        self.assertEqual(
+            rows[0],
+            {
+                "timestamp": 0.5,
+                "protocol": "SIRC",
+                "code": [18, 1],
+                "repeat": False,
+                "pulse_count": 25,
+                "reason": 0,
+            },
+        )
+        self.assertTrue(rows[1]["repeat"])
+        self.assertEqual(rows[2]["code"], [])
+        self.assertEqual(rows[2]["reason"], decoder.DECODE_BAD_LENGTH)
+
+    def test_csv(self):
+        output = io.StringIO()
+        with sinks.CSVSink(output) as sink:
+            sink.write_all(_EVENTS)
+
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["code"], "18 1")
+        self.assertEqual(rows[1]["repeat"], "1")
+        self.assertEqual(rows[2]["protocol"], decoder.RAW)
+
+    def test_not_repeat(self):
+        output = io.StringIO()
+        with sinks.NDJSONSink(output) as sink:
+            sink.write(
+                saleae.CaptureEvent(2.0, "NEC", None, 3, decoder.DECODE_BAD_CHECKSUM)
+            )
+
+        row = json.loads(output.getvalue())
+        self.assertEqual(row["code"], [])
+        self.assertFalse(row["repeat"])
+
+    def test_declared_repeat(self):
+        protocol = protocols.compile_protocol(
+            {
+                "name": "Test",
+                "header": [3000, 3000],
+                "zero": [500, 500],
+                "one": [500, 1500],
+                "footer": [500],
+                "repeat": [3000, 1500, 500],
+                "layouts": [[["command", 4]]],
+            }
+        )
+        protocol.register()
+        try:
+            result = decoder.decode_any([3000, 1500, 500])
+            self.assertEqual(result.protocol, "Test")
+            event = saleae.CaptureEvent(2.0, "Test", result.code, 3, result.reason)
+            self.assertEqual(sinks._code_fields(event), ([], True))
+        finally:
+            for length in protocol.lengths:
+                decoder._PROTOCOLS_BY_LENGTH[length].pop()
+            decoder._REPEAT_CODES.pop("Test")
+
+    def test_abstract(self):
+        class IncompleteSink(sinks.Sink):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteSink()
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(ValueError):
+            sinks.NDJSONSink(io.StringIO(), batch_size=0)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow not available")
+    def test_parquet(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "events.parquet")
+            with sinks.ParquetSink(path, batch_size=2) as sink:
+                sink.write_all(_EVENTS)
+
+            table = pyarrow.parquet.read_table(path)
+
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.column("code").to_pylist(), [[18, 1], [], []])
+        self.assertEqual(table.column("repeat").to_pylist(), [False, True, False])
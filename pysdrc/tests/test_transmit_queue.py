@@ -0,0 +1,95 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import unittest
+
+from pysdrc import encoder
+from pysdrc.circuitpython import transmit_queue
+
+
+class _RecordingTransmitter:
+    default_repeat = 2
+
+    def __init__(self):
+        self.sent = []
+
+    def encode_command(self, command, device):
+        return encoder.encode_sirc(command, device)
+
+    def send(self, pulses):
+        self.sent.append(pulses)
+
+
+class TransmitQueueTest(unittest.TestCase):
+    def _run(self, queue, coroutine):
+        async def main():
+            task = asyncio.ensure_future(queue.run())
+            try:
+                await coroutine()
+                await queue.join()
+            finally:
+                task.cancel()
+
+        asyncio.run(main())
+
+    def test_priority_and_order(self):
+        ir_transmitter = _RecordingTransmitter()
+        queue = transmit_queue.TransmitQueue(ir_transmitter, gap=0)
+
+        low = [1, 2, 3]
+        normal = [4, 5, 6]
+        high = [7, 8, 9]
+        queue.send_pulses(low, repeat=1, priority=-1)
+        queue.send_pulses(normal, repeat=1)
+        queue.send_pulses(high, priority=5)
+
+        async def nothing():
+            pass
+
+        self._run(queue, nothing)
+        self.assertEqual(ir_transmitter.sent, [high, high, normal, low])
+
+    def test_coalesce(self):
+        ir_transmitter = _RecordingTransmitter()
+        queue = transmit_queue.TransmitQueue(ir_transmitter, gap=0)
+
+        self.assertTrue(queue.send_command(18, 1))
+        self.assertTrue(queue.send_command(19, 1))
+        self.assertFalse(queue.send_command(18, 1, repeat=3))
+        self.assertFalse(queue.send_command(19, 1, priority=1))
+        self.assertEqual(len(queue), 2)
+
+        async def nothing():
+            pass
+
+        self._run(queue, nothing)
+        self.assertEqual(
+            ir_transmitter.sent,
+            [encoder.encode_sirc(19, 1)] * 2 + [encoder.encode_sirc(18, 1)] * 3,
+        )
+
+    def test_non_blocking(self):
+        ir_transmitter = _RecordingTransmitter()
+        queue = transmit_queue.TransmitQueue(ir_transmitter, gap=0.05)
+        progress = []
+
+        async def other_task():
+            queue.send_pulses([1, 2, 3], repeat=4)
+            for _ in range(3):
+                await asyncio.sleep(0.01)
+                progress.append(len(ir_transmitter.sent))
+
+        self._run(queue, other_task)
+        self.assertEqual(len(ir_transmitter.sent), 4)
+        # The other task kept running while the repeats were being sent: once it
+        # yielded, the queue started sending, but had not finished yet.
+        self.assertGreaterEqual(progress[-1], 1)
+        self.assertLessEqual(progress[-1], 3)
+
+    def test_full(self):
+        queue = transmit_queue.TransmitQueue(_RecordingTransmitter(), maxlen=1)
+        queue.send_pulses([1])
+        with self.assertRaises(RuntimeError):
+            queue.send_pulses([2])
@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from pysdrc import cache, decoder, incremental, loopback, macro
+from pysdrc.circuitpython import transmitter
+
+
+def _decoded(simulated):
+    return [(event.protocol, event.code) for event in simulated.decode()]
+
+
+class LoopbackTransmitterTest(unittest.TestCase):
+    def test_sirc(self):
+        simulated = loopback.LoopbackBackend()
+        sirc_transmitter = transmitter.SIRCTransmitter(None, backend=simulated)
+
+        sirc_transmitter.transmit_command(18, 1)
+        sirc_transmitter.transmit_command(19, 1, 151)
+
+        self.assertEqual(
+            _decoded(simulated), [("SIRC", (18, 1))] * 4 + [("SIRC", (19, 1, 151))] * 4
+        )
+        self.assertEqual(simulated.pulseouts[0].carrier_frequency, 40_000)
+
+    def test_nec_with_jitter(self):
+        simulated = loopback.LoopbackBackend(jitter=0.01, seed=1)
+        nec_transmitter = transmitter.NECTransmitter(None, backend=simulated)
+
+        nec_transmitter.transmit_command(0x1234, 5)
+        nec_transmitter.transmit_repeat(repeat=2)
+
+        self.assertEqual(
+            _decoded(simulated),
+            [
+                ("NEC", (0x1234, 5)),
+                ("NEC", decoder.NEC_REPEAT),
+                ("NEC", decoder.NEC_REPEAT),
+            ],
+        )
+
+    def test_burst_timing(self):
+        for pulse_cache in (None, cache.PulseCache()):
+            simulated = loopback.LoopbackBackend()
+            nec_transmitter = transmitter.NECTransmitter(
+                None,
+                backend=simulated,
+                burst=True,
+                default_repeat=3,
+                pulse_cache=pulse_cache,
+            )
+
+            nec_transmitter.transmit_command(128, 5)
+
+            events = list(simulated.decode())
+            self.assertEqual(
+                [(event.protocol, event.code) for event in events],
+                [
+                    ("NEC", (128, 5)),
+                    ("NEC", decoder.NEC_REPEAT),
+                    ("NEC", decoder.NEC_REPEAT),
+                ],
+            )
+            self.assertAlmostEqual(events[1].timestamp - events[0].timestamp, 0.108)
+            self.assertAlmostEqual(events[2].timestamp - events[1].timestamp, 0.108)
+
+    def test_program(self):
+        simulated = loopback.LoopbackBackend()
+        sirc_transmitter = transmitter.SIRCTransmitter(None, backend=simulated)
+
+        program = macro.Macro().sirc(46, 1, repeat=1).wait(2).sirc(72, 1, repeat=1)
+        sirc_transmitter.transmit_program(program.compile())
+
+        events = list(simulated.decode())
+        self.assertEqual(len(events), 2)
+        self.assertAlmostEqual(events[1].timestamp - events[0].timestamp, 2.045)
+
+    def test_pulsein(self):
+        simulated = loopback.LoopbackBackend()
+        sirc_transmitter = transmitter.SIRCTransmitter(None, backend=simulated)
+        sirc_transmitter.transmit_command(18, 1, 151, repeat=1)
+
+        ir_decoder = incremental.IncrementalDecoder()
+        results = []
+        while simulated.pulsein:
+            result = ir_decoder.push(simulated.pulsein.popleft())
+            if result:
+                results.append(result)
+        self.assertIsNone(ir_decoder.finish())
+
+        self.assertEqual(results, [("SIRC", (18, 1, 151))])
+
+    def test_load(self):
+        simulated = loopback.LoopbackBackend(jitter=0.05, seed=2)
+        sirc_transmitter = transmitter.SIRCTransmitter(
+            None, backend=simulated, pulse_cache=cache.PulseCache(), default_repeat=1
+        )
+
+        for index in range(2000):
+            sirc_transmitter.transmit_command(index % 128, 1)
+
+        events = _decoded(simulated)
+        self.assertEqual(events, [("SIRC", (index % 128, 1)) for index in range(2000)])
@@ -0,0 +1,58 @@
+# SPDX-FileCopyrightText: 2020 Diego Elio Pettenò
+#
+# SPDX-License-Identifier: MIT
+
+"""Timings of the SIRC and NEC protocols.
+
+The nominal durations (in usec) are the ones sent by pysdrc.encoder, and the
+[MIN, MAX] windows are the ones accepted by the decoders in pysdrc.decoder,
+pysdrc.batch and pysdrc.incremental. The compiled protocols in pysdrc.protocols are
+built from the same values, so that all the implementations agree.
+
+This module is imported on the boards, so it only uses modules available on
+CircuitPython.
+"""
+
+# The other modules import const() from here, so that its CPython fallback is only
+# defined once.
+try:
+    from micropython import const
+except ImportError:
+
+    def const(value: int) -> int:
+        return value
+
+
+SIRC_HEADER_MARK = const(2400)
+SIRC_ONE_MARK = const(1200)
+SIRC_ZERO_MARK = const(600)
+SIRC_SPACE = const(600)
+
+# Valid lengths (in pulses) of 12-, 15- and 20-bit commands.
+SIRC_LENGTHS = (25, 31, 41)
+SIRC_HEADER_MIN = const(2200)
+SIRC_HEADER_MAX = const(2600)
+
+NEC_HEADER_MARK = const(9000)
+NEC_HEADER_SPACE = const(4500)
+NEC_MARK = const(560)
+NEC_ONE_SPACE = const(2250 - 560)
+NEC_ZERO_SPACE = const(560)
+NEC_REPEAT_PULSES = (9200, 2250, 560)
+
+# Valid lengths (in pulses) of commands and repeat codes.
+NEC_LENGTHS = (67, 3)
+NEC_AGC_PULSE_MIN = const(8800)
+NEC_AGC_PULSE_MAX = const(9300)
+NEC_HEADER_SPACE_MIN = const(4400)
+NEC_HEADER_SPACE_MAX = const(4600)
+NEC_REPEAT_SPACE_MIN = const(2100)
+NEC_REPEAT_SPACE_MAX = const(2300)
+NEC_REPEAT_MARK_MIN = const(450)
+NEC_REPEAT_MARK_MAX = const(700)
+
+# A bit is a one when its varying pulse is longer than BIT_RATIO times the other one.
+# The fraction is used by the decoders that avoid floating point arithmetic.
+BIT_RATIO_NUMERATOR = const(7)
+BIT_RATIO_DENOMINATOR = const(4)
+BIT_RATIO = BIT_RATIO_NUMERATOR / BIT_RATIO_DENOMINATOR